@@ -7,17 +7,28 @@ DART 회사 개요 수집 배치 (PRD 기반 v2)
 import csv
 import json
 import os
+import queue
+import random
 import sys
+import threading
 import time
 from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 
 import dart_fss as dart
+from dart_fss.api.filings import get_corp_info
 from dart_fss.auth.auth import DartAuth
-from dart_fss.corp import Corp
+from dart_fss.errors import NoDataReceived, OverQueryLimit
 from dart_fss.utils import request
 
+# 저장소 루트의 공용 패키지(shared)를 import 할 수 있게 경로에 추가
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from shared.rate_limiter import TokenBucket
+
 # ============================================================
 # 설정
 # ============================================================
@@ -32,10 +43,15 @@ PROGRESS_FILE = os.path.join(OUTPUT_DIR, "dart_corp_list.progress.json")  # 진
 SAMPLE_SIZE = int(
     os.getenv("SAMPLE_SIZE", "0")
 )  # 0 = 전체, N = 샘플 N개 (환경변수로 설정 가능)
-MAX_WORKERS = max(1, int(os.getenv("MAX_WORKERS", "1")))  # 병렬 요청 수
+MAX_WORKERS = max(1, int(os.getenv("MAX_WORKERS", "4")))  # 병렬 요청 수
 MAX_RETRIES = 3  # 재시도 횟수
-RETRY_DELAY = 2  # 재시도 간격(초)
-REQUEST_DELAY = float(os.getenv("REQUEST_DELAY", "0.2"))  # dart_fss 요청 간 대기(초)
+RETRY_DELAY = 2  # 재시도 기본 간격(초), 시도마다 2배
+REQUESTS_PER_MINUTE = float(
+    os.getenv("REQUESTS_PER_MINUTE", "900")
+)  # 전체 스레드 합산 분당 요청 수 (DART 분당 1,000회 초과 시 IP 차단)
+DAILY_QUOTA = int(os.getenv("DAILY_QUOTA", "20000"))  # 일일 요청 한도 (개인 키 기준)
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "200"))  # CSV 일괄 기록 건수
+WRITE_FLUSH_SECONDS = float(os.getenv("WRITE_FLUSH_SECONDS", "10"))  # CSV 최대 기록 지연(초)
 STOP_ON_ERROR = os.getenv("STOP_ON_ERROR", "0") == "1"  # 실패 시 즉시 중단 여부
 INIT_MAX_RETRIES = int(os.getenv("INIT_MAX_RETRIES", "5"))  # 초기 API 검증 재시도 횟수
 MAX_CONSECUTIVE_FAILURES = int(
@@ -111,71 +127,173 @@ def load_csv_completed_codes():
     return set()
 
 
-def append_to_csv(corp_dict, is_first=False):
-    """CSV에 한 줄씩 append (Streaming 저장)"""
-    try:
-        # PRD 요구 필드만 추출
-        filtered = {k: corp_dict.get(k, "") for k in REQUIRED_FIELDS}
-
-        # corp_code를 문자열로 명시적 변환 (앞의 0 유지)
-        if "corp_code" in filtered:
-            filtered["corp_code"] = str(filtered["corp_code"]).zfill(8)
-
-        mode = "w" if is_first else "a"
-        with open(STREAMING_CSV, mode, encoding="utf-8-sig", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=REQUIRED_FIELDS)
-            if is_first:
-                writer.writeheader()
-            writer.writerow(filtered)
-        return True
-    except Exception as e:
-        print(f"[ERROR] CSV 저장 실패: {str(e)[:50]}")
-        return False
+class QuotaExhausted(RuntimeError):
+    """일일 요청 한도 소진"""
+
+
+class DartRateLimiter(TokenBucket):
+    """전체 스레드가 공유하는 토큰 버킷(shared.rate_limiter) + 일일 요청 한도"""
 
+    def __init__(self, requests_per_minute, daily_quota, used_today=0):
+        super().__init__(requests_per_minute / 60.0)
+        self.daily_quota = daily_quota
+        self.used = used_today
+        self._quota_lock = threading.Lock()
 
-def fetch_corp_detail(corp_code):
-    """단일 회사 상세 정보 조회"""
-    corp = Corp(corp_code=corp_code)
+    def acquire(self):
+        """요청 1건 허가. 한도를 다 쓰면 QuotaExhausted"""
+        with self._quota_lock:
+            if self.used >= self.daily_quota:
+                raise QuotaExhausted(f"일일 요청 한도 {self.daily_quota:,}건 소진")
+            self.used += 1
+        return super().acquire()
+
+
+def load_quota_used(progress):
+    """오늘 이미 사용한 요청 수 (progress 파일 기준)"""
+    quota = progress.get("quota") or {}
+    if quota.get("date") == datetime.now().strftime("%Y%m%d"):
+        return int(quota.get("used", 0))
+    return 0
+
+
+def to_csv_row(corp_dict):
+    """PRD 요구 필드만 추출"""
+    filtered = {k: corp_dict.get(k, "") for k in REQUIRED_FIELDS}
+
+    # corp_code를 문자열로 명시적 변환 (앞의 0 유지)
+    if "corp_code" in filtered:
+        filtered["corp_code"] = str(filtered["corp_code"]).zfill(8)
+    return filtered
+
+
+class BufferedCsvWriter:
+    """
+    단일 writer 스레드가 CSV 파일을 한 번만 열고 WRITE_BATCH_SIZE건 또는
+    WRITE_FLUSH_SECONDS초마다 일괄 기록한 뒤 progress의 completed를 갱신한다.
+    (파일에 기록된 건만 completed로 남기므로 재실행 시 누락이 없다)
+    """
+
+    _STOP = object()
+
+    def __init__(self, path, progress, progress_lock, write_header):
+        self.path = path
+        self.progress = progress
+        self.progress_lock = progress_lock
+        self.write_header = write_header
+        self.written = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="csv-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, corp_dict):
+        self._queue.put(to_csv_row(corp_dict))
+
+    def close(self):
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _flush(self, f, writer, rows):
+        writer.writerows(rows)
+        f.flush()
+        with self.progress_lock:
+            self.progress["completed"].extend(row["corp_code"] for row in rows)
+            save_progress(self.progress)
+        self.written += len(rows)
+
+    def _run(self):
+        rows = []
+        try:
+            mode = "w" if self.write_header else "a"
+            with open(self.path, mode, encoding="utf-8-sig", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=REQUIRED_FIELDS)
+                if self.write_header:
+                    writer.writeheader()
+                last_flush = time.monotonic()
+                while True:
+                    timeout = max(0.0, WRITE_FLUSH_SECONDS - (time.monotonic() - last_flush))
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        item = None
+
+                    stop = item is self._STOP
+                    if item is not None and not stop:
+                        rows.append(item)
+                    due = time.monotonic() - last_flush >= WRITE_FLUSH_SECONDS
+                    if rows and (stop or due or len(rows) >= WRITE_BATCH_SIZE):
+                        self._flush(f, writer, rows)
+                        rows = []
+                    if stop or due:
+                        last_flush = time.monotonic()
+                    if stop:
+                        return
+        except Exception as e:
+            self.error = e
+            print(f"\n[ERROR] CSV 저장 실패: {str(e)[:50]}")
+            # 이후 put()이 막히지 않도록 남은 항목을 비운다
+            while True:
+                try:
+                    if self._queue.get_nowait() is self._STOP:
+                        return
+                except queue.Empty:
+                    time.sleep(0.1)
+
+
+def fetch_corp_detail(corp_code, limiter):
+    """단일 회사 상세 정보 조회 (공유 rate limiter + 지수 백오프)"""
     last_error = None
 
     for attempt in range(MAX_RETRIES):
+        limiter.acquire()
         try:
-            corp.load()
-            return corp.to_dict()
+            info = get_corp_info(corp_code)
+            info.pop("status", None)
+            info.pop("message", None)
+            return info
+        except OverQueryLimit as e:
+            # DART 서버가 한도 초과(020)를 알리면 재시도해도 소용이 없다
+            raise QuotaExhausted(f"DART 요청 한도 초과: {e}") from e
+        except NoDataReceived:
+            raise
         except Exception as e:
             last_error = e
             if attempt < MAX_RETRIES - 1:
-                # 일시적 네트워크 오류를 흡수하기 위해 재시도 간격을 점진적으로 늘린다.
-                time.sleep(RETRY_DELAY * (attempt + 1))
+                # 일시적 네트워크 오류는 전체 요청을 잠시 멈추고 간격을 지수적으로 늘린다.
+                wait_seconds = RETRY_DELAY * (2**attempt) + random.uniform(0, RETRY_DELAY)
+                limiter.backoff(wait_seconds)
 
-    raise Exception(f"load() 실패 (재시도 {MAX_RETRIES}회): {last_error}")
+    raise Exception(f"get_corp_info 실패 (재시도 {MAX_RETRIES}회): {last_error}")
 
 
-def process_completed_future(future, future_to_code, progress, success, fail, is_first):
+def process_completed_future(future, future_to_code, progress, progress_lock, writer, success, fail):
     """완료된 Future 결과 처리"""
     corp_code = future_to_code.pop(future)
 
     try:
         corp_dict = future.result()
+    except QuotaExhausted:
+        raise
     except Exception as e:
         print(f"\n[ERROR] {corp_code} - {str(e)[:80]}")
-        progress["failed"].append(corp_code)
+        with progress_lock:
+            progress["failed"].append(corp_code)
         fail += 1
-        return success, fail, is_first, corp_code
+        return success, fail, corp_code
 
-    if append_to_csv(corp_dict, is_first=is_first):
-        progress["completed"].append(corp_code)
-        success += 1
-        is_first = False
-        return success, fail, is_first, None
+    if writer.error is not None:
+        print("\n[CRITICAL] CSV 저장 실패 - 중단")
+        raise RuntimeError("CSV 저장 실패")
 
-    print("\n[CRITICAL] CSV 저장 실패 - 중단")
-    raise RuntimeError("CSV 저장 실패")
+    writer.put(corp_dict)
+    success += 1
+    return success, fail, None
 
 
 def initialize_dart_api():
-    """DART API 키 설정 및 요청 지연 초기화"""
-    request.set_delay(REQUEST_DELAY)
+    """DART API 키 설정 (요청 간격은 DartRateLimiter가 전담)"""
+    request.set_delay(None)
 
     last_error = None
     for attempt in range(INIT_MAX_RETRIES):
@@ -254,14 +372,41 @@ def main():
         return 0
 
     # 4. 회사 개요 수집
+    limiter = DartRateLimiter(REQUESTS_PER_MINUTE, DAILY_QUOTA, load_quota_used(progress))
+    if limiter.used >= DAILY_QUOTA:
+        print(f"[STOP] 오늘 요청 한도 {DAILY_QUOTA:,}건을 이미 사용했습니다. 내일 재실행하세요.")
+        return 1
+
     print(f"\n[3/4] 회사 개요 수집 중... (총 {len(remaining):,}개)")
     print("[INFO] corp_list는 CSV 사용, 각 회사 상세 정보만 API 호출")
-    print(f"[INFO] 병렬 요청 수: {MAX_WORKERS} | 요청 간 대기: {REQUEST_DELAY}초")
+    print(
+        f"[INFO] 병렬 요청 수: {MAX_WORKERS} | 분당 요청: {REQUESTS_PER_MINUTE:,.0f}회 | "
+        f"오늘 남은 한도: {DAILY_QUOTA - limiter.used:,}건"
+    )
 
     success = 0
     fail = 0
     consecutive_failures = 0
-    is_first = len(all_completed) == 0  # CSV가 비어있으면 헤더 생성
+    quota_exhausted = False
+    progress_lock = threading.Lock()
+    writer = BufferedCsvWriter(
+        STREAMING_CSV,
+        progress,
+        progress_lock,
+        write_header=len(all_completed) == 0,  # CSV가 비어있으면 헤더 생성
+    )
+
+    def record_quota():
+        with progress_lock:
+            progress["quota"] = {
+                "date": datetime.now().strftime("%Y%m%d"),
+                "used": limiter.used,
+            }
+
+    def stop(message):
+        for pending_future in future_to_code:
+            pending_future.cancel()
+        print(message)
 
     start_time = time.time()
     processed = 0
@@ -269,11 +414,13 @@ def main():
     future_to_code = {}
 
     def submit_next(executor):
+        if quota_exhausted:
+            return False
         try:
             corp_code = next(remaining_iter)
         except StopIteration:
             return False
-        future = executor.submit(fetch_corp_detail, corp_code)
+        future = executor.submit(fetch_corp_detail, corp_code, limiter)
         future_to_code[future] = corp_code
         return True
 
@@ -287,29 +434,29 @@ def main():
                 done, _ = wait(future_to_code.keys(), return_when=FIRST_COMPLETED)
 
                 for future in done:
-                    success, fail, is_first, failed_code = process_completed_future(
-                        future, future_to_code, progress, success, fail, is_first
-                    )
+                    try:
+                        success, fail, failed_code = process_completed_future(
+                            future, future_to_code, progress, progress_lock, writer, success, fail
+                        )
+                    except QuotaExhausted as e:
+                        # 진행 중인 요청은 마저 받아 기록하고 새 요청만 멈춘다
+                        if not quota_exhausted:
+                            print(f"\n[STOP] {e}. 재실행 시 이어서 진행됩니다.")
+                        quota_exhausted = True
+                        continue
                     processed += 1
+                    record_quota()
 
                     if failed_code is not None:
                         consecutive_failures += 1
                         if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                            for pending_future in future_to_code:
-                                pending_future.cancel()
-                            print(
+                            stop(
                                 f"[STOP] 연속 실패 {consecutive_failures}건 발생으로 중단. "
                                 "재실행 시 이어서 진행됩니다."
                             )
-                            save_progress(progress)
                             return 1
                         if STOP_ON_ERROR:
-                            for pending_future in future_to_code:
-                                pending_future.cancel()
-                            print(
-                                "[STOP] 오류 발생으로 중단. 재실행 시 이어서 진행됩니다."
-                            )
-                            save_progress(progress)
+                            stop("[STOP] 오류 발생으로 중단. 재실행 시 이어서 진행됩니다.")
                             return 1
                         submit_next(executor)
                         continue
@@ -325,17 +472,26 @@ def main():
                             f"\r진행: {processed:,}/{len(remaining):,} "
                             f"({processed / len(remaining) * 100:.1f}%) | "
                             f"성공: {success:,} | 실패: {fail:,} | "
+                            f"요청: {limiter.used:,}/{DAILY_QUOTA:,} | "
                             f"예상 남은 시간: {eta / 60:.1f}분",
                             end="",
                             flush=True,
                         )
 
-                        if processed % 500 == 0:
-                            save_progress(progress)
-
                     submit_next(executor)
     except RuntimeError:
-        save_progress(progress)
+        return 1
+    finally:
+        writer.close()
+        record_quota()
+        with progress_lock:
+            save_progress(progress)
+
+    if writer.error is not None:
+        print("\n[CRITICAL] CSV 저장 실패 - 중단")
+        return 1
+    if quota_exhausted:
+        print(f"\n[INFO] 이번 실행 저장: {writer.written:,}건 | 남은 작업은 한도 초기화 후 재실행")
         return 1
 
     print()  # 줄바꿈
@@ -6,30 +6,21 @@ from pathlib import Path
 from typing import Literal
 
 import pandas as pd
-from pykrx.website.krx.market.ticker import StockTicker
+from ticker_metadata import load_ticker_metadata
 
 MarketType = Literal["KOSPI", "KOSDAQ"]
 
-MARKET_CODE = {
-    "KOSPI": "STK",
-    "KOSDAQ": "KSQ",
-}
 
-
-def get_market_ticker_frame(market: MarketType) -> pd.DataFrame:
-    listed = StockTicker().listed
-    market_code = MARKET_CODE[market]
-
-    df = listed.loc[listed["시장"] == market_code, ["종목", "ISIN"]].copy()
-    df = df.reset_index(names="ticker")
-    df = df.rename(columns={"종목": "name", "ISIN": "isin"})
-    df.insert(0, "market", market)
-    return df
+def get_market_ticker_frame(market: MarketType, metadata: pd.DataFrame | None = None) -> pd.DataFrame:
+    if metadata is None:
+        metadata = load_ticker_metadata()
+    return metadata.loc[metadata["market"] == market].reset_index(drop=True)
 
 
 def get_all_market_ticker_frame() -> pd.DataFrame:
-    kospi = get_market_ticker_frame("KOSPI")
-    kosdaq = get_market_ticker_frame("KOSDAQ")
+    metadata = load_ticker_metadata()
+    kospi = get_market_ticker_frame("KOSPI", metadata)
+    kosdaq = get_market_ticker_frame("KOSDAQ", metadata)
     return pd.concat([kospi, kosdaq], ignore_index=True)
 
 
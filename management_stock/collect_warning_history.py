@@ -3,11 +3,13 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
 import tempfile
 import time
 import warnings
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable
 
 import pandas as pd
 
@@ -22,6 +24,16 @@ warnings.filterwarnings(
 
 from pykrx.website.naver.wrap import get_market_ohlcv_by_date
 
+from ohlcv_store import DEFAULT_OHLCV_STORE_DIR, OhlcvFetcher, OhlcvStore
+
+# 저장소 루트의 공용 패키지(shared)를 형제 모듈처럼 import 할 수 있게 경로에 추가
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from shared.concurrency import run_fetch_tasks
+from shared.rate_limiter import TokenBucket
+
 RESULT_COLUMNS = [
     "market",
     "ticker",
@@ -46,6 +58,9 @@ THRESHOLDS = {
     "KOSPI": 30_000_000_000,
 }
 WARNING_RATIO = 1.3
+DEFAULT_WORKERS = 4
+DEFAULT_FLUSH_EVERY = 50
+DEFAULT_FLUSH_SECONDS = 30.0
 
 
 def parse_args() -> argparse.Namespace:
@@ -84,7 +99,41 @@ def parse_args() -> argparse.Namespace:
         "--request-sleep",
         type=float,
         default=0.3,
-        help="종목 간 대기 시간(초)",
+        help="요청 간 최소 간격(초). --requests-per-second 미지정 시 전체 요청 속도 제한으로 사용",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=None,
+        help="모든 작업자가 공유하는 초당 최대 요청 수",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="동시에 이력을 조회할 작업자 수",
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=DEFAULT_FLUSH_EVERY,
+        help="progress 파일을 다시 쓰기 전까지 모을 종목 수",
+    )
+    parser.add_argument(
+        "--flush-seconds",
+        type=float,
+        default=DEFAULT_FLUSH_SECONDS,
+        help="마지막 저장 이후 이 시간이 지나면 progress 파일을 저장",
+    )
+    parser.add_argument(
+        "--ohlcv-store",
+        default=str(DEFAULT_OHLCV_STORE_DIR),
+        help="로컬 OHLCV 저장소 경로. 저장소에 없는 최근 구간만 새로 조회",
+    )
+    parser.add_argument(
+        "--no-ohlcv-store",
+        action="store_true",
+        help="로컬 OHLCV 저장소를 쓰지 않고 매번 전체 구간을 조회",
     )
     return parser.parse_args()
 
@@ -247,11 +296,16 @@ def build_history_frame(
     listed_shares: int,
     days: int,
     calendar_buffer_days: int,
+    store: OhlcvStore | None = None,
+    fetch: OhlcvFetcher = get_market_ohlcv_by_date,
 ) -> pd.DataFrame:
     from_date = (
         datetime.strptime(base_date, "%Y%m%d") - timedelta(days=calendar_buffer_days)
     ).strftime("%Y%m%d")
-    raw = get_market_ohlcv_by_date(from_date, base_date, ticker)
+    if store is not None:
+        raw = store.get_history(market, ticker, from_date, base_date)
+    else:
+        raw = fetch(from_date, base_date, ticker)
     if raw.empty:
         raise RuntimeError(f"거래이력 조회 실패: {ticker} {base_date}")
 
@@ -287,6 +341,70 @@ def classify_risk_level(row: pd.Series) -> str:
     return "안전"
 
 
+def rate_limited_fetch(
+    fetch: OhlcvFetcher, rate_limiter: TokenBucket | None
+) -> OhlcvFetcher:
+    if rate_limiter is None:
+        return fetch
+
+    def limited(from_date: str, to_date: str, ticker: str) -> pd.DataFrame:
+        rate_limiter.acquire()
+        return fetch(from_date, to_date, ticker)
+
+    return limited
+
+
+class HistoryWriter:
+    def __init__(
+        self,
+        progress_df: pd.DataFrame,
+        error_df: pd.DataFrame,
+        progress_path: Path,
+        error_path: Path,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.progress_df = progress_df
+        self.error_df = error_df
+        self.progress_path = progress_path
+        self.error_path = error_path
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
+        self._clock = clock
+        self._histories: list[pd.DataFrame] = []
+        self._errors: list[dict] = []
+        self._flushed_at = clock()
+
+    def add_history(self, history: pd.DataFrame) -> None:
+        self._histories.append(history)
+        self._maybe_flush()
+
+    def add_error(self, error_row: dict) -> None:
+        self._errors.append(error_row)
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        pending = len(self._histories) + len(self._errors)
+        if pending >= self.flush_every or self._clock() - self._flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._histories:
+            self.progress_df = pd.concat(
+                [self.progress_df, *self._histories], ignore_index=True
+            )
+            save_progress(self.progress_df[RESULT_COLUMNS], self.progress_path)
+            self._histories = []
+        if self._errors:
+            self.error_df = pd.concat(
+                [self.error_df, pd.DataFrame(self._errors)], ignore_index=True
+            )
+            save_errors(self.error_df[ERROR_COLUMNS], self.error_path)
+            self._errors = []
+        self._flushed_at = self._clock()
+
+
 def collect_warning_history(
     candidates: pd.DataFrame,
     days: int,
@@ -294,8 +412,12 @@ def collect_warning_history(
     output_stem: Path,
     candidates_path: str | Path,
     base_date: str,
-    request_sleep: float = 0.0,
     limit: int | None = None,
+    store: OhlcvStore | None = None,
+    fetch: OhlcvFetcher = get_market_ohlcv_by_date,
+    workers: int = DEFAULT_WORKERS,
+    flush_every: int = DEFAULT_FLUSH_EVERY,
+    flush_seconds: float = DEFAULT_FLUSH_SECONDS,
 ) -> pd.DataFrame:
     progress_path = build_progress_path(output_stem)
     error_path = build_error_path(output_stem)
@@ -336,31 +458,38 @@ def collect_warning_history(
             .reset_index(drop=True)
         )
 
-    for index, row in enumerate(pending.itertuples(index=False), start=1):
-        if index == 1 or index % 10 == 0 or index == total:
-            print(f"[history] {index}/{total} {row.ticker} {row.name}")
-
-        try:
-            history = build_history_frame(
-                market=row.market,
-                ticker=row.ticker,
-                name=row.name,
-                base_date=row.base_date,
-                listed_shares=int(row.listed_shares),
-                days=days,
-                calendar_buffer_days=calendar_buffer_days,
-            )
-            progress_df = pd.concat([progress_df, history], ignore_index=True)
-            save_progress(progress_df[RESULT_COLUMNS], progress_path)
+    writer = HistoryWriter(
+        progress_df,
+        error_df,
+        progress_path,
+        error_path,
+        flush_every=flush_every,
+        flush_seconds=flush_seconds,
+    )
 
-            if len(history) < days:
-                print(
-                    f"[history] warning: {row.ticker} {row.name} "
-                    f"{len(history)}/{days}거래일만 수집"
-                )
-        except Exception as exc:
-            error_row = pd.DataFrame(
-                [
+    def collect(row, _: int) -> pd.DataFrame:
+        return build_history_frame(
+            market=row.market,
+            ticker=row.ticker,
+            name=row.name,
+            base_date=row.base_date,
+            listed_shares=int(row.listed_shares),
+            days=days,
+            calendar_buffer_days=calendar_buffer_days,
+            store=store,
+            fetch=fetch,
+        )
+
+    tasks = ((row, index) for index, row in enumerate(pending.itertuples(index=False), start=1))
+    try:
+        for index, (row, _, future) in enumerate(run_fetch_tasks(tasks, collect, workers=workers), start=1):
+            if index == 1 or index % 10 == 0 or index == total:
+                print(f"[history] {index}/{total} {row.ticker} {row.name}")
+
+            try:
+                history = future.result()
+            except Exception as exc:
+                writer.add_error(
                     {
                         "market": row.market,
                         "ticker": row.ticker,
@@ -369,16 +498,20 @@ def collect_warning_history(
                         "error_type": type(exc).__name__,
                         "error_message": str(exc),
                     }
-                ]
-            )
-            error_df = pd.concat([error_df, error_row], ignore_index=True)
-            save_errors(error_df[ERROR_COLUMNS], error_path)
-            print(f"[history] skip: {row.ticker} {row.name} ({type(exc).__name__}: {exc})")
-            continue
+                )
+                print(f"[history] skip: {row.ticker} {row.name} ({type(exc).__name__}: {exc})")
+                continue
 
-        if request_sleep > 0:
-            time.sleep(request_sleep)
+            writer.add_history(history)
+            if len(history) < days:
+                print(
+                    f"[history] warning: {row.ticker} {row.name} "
+                    f"{len(history)}/{days}거래일만 수집"
+                )
+    finally:
+        writer.flush()
 
+    progress_df = writer.progress_df
     final = (
         progress_df.drop_duplicates(subset=["ticker", "base_date"], keep="last")
         .sort_values(["ticker", "base_date"])
@@ -398,6 +531,14 @@ def main() -> None:
         else max(90, args.days * 3)
     )
 
+    requests_per_second = args.requests_per_second
+    if requests_per_second is None and args.request_sleep > 0:
+        requests_per_second = 1.0 / args.request_sleep
+    rate_limiter = (
+        TokenBucket(requests_per_second, capacity=1.0) if requests_per_second else None
+    )
+    fetch = rate_limited_fetch(get_market_ohlcv_by_date, rate_limiter)
+
     result = collect_warning_history(
         candidates=candidates,
         days=args.days,
@@ -405,8 +546,12 @@ def main() -> None:
         output_stem=output_stem,
         candidates_path=args.candidates,
         base_date=base_date,
-        request_sleep=args.request_sleep,
         limit=args.limit,
+        store=None if args.no_ohlcv_store else OhlcvStore(args.ohlcv_store, fetch=fetch),
+        fetch=fetch,
+        workers=args.workers,
+        flush_every=args.flush_every,
+        flush_seconds=args.flush_seconds,
     )
 
     csv_path = output_stem.with_suffix(".csv")
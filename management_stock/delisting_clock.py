@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+THRESHOLDS = {
+    "KOSDAQ": 20_000_000_000,
+    "KOSPI": 30_000_000_000,
+}
+RULE_EFFECTIVE_DATE = "20260701"
+DESIGNATION_TRADING_DAYS = 30
+CURE_WINDOW_TRADING_DAYS = 90
+CURE_TRADING_DAYS = 45
+DEFAULT_HORIZON = DESIGNATION_TRADING_DAYS + CURE_WINDOW_TRADING_DAYS
+DEFAULT_SHOCKS = (0.0, -0.10, -0.20)
+RESULT_COLUMNS = [
+    "shock",
+    "market",
+    "ticker",
+    "name",
+    "base_date",
+    "market_cap",
+    "threshold",
+    "state",
+    "breach_run",
+    "recovery_run",
+    "days_to_designation",
+    "days_to_delisting",
+]
+
+
+class DelistingClock:
+    """
+    종목(또는 시나리오 x 종목) 배열 단위로 관리종목 지정/상장폐지 시계를 한 거래일씩 진행한다.
+    - 미지정: 기준치 미달이 30거래일 연속이면 지정
+    - 지정 후: 90거래일 안에 45거래일 연속 회복하면 해제, 못 하면 상장폐지
+    """
+
+    def __init__(self, shape: tuple[int, ...]) -> None:
+        self.step = 0
+        self.breach_run = np.zeros(shape, dtype=np.int32)
+        self.recovery_run = np.zeros(shape, dtype=np.int32)
+        self.designated_at = np.full(shape, -1, dtype=np.int32)
+        self.first_designated_at = np.full(shape, -1, dtype=np.int32)
+        self.delisted_at = np.full(shape, -1, dtype=np.int32)
+
+    def broadcast(self, shape: tuple[int, ...]) -> DelistingClock:
+        clock = DelistingClock(shape)
+        clock.step = self.step
+        for name in ("breach_run", "recovery_run", "designated_at", "first_designated_at", "delisted_at"):
+            setattr(clock, name, np.broadcast_to(getattr(self, name), shape).copy())
+        return clock
+
+    def advance(self, below: np.ndarray, valid: np.ndarray) -> None:
+        # 거래가 없는 날(NaN)은 카운트를 건드리지 않는다
+        active = valid & (self.delisted_at < 0)
+        designated = self.designated_at >= 0
+
+        watching = active & ~designated
+        self.breach_run = np.where(watching, (self.breach_run + 1) * below, self.breach_run)
+        newly = watching & (self.breach_run >= DESIGNATION_TRADING_DAYS)
+        self.designated_at = np.where(newly, self.step, self.designated_at)
+        self.first_designated_at = np.where(
+            newly & (self.first_designated_at < 0), self.step, self.first_designated_at
+        )
+
+        curing = active & designated
+        self.recovery_run = np.where(curing, (self.recovery_run + 1) * ~below, self.recovery_run)
+        released = curing & (self.recovery_run >= CURE_TRADING_DAYS)
+        expired = curing & ~released & (self.step - self.designated_at >= CURE_WINDOW_TRADING_DAYS)
+        self.delisted_at = np.where(expired, self.step, self.delisted_at)
+
+        self.designated_at = np.where(released, -1, self.designated_at)
+        self.breach_run = np.where(released, 0, self.breach_run)
+        self.recovery_run = np.where(released, 0, self.recovery_run)
+        self.step += 1
+
+    def state(self) -> np.ndarray:
+        return np.select(
+            [self.delisted_at >= 0, self.designated_at >= 0],
+            ["상장폐지", "관리종목"],
+            default="정상",
+        )
+
+
+def load_history(history_path: str | Path) -> pd.DataFrame:
+    path = Path(history_path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={"ticker": str, "base_date": str})
+
+    required_columns = {"market", "ticker", "name", "base_date", "market_cap"}
+    missing = required_columns - set(df.columns)
+    if missing:
+        raise ValueError(f"이력 컬럼이 부족합니다: {sorted(missing)}")
+
+    df = df.copy()
+    df["ticker"] = df["ticker"].astype(str).str.zfill(6)
+    df["base_date"] = df["base_date"].astype(str)
+    return df
+
+
+def build_history_panel(history: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    panel = history.pivot_table(
+        index="base_date", columns="ticker", values="market_cap", aggfunc="last"
+    ).sort_index()
+    info = history.drop_duplicates("ticker", keep="last").set_index("ticker")[["market", "name"]]
+    info = info.reindex(panel.columns)
+    if "threshold" in history.columns:
+        info["threshold"] = history.groupby("ticker")["threshold"].last().reindex(panel.columns)
+    else:
+        info["threshold"] = info["market"].map(THRESHOLDS)
+    return panel, info
+
+
+def simulate_delisting_clock(
+    panel: pd.DataFrame,
+    info: pd.DataFrame,
+    shocks: tuple[float, ...] = DEFAULT_SHOCKS,
+    horizon: int = DEFAULT_HORIZON,
+    effective_date: str = RULE_EFFECTIVE_DATE,
+) -> pd.DataFrame:
+    if panel.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    values = panel.to_numpy(dtype=float)
+    threshold = info["threshold"].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        below = valid & (values < threshold)
+    # 신기준 시행일 이전 미달은 카운트하지 않음
+    below &= (panel.index.to_numpy().astype(str) >= effective_date)[:, None]
+
+    clock = DelistingClock((values.shape[1],))
+    for day in range(values.shape[0]):
+        clock.advance(below[day], valid[day])
+    base_step = clock.step - 1
+    current_state = clock.state()
+
+    has_data = valid.any(axis=0)
+    last_index = len(values) - 1 - valid[::-1].argmax(axis=0)
+    last_cap = np.where(has_data, values[last_index, np.arange(values.shape[1])], np.nan)
+
+    # 기준일 이후 시가총액이 충격 반영 수준에서 유지된다고 가정하고 시나리오 x 종목을 한 번에 진행
+    shock = np.asarray(shocks, dtype=float)[:, None]
+    future_cap = last_cap[None, :] * (1 + shock)
+    future_valid = np.broadcast_to(has_data, future_cap.shape)
+    with np.errstate(invalid="ignore"):
+        future_below = future_valid & (future_cap < threshold)
+
+    projected = clock.broadcast(future_cap.shape)
+    for _ in range(horizon):
+        projected.advance(future_below, future_valid)
+
+    def days_until(step: np.ndarray) -> np.ndarray:
+        return np.where(step >= 0, np.maximum(step - base_step, 0), np.nan)
+
+    scenario_count, ticker_count = future_cap.shape
+    return pd.DataFrame(
+        {
+            "shock": np.repeat(shock[:, 0], ticker_count),
+            "market": np.tile(info["market"].to_numpy(), scenario_count),
+            "ticker": np.tile(panel.columns.to_numpy(), scenario_count),
+            "name": np.tile(info["name"].to_numpy(), scenario_count),
+            "base_date": panel.index[-1],
+            "market_cap": np.tile(last_cap, scenario_count),
+            "threshold": np.tile(threshold, scenario_count),
+            "state": np.tile(current_state, scenario_count),
+            "breach_run": np.tile(clock.breach_run, scenario_count),
+            "recovery_run": np.tile(clock.recovery_run, scenario_count),
+            "days_to_designation": days_until(projected.first_designated_at).ravel(),
+            "days_to_delisting": days_until(projected.delisted_at).ravel(),
+        }
+    )[RESULT_COLUMNS]
+
+
+def default_output_path(history_path: Path) -> Path:
+    stem = history_path.stem.replace("warning_history_", "")
+    return history_path.with_name(f"delisting_clock_{stem}.csv")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="후보군 이력으로 관리종목 지정/상장폐지까지 남은 거래일을 시나리오별로 추정합니다."
+    )
+    parser.add_argument(
+        "--history",
+        default="management_stock/data/warning_history_20260309.parquet",
+        help="collect_warning_history 결과 CSV/parquet 경로",
+    )
+    parser.add_argument(
+        "--shocks",
+        nargs="+",
+        type=float,
+        default=list(DEFAULT_SHOCKS),
+        help="기준일 이후 시가총액 충격 비율 (예: 0 -0.1 -0.2)",
+    )
+    parser.add_argument(
+        "--horizon",
+        type=int,
+        default=DEFAULT_HORIZON,
+        help="기준일 이후 시뮬레이션 거래일 수",
+    )
+    parser.add_argument(
+        "--effective-date",
+        default=RULE_EFFECTIVE_DATE,
+        help="이 날짜 이전의 기준치 미달은 연속 미달일에 포함하지 않음",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="출력 CSV 경로 (미지정 시 delisting_clock_YYYYMMDD.csv)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    history_path = Path(args.history)
+    output_path = Path(args.output) if args.output else default_output_path(history_path)
+
+    panel, info = build_history_panel(load_history(history_path))
+    result = simulate_delisting_clock(
+        panel,
+        info,
+        shocks=tuple(args.shocks),
+        horizon=args.horizon,
+        effective_date=args.effective_date,
+    )
+    result.to_csv(output_path, index=False, encoding="utf-8-sig")
+
+    summary = result.groupby("shock")[["days_to_designation", "days_to_delisting"]].count()
+    print(f"saved: {output_path}")
+    print(f"rows: {len(result)}")
+    print(summary.to_string())
+
+
+if __name__ == "__main__":
+    main()
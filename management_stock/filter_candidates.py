@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from snapshot_warehouse import DEFAULT_SNAPSHOT_WAREHOUSE_DIR, load_snapshot
+from ticker_metadata import excluded_name_mask
+
+THRESHOLDS = {
+    "KOSDAQ": 20_000_000_000,
+    "KOSPI": 30_000_000_000,
+}
+WARNING_RATIO = 1.3
+CAUTION_RATIO = 2.0
+# (등급, 기준치 대비 상한 비율). 앞에서부터 먼저 만족하는 등급을 붙임
+RISK_BANDS = (
+    ("위험", 1.0),
+    ("경고", WARNING_RATIO),
+    ("주의", CAUTION_RATIO),
+)
+WARNING_LEVELS = ("위험", "경고")
+PENNY_STOCK_PRICE = 1_000
+SNAPSHOT_COLUMNS = {
+    "market",
+    "ticker",
+    "name",
+    "base_date",
+    "close_price",
+    "listed_shares",
+    "market_cap",
+}
+
+CandidateRule = Callable[[pd.DataFrame], pd.DataFrame]
+
+
+def classify_risk_band(df: pd.DataFrame) -> pd.Series:
+    threshold = df["market"].map(THRESHOLDS).to_numpy(dtype="float64")
+    market_cap = df["market_cap"].to_numpy(dtype="float64")
+    # 시장 기준치가 없으면 NaN 비교가 False가 되어 등급 없음
+    conditions = [market_cap < np.floor(threshold * ratio) for _, ratio in RISK_BANDS]
+    labels = [label for label, _ in RISK_BANDS]
+    return pd.Series(np.select(conditions, labels, default=None), index=df.index)
+
+
+def prepare_snapshot(df: pd.DataFrame) -> pd.DataFrame:
+    missing = SNAPSHOT_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"스냅샷 컬럼이 부족합니다: {sorted(missing)}")
+
+    df = df.copy()
+    df["ticker"] = df["ticker"].astype(str).str.zfill(6)
+    df = df.loc[~excluded_name_mask(df["name"])].copy()
+    df["risk_level"] = classify_risk_band(df)
+    return df
+
+
+def select_warning_candidates(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.loc[df["risk_level"].isin(WARNING_LEVELS)].copy()
+    df["threshold"] = df["market"].map(THRESHOLDS)
+    df["warning_upper"] = (df["threshold"] * WARNING_RATIO).astype(int)
+    df["market_cap_100m"] = (df["market_cap"] / 1e8).round(1)
+    df["threshold_100m"] = (df["threshold"] / 1e8).round(1)
+    df["warning_upper_100m"] = (df["warning_upper"] / 1e8).round(1)
+
+    return df.sort_values(["market", "risk_level", "market_cap", "ticker"]).reset_index(
+        drop=True
+    )
+
+
+def select_caution_candidates(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.loc[df["risk_level"] == "주의"].copy()
+    df["threshold"] = df["market"].map(THRESHOLDS)
+    df["caution_upper"] = (df["threshold"] * CAUTION_RATIO).astype(int)
+    df["market_cap_100m"] = (df["market_cap"] / 1e8).round(1)
+    df["threshold_100m"] = (df["threshold"] / 1e8).round(1)
+    df["caution_upper_100m"] = (df["caution_upper"] / 1e8).round(1)
+
+    return df.sort_values(["market", "market_cap", "ticker"]).reset_index(drop=True)
+
+
+def select_penny_stock_candidates(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.loc[df["close_price"] < PENNY_STOCK_PRICE].drop(columns="risk_level")
+    df["penny_stock_threshold"] = PENNY_STOCK_PRICE
+    df["price_gap"] = df["close_price"] - PENNY_STOCK_PRICE
+    df["market_cap_100m"] = (df["market_cap"] / 1e8).round(1)
+
+    return df.sort_values(["market", "close_price", "ticker"]).reset_index(drop=True)
+
+
+CANDIDATE_RULES: dict[str, CandidateRule] = {
+    "warning_candidates": select_warning_candidates,
+    "caution_candidates": select_caution_candidates,
+    "penny_stock_candidates": select_penny_stock_candidates,
+}
+
+
+def build_candidates(
+    df: pd.DataFrame,
+    rules: dict[str, CandidateRule] = CANDIDATE_RULES,
+) -> dict[str, pd.DataFrame]:
+    prepared = prepare_snapshot(df)
+    return {name: rule(prepared) for name, rule in rules.items()}
+
+
+def load_snapshot_frame(args: argparse.Namespace) -> pd.DataFrame:
+    if args.base_date:
+        return load_snapshot(args.base_date, args.warehouse)
+    return pd.read_csv(args.snapshot)
+
+
+def snapshot_stem(args: argparse.Namespace) -> str:
+    if args.base_date:
+        return args.base_date
+    return Path(args.snapshot).stem.replace("market_snapshot_", "")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="시장 스냅샷을 한 번 읽어 모든 후보 규칙을 적용합니다."
+    )
+    parser.add_argument(
+        "--snapshot",
+        default="management_stock/data/market_snapshot_20260309.csv",
+        help="입력 스냅샷 CSV 경로",
+    )
+    parser.add_argument(
+        "--base-date",
+        default=None,
+        help="지정 시 CSV 대신 스냅샷 저장소에서 해당 기준일을 읽음 (YYYYMMDD)",
+    )
+    parser.add_argument(
+        "--warehouse",
+        default=str(DEFAULT_SNAPSHOT_WAREHOUSE_DIR),
+        help="스냅샷 저장소 경로",
+    )
+    parser.add_argument(
+        "--rules",
+        nargs="*",
+        choices=sorted(CANDIDATE_RULES),
+        default=None,
+        help="적용할 규칙 (미지정 시 전체)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="management_stock/data",
+        help="출력 디렉터리 (규칙별 <규칙>_YYYYMMDD.csv)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rules = {name: CANDIDATE_RULES[name] for name in args.rules} if args.rules else CANDIDATE_RULES
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = snapshot_stem(args)
+
+    results = build_candidates(load_snapshot_frame(args), rules)
+    for name, filtered in results.items():
+        output_path = output_dir / f"{name}_{stem}.csv"
+        filtered.to_csv(output_path, index=False, encoding="utf-8-sig")
+        print(f"saved: {output_path} (rows: {len(filtered)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,39 +4,12 @@ import argparse
 from pathlib import Path
 
 import pandas as pd
+from filter_candidates import load_snapshot_frame, prepare_snapshot, select_penny_stock_candidates
+from snapshot_warehouse import DEFAULT_SNAPSHOT_WAREHOUSE_DIR
 
-PENNY_STOCK_PRICE = 1_000
-EXCLUDE_KEYWORDS = ("SPAC", "스팩", "ETF", "ETN", "리츠", "REIT")
 
-
-def is_excluded(name: str) -> bool:
-    return any(keyword in name for keyword in EXCLUDE_KEYWORDS)
-
-
-def build_penny_stock_candidates(snapshot_path: Path) -> pd.DataFrame:
-    df = pd.read_csv(snapshot_path)
-    required_columns = {
-        "market",
-        "ticker",
-        "name",
-        "base_date",
-        "close_price",
-        "listed_shares",
-        "market_cap",
-    }
-    missing = required_columns - set(df.columns)
-    if missing:
-        raise ValueError(f"스냅샷 컬럼이 부족합니다: {sorted(missing)}")
-
-    df = df.copy()
-    df["ticker"] = df["ticker"].astype(str).str.zfill(6)
-    df = df.loc[~df["name"].fillna("").apply(is_excluded)].copy()
-    df = df.loc[df["close_price"] < PENNY_STOCK_PRICE].copy()
-    df["penny_stock_threshold"] = PENNY_STOCK_PRICE
-    df["price_gap"] = df["close_price"] - PENNY_STOCK_PRICE
-    df["market_cap_100m"] = (df["market_cap"] / 1e8).round(1)
-
-    return df.sort_values(["market", "close_price", "ticker"]).reset_index(drop=True)
+def build_penny_stock_candidates(df: pd.DataFrame) -> pd.DataFrame:
+    return select_penny_stock_candidates(prepare_snapshot(df))
 
 
 def default_output_path(snapshot_path: Path) -> Path:
@@ -53,6 +26,16 @@ def parse_args() -> argparse.Namespace:
         default="management_stock/data/market_snapshot_20260309.csv",
         help="입력 스냅샷 CSV 경로",
     )
+    parser.add_argument(
+        "--base-date",
+        default=None,
+        help="지정 시 CSV 대신 스냅샷 저장소에서 해당 기준일을 읽음 (YYYYMMDD)",
+    )
+    parser.add_argument(
+        "--warehouse",
+        default=str(DEFAULT_SNAPSHOT_WAREHOUSE_DIR),
+        help="스냅샷 저장소 경로",
+    )
     parser.add_argument(
         "--output",
         default=None,
@@ -63,10 +46,13 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    snapshot_path = Path(args.snapshot)
+    if args.base_date:
+        snapshot_path = Path(args.warehouse).parent / f"market_snapshot_{args.base_date}.csv"
+    else:
+        snapshot_path = Path(args.snapshot)
     output_path = Path(args.output) if args.output else default_output_path(snapshot_path)
 
-    filtered = build_penny_stock_candidates(snapshot_path)
+    filtered = build_penny_stock_candidates(load_snapshot_frame(args))
     filtered.to_csv(output_path, index=False, encoding="utf-8-sig")
 
     counts = filtered.groupby(["market"]).size().to_dict()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+DEFAULT_LISTED_SHARES_PATH = Path("management_stock/data/listed_shares.parquet")
+DEFAULT_REFRESH_DAYS = 7
+LISTED_SHARES_COLUMNS = ["ticker", "listed_shares", "valid_from", "checked_at"]
+
+
+def empty_listed_shares_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=LISTED_SHARES_COLUMNS)
+
+
+def load_listed_shares(store_path: str | Path = DEFAULT_LISTED_SHARES_PATH) -> pd.DataFrame:
+    path = Path(store_path)
+    if not path.exists():
+        return empty_listed_shares_frame()
+
+    df = pd.read_parquet(path)
+    missing = set(LISTED_SHARES_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"상장주식수 저장소 컬럼이 부족합니다: {sorted(missing)}")
+
+    df = df.copy()
+    df["ticker"] = df["ticker"].astype(str).str.zfill(6)
+    df["listed_shares"] = df["listed_shares"].astype("int64")
+    return df[LISTED_SHARES_COLUMNS]
+
+
+def save_listed_shares(df: pd.DataFrame, store_path: str | Path = DEFAULT_LISTED_SHARES_PATH) -> Path:
+    path = Path(store_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df[LISTED_SHARES_COLUMNS].to_parquet(path, index=False)
+    return path
+
+
+def current_listed_shares(df: pd.DataFrame, base_date: str) -> pd.DataFrame:
+    active = df.loc[df["valid_from"] <= base_date]
+    active = active.sort_values(["ticker", "valid_from"]).drop_duplicates("ticker", keep="last")
+    return active.reset_index(drop=True)
+
+
+def fresh_listed_shares(
+    df: pd.DataFrame,
+    base_date: str,
+    refresh_days: int = DEFAULT_REFRESH_DAYS,
+    refresh_tickers: Iterable[str] = (),
+) -> dict[str, int]:
+    current = current_listed_shares(df, base_date)
+    oldest_check = (pd.Timestamp(base_date) - pd.Timedelta(days=refresh_days)).strftime("%Y%m%d")
+    fresh = current.loc[
+        (current["checked_at"] >= oldest_check) & ~current["ticker"].isin(set(refresh_tickers))
+    ]
+    return dict(zip(fresh["ticker"], fresh["listed_shares"].astype("int64")))
+
+
+def record_listed_shares(
+    df: pd.DataFrame,
+    observations: pd.DataFrame,
+    base_date: str,
+) -> tuple[pd.DataFrame, list[str]]:
+    if observations.empty:
+        return df, []
+
+    observed = observations[["ticker", "listed_shares"]].drop_duplicates("ticker", keep="last").copy()
+    observed["listed_shares"] = observed["listed_shares"].astype("int64")
+    current = current_listed_shares(df, base_date)
+    merged = observed.merge(
+        current[["ticker", "listed_shares", "valid_from"]],
+        on="ticker",
+        how="left",
+        suffixes=("", "_stored"),
+    )
+    unchanged = merged["listed_shares"] == merged["listed_shares_stored"]
+    changed = merged.loc[~unchanged & merged["listed_shares_stored"].notna(), "ticker"].tolist()
+
+    df = df.copy()
+    touched = merged.loc[unchanged, ["ticker", "valid_from"]].assign(touched=True)
+    if not touched.empty:
+        df = df.merge(touched, on=["ticker", "valid_from"], how="left")
+        is_touched = df["touched"].eq(True)
+        df.loc[is_touched & (df["checked_at"] < base_date), "checked_at"] = base_date
+        df = df.drop(columns="touched")
+
+    new_rows = merged.loc[~unchanged, ["ticker", "listed_shares"]].assign(
+        valid_from=base_date,
+        checked_at=base_date,
+    )
+    if not new_rows.empty:
+        df = pd.concat([df, new_rows[LISTED_SHARES_COLUMNS]], ignore_index=True)
+    df = df.drop_duplicates(["ticker", "valid_from"], keep="last")
+    df = df.sort_values(["ticker", "valid_from"]).reset_index(drop=True)
+    return df[LISTED_SHARES_COLUMNS], changed
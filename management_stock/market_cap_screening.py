@@ -16,7 +16,9 @@ import tempfile
 import time
 import warnings
 from datetime import datetime, timedelta
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 os.environ.setdefault(
@@ -30,6 +32,8 @@ warnings.filterwarnings(
 
 from pykrx import stock
 
+from ticker_metadata import excluded_name_mask, load_ticker_metadata
+
 THRESHOLD = {
     "KOSDAQ": 20_000_000_000,  # 200억
     "KOSPI": 30_000_000_000,  # 300억
@@ -39,11 +43,8 @@ WARNING_MULTIPLIER = 2.0
 WARNING_RATIO = 1.3
 TREND_LOOKBACK_DAYS = 90
 REQUEST_SLEEP = 0.3
-
-
-def is_excluded(name: str) -> bool:
-    exclude_keywords = ["SPAC", "스팩", "ETF", "ETN", "리츠", "REIT"]
-    return any(keyword in name for keyword in exclude_keywords)
+DESIGNATION_TRADING_DAYS = 30
+MARKET_CAP_CACHE_DIR = Path("management_stock/data/market_cap_cache")
 
 
 def shift_days(date: str, days: int) -> str:
@@ -86,7 +87,9 @@ def classify_risk(row: pd.Series) -> str:
     return "🟢 안전 (단기 우려 낮음)"
 
 
-def get_snapshot(market: str, base_date: str) -> pd.DataFrame:
+def get_snapshot(
+    market: str, base_date: str, metadata: pd.DataFrame | None = None
+) -> pd.DataFrame:
     """
     공개 API만 사용:
     1) get_market_ohlcv(date, market)으로 종가/거래량/거래대금 조회
@@ -125,63 +128,128 @@ def get_snapshot(market: str, base_date: str) -> pd.DataFrame:
 
     df["시가총액"] = df["종가"] * df["상장주식수"]
 
-    tickers = df.index.tolist()
-    names = {ticker: stock.get_market_ticker_name(ticker) for ticker in tickers}
+    if metadata is None:
+        metadata = load_ticker_metadata()
+    names = metadata.drop_duplicates("ticker").set_index("ticker")["name"]
     df["종목명"] = df.index.map(names)
+    # 당일 신규상장, 기준일 이후 상장폐지 등 현재 목록에 없는 종목만 개별 조회
+    missing = df["종목명"].isna()
+    if missing.any():
+        df.loc[missing, "종목명"] = [
+            stock.get_market_ticker_name(ticker) for ticker in df.index[missing]
+        ]
 
-    df = df[~df["종목명"].apply(is_excluded)].copy()
+    df = df[~excluded_name_mask(df["종목명"])].copy()
     df["시장"] = market
 
     return df[["종목명", "시장", "종가", "상장주식수", "거래량", "거래대금", "시가총액"]]
 
 
-def get_trend(ticker: str, threshold: int, base_date: str) -> dict:
-    try:
-        from_date = (
-            datetime.strptime(base_date, "%Y%m%d") - timedelta(days=TREND_LOOKBACK_DAYS)
-        ).strftime("%Y%m%d")
-        df = stock.get_market_cap(from_date, base_date, ticker)
+def get_daily_market_cap(
+    market: str, date: str, cache_dir: str | Path = MARKET_CAP_CACHE_DIR
+) -> pd.Series:
+    """
+    지난 영업일 시가총액은 바뀌지 않으므로 시장/일자별 parquet에 캐시하고
+    캐시에 없는 날만 get_market_cap(date, market)으로 조회한다.
+    """
+    path = Path(cache_dir) / f"market={market}" / f"{date}.parquet"
+    if path.exists():
+        return pd.read_parquet(path)["시가총액"]
+
+    cap_df = stock.get_market_cap(date, market=market)
+    time.sleep(REQUEST_SLEEP)
+    if cap_df.empty or "시가총액" not in cap_df.columns:
+        return pd.Series(dtype="float64", name="시가총액")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    cap_df[["시가총액"]].to_parquet(temp_path)
+    os.replace(temp_path, path)
+    return cap_df["시가총액"]
+
+
+def get_market_cap_panel(
+    market: str,
+    base_date: str,
+    lookback_days: int = TREND_LOOKBACK_DAYS,
+    cache_dir: str | Path = MARKET_CAP_CACHE_DIR,
+) -> pd.DataFrame:
+    """
+    영업일마다 전종목 시가총액을 받아 날짜 x 티커 패널을 만든다.
+    종목 수와 무관하게 영업일 수만큼만 요청하고, 이미 받은 날은 캐시에서 읽는다.
+    """
+    from_date = shift_days(base_date, -lookback_days)
+    business_days = stock.get_previous_business_days(fromdate=from_date, todate=base_date)
 
-        if df.empty or "시가총액" not in df.columns:
-            return {"추세": "데이터없음", "연속미달일": 0, "60일대비(%)": None}
+    columns = {}
+    for day in business_days:
+        caps = get_daily_market_cap(market, day.strftime("%Y%m%d"), cache_dir)
+        if not caps.empty:
+            columns[pd.Timestamp(day)] = caps
 
-        df["미달"] = df["시가총액"] < threshold
+    if not columns:
+        return pd.DataFrame()
+    return pd.DataFrame(columns).T.sort_index()
 
-        consecutive = 0
-        for value in reversed(df["미달"].tolist()):
-            if value:
-                consecutive += 1
-            else:
-                break
 
-        first_cap = df["시가총액"].iloc[0]
-        last_cap = df["시가총액"].iloc[-1]
-        change_pct = None if first_cap <= 0 else (last_cap - first_cap) / first_cap * 100
+def trailing_breach_runs(below: np.ndarray) -> np.ndarray:
+    runs = np.zeros(below.shape, dtype=np.int32)
+    for position in range(below.shape[0]):
+        previous = runs[position - 1] if position else 0
+        runs[position] = (previous + 1) * below[position]
+    return runs
 
-        if change_pct is None:
-            trend = "데이터없음"
-        elif change_pct < -10:
-            trend = "하락"
-        elif change_pct <= 10:
-            trend = "보합"
-        else:
-            trend = "상승"
 
-        return {
+def analyze_trend_panel(panel: pd.DataFrame, threshold: int) -> pd.DataFrame:
+    """
+    패널 한 번의 행렬 연산으로 종목별 추세/연속미달일/관리종목 지정 잔여 거래일을 계산.
+    """
+    columns = ["추세", "연속미달일", "최장연속미달일", "지정잔여거래일", "60일대비(%)"]
+    if panel.empty:
+        return pd.DataFrame(columns=columns)
+
+    values = panel.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        below = valid & (values < threshold)
+    runs = trailing_breach_runs(below)
+    consecutive = runs[-1]
+
+    has_data = valid.any(axis=0)
+    first_index = valid.argmax(axis=0)
+    last_index = len(values) - 1 - valid[::-1].argmax(axis=0)
+    ticker_index = np.arange(values.shape[1])
+    first_cap = values[first_index, ticker_index]
+    last_cap = values[last_index, ticker_index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = np.where(
+            has_data & (first_cap > 0), (last_cap - first_cap) / first_cap * 100, np.nan
+        )
+
+    trend = np.select(
+        [np.isnan(change_pct), change_pct < -10, change_pct <= 10],
+        ["데이터없음", "하락", "보합"],
+        default="상승",
+    )
+    return pd.DataFrame(
+        {
             "추세": trend,
             "연속미달일": consecutive,
-            "60일대비(%)": round(change_pct, 1) if change_pct is not None else None,
-        }
-    except Exception:
-        return {"추세": "오류", "연속미달일": 0, "60일대비(%)": None}
+            "최장연속미달일": runs.max(axis=0),
+            "지정잔여거래일": np.maximum(DESIGNATION_TRADING_DAYS - consecutive, 0),
+            "60일대비(%)": np.round(change_pct, 1),
+        },
+        index=panel.columns,
+    )[columns]
 
 
 def run():
     base_date = resolve_base_date()
+    metadata = load_ticker_metadata()
     results = []
 
     for market in ["KOSDAQ", "KOSPI"]:
-        df = get_snapshot(market, base_date)
+        df = get_snapshot(market, base_date, metadata)
         threshold = THRESHOLD[market]
 
         risk_df = df[df["시가총액"] < threshold * WARNING_MULTIPLIER].copy()
@@ -189,12 +257,16 @@ def run():
 
         print(f"[{market}] 위험군 {len(risk_df)}개 종목 추세 분석 중...")
 
-        for ticker in risk_df.index:
-            trend_info = get_trend(ticker, threshold, base_date)
-            risk_df.loc[ticker, "추세"] = trend_info["추세"]
-            risk_df.loc[ticker, "연속미달일"] = trend_info["연속미달일"]
-            risk_df.loc[ticker, "60일대비(%)"] = trend_info["60일대비(%)"]
-            time.sleep(REQUEST_SLEEP)
+        panel = get_market_cap_panel(market, base_date)
+        trend_df = analyze_trend_panel(
+            panel.reindex(columns=risk_df.index), threshold
+        )
+        risk_df = risk_df.join(trend_df)
+        risk_df["추세"] = risk_df["추세"].fillna("데이터없음")
+        risk_df["연속미달일"] = risk_df["연속미달일"].fillna(0).astype(int)
+        risk_df["지정잔여거래일"] = (
+            risk_df["지정잔여거래일"].fillna(DESIGNATION_TRADING_DAYS).astype(int)
+        )
 
         results.append(risk_df)
 
@@ -209,6 +281,7 @@ def run():
             "위험등급",
             "추세",
             "연속미달일",
+            "지정잔여거래일",
             "60일대비(%)",
         ]
     ].copy()
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import os
 import re
+import tempfile
 import time
+import warnings
 from pathlib import Path
 from typing import Literal
 
@@ -11,11 +14,27 @@ import requests
 from bs4 import BeautifulSoup
 from pykrx.website.naver.wrap import get_market_ohlcv_by_date
 
+from listed_shares_store import (
+    DEFAULT_LISTED_SHARES_PATH,
+    DEFAULT_REFRESH_DAYS,
+    fresh_listed_shares,
+    load_listed_shares,
+    record_listed_shares,
+    save_listed_shares,
+)
+from snapshot_warehouse import DEFAULT_SNAPSHOT_WAREHOUSE_DIR, write_snapshot
+
 MarketType = Literal["KOSPI", "KOSDAQ"]
+SnapshotMode = Literal["bulk", "ticker"]
+SNAPSHOT_MODES = ("bulk", "ticker")
 
 DEFAULT_BASE_DATE = "20260309"  # 전일 또는 당일(장마감 후) 종가 기준으로.
 DEFAULT_TICKERS_PATH = Path("management_stock/data/market_tickers_20260310.parquet")
 HEADERS = {"User-Agent": "Mozilla/5.0"}
+LISTED_SHARES_PATTERN = re.compile(
+    r"<th[^>]*>\s*상장주식수\s*</th>\s*<td[^>]*>(.*?)</td>",
+    re.DOTALL,
+)
 RESULT_COLUMNS = [
     "market",
     "ticker",
@@ -57,19 +76,14 @@ def load_tickers(tickers_path: str | Path = DEFAULT_TICKERS_PATH) -> pd.DataFram
     return df
 
 
-def parse_current_naver_snapshot(
-    ticker: str, session: requests.Session
-) -> dict[str, int]:
-    response = session.get(
-        f"https://finance.naver.com/item/main.naver?code={ticker}",
-        headers=HEADERS,
-        timeout=10,
-    )
-    response.raise_for_status()
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    listed_shares = None
+def extract_listed_shares(page_html: str) -> int | None:
+    match = LISTED_SHARES_PATTERN.search(page_html)
+    if match is not None:
+        digits = re.sub(r"[^0-9]", "", match.group(1))
+        if digits:
+            return int(digits)
 
+    soup = BeautifulSoup(page_html, "html.parser")
     for row in soup.select("tr"):
         th = row.find("th")
         td = row.find("td")
@@ -80,9 +94,21 @@ def parse_current_naver_snapshot(
         if label.startswith("상장주식수"):
             digits = re.sub(r"[^0-9]", "", td.get_text())
             if digits:
-                listed_shares = int(digits)
-                break
+                return int(digits)
+    return None
+
+
+def parse_current_naver_snapshot(
+    ticker: str, session: requests.Session
+) -> dict[str, int]:
+    response = session.get(
+        f"https://finance.naver.com/item/main.naver?code={ticker}",
+        headers=HEADERS,
+        timeout=10,
+    )
+    response.raise_for_status()
 
+    listed_shares = extract_listed_shares(response.text)
     if listed_shares is None:
         raise RuntimeError(f"상장주식수 파싱 실패: {ticker}")
 
@@ -96,6 +122,61 @@ def get_close_price_on_date(ticker: str, base_date: str) -> int:
     return int(df.iloc[-1]["종가"])
 
 
+def _load_pykrx_stock():
+    os.environ.setdefault(
+        "MPLCONFIGDIR", os.path.join(tempfile.gettempdir(), "indgram-matplotlib")
+    )
+    warnings.filterwarnings(
+        "ignore",
+        message="pkg_resources is deprecated as an API.*",
+        category=UserWarning,
+    )
+    from pykrx import stock
+
+    return stock
+
+
+def get_bulk_market_frame(market: MarketType, base_date: str) -> pd.DataFrame:
+    stock = _load_pykrx_stock()
+    price_df = stock.get_market_ohlcv(base_date, market=market)
+    share_df = stock.get_exhaustion_rates_of_foreign_investment(base_date, market=market)
+    columns = ["ticker", "close_price", "listed_shares"]
+    if price_df.empty or share_df.empty:
+        return pd.DataFrame(columns=columns)
+    if "종가" not in price_df.columns or "상장주식수" not in share_df.columns:
+        raise RuntimeError(
+            f"{market} 전종목 데이터 컬럼 이상: {list(price_df.columns)} / {list(share_df.columns)}"
+        )
+
+    df = price_df[["종가"]].join(share_df[["상장주식수"]], how="inner")
+    df = df.loc[(df["종가"] > 0) & (df["상장주식수"] > 0)]
+    return pd.DataFrame(
+        {
+            "ticker": df.index.astype(str).str.zfill(6),
+            "close_price": df["종가"].astype("int64").to_numpy(),
+            "listed_shares": df["상장주식수"].astype("int64").to_numpy(),
+        }
+    )
+
+
+def apply_bulk_snapshot(
+    pending_df: pd.DataFrame,
+    bulk_df: pd.DataFrame,
+    market: MarketType,
+    base_date: str,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    merged = pending_df.merge(bulk_df, on="ticker", how="left")
+    found = merged["close_price"].notna()
+    rows = merged.loc[found, ["market", "ticker", "name"]].copy()
+    rows["market"] = market
+    rows["base_date"] = base_date
+    rows["close_price"] = merged.loc[found, "close_price"].astype("int64")
+    rows["listed_shares"] = merged.loc[found, "listed_shares"].astype("int64")
+    rows["market_cap"] = rows["close_price"] * rows["listed_shares"]
+    remaining = pending_df.loc[~pending_df["ticker"].isin(rows["ticker"])].copy()
+    return rows[RESULT_COLUMNS].reset_index(drop=True), remaining
+
+
 def empty_snapshot_frame() -> pd.DataFrame:
     return pd.DataFrame(columns=RESULT_COLUMNS)
 
@@ -157,7 +238,10 @@ def get_market_snapshot(
     base_date: str = DEFAULT_BASE_DATE,
     request_sleep: float = 0.0,
     limit: int | None = None,
+    mode: SnapshotMode = "ticker",
+    known_shares: dict[str, int] | None = None,
 ) -> pd.DataFrame:
+    known_shares = known_shares or {}
     df = tickers.loc[tickers["market"] == market, ["market", "ticker", "name"]].copy()
     if limit is not None:
         df = df.head(limit).copy()
@@ -174,6 +258,19 @@ def get_market_snapshot(
     if completed:
         print(f"[{market}] resume: {completed}/{total} already done")
 
+    if mode == "bulk" and not pending_df.empty:
+        try:
+            bulk_df = get_bulk_market_frame(market, base_date)
+        except Exception as exc:
+            print(f"[{market}] bulk failed, per-ticker fallback: {type(exc).__name__}: {exc}")
+            bulk_df = pd.DataFrame(columns=["ticker", "close_price", "listed_shares"])
+        bulk_rows, pending_df = apply_bulk_snapshot(pending_df, bulk_df, market, base_date)
+        if not bulk_rows.empty:
+            progress_df = pd.concat([progress_df, bulk_rows], ignore_index=True)
+            save_progress(progress_df[RESULT_COLUMNS], progress_path)
+        completed = total - len(pending_df)
+        print(f"[{market}] bulk: {len(bulk_rows)} tickers, fallback: {len(pending_df)} tickers")
+
     with requests.Session() as session:
         for index, row in enumerate(pending_df.itertuples(index=False), start=1):
             ticker = row.ticker
@@ -184,8 +281,11 @@ def get_market_snapshot(
 
             try:
                 close_price = get_close_price_on_date(ticker, base_date)
-                current_snapshot = parse_current_naver_snapshot(ticker, session)
-                listed_shares = int(current_snapshot["listed_shares"])
+                if ticker in known_shares:
+                    listed_shares = int(known_shares[ticker])
+                else:
+                    current_snapshot = parse_current_naver_snapshot(ticker, session)
+                    listed_shares = int(current_snapshot["listed_shares"])
                 row_df = pd.DataFrame(
                     [
                         {
@@ -241,39 +341,51 @@ def get_all_market_snapshot(
     tickers_path: str | Path = DEFAULT_TICKERS_PATH,
     progress_path: str | Path | None = None,
     error_path: str | Path | None = None,
+    mode: SnapshotMode = "ticker",
+    shares_store_path: str | Path | None = DEFAULT_LISTED_SHARES_PATH,
+    shares_refresh_days: int = DEFAULT_REFRESH_DAYS,
+    refresh_share_tickers: list[str] | None = None,
 ) -> pd.DataFrame:
     tickers = load_tickers(tickers_path)
     if progress_path is None:
         raise ValueError("progress_path is required")
     if error_path is None:
         raise ValueError("error_path is required")
-    progress_df = load_progress(progress_path)
-    error_df = load_errors(error_path)
-    kospi = get_market_snapshot(
-        tickers,
-        progress_df,
-        progress_path,
-        error_df,
-        error_path,
-        "KOSPI",
-        base_date=base_date,
-        request_sleep=request_sleep,
-        limit=limit_per_market,
-    )
-    progress_df = load_progress(progress_path)
-    error_df = load_errors(error_path)
-    kosdaq = get_market_snapshot(
-        tickers,
-        progress_df,
-        progress_path,
-        error_df,
-        error_path,
-        "KOSDAQ",
-        base_date=base_date,
-        request_sleep=request_sleep,
-        limit=limit_per_market,
+
+    shares_df = load_listed_shares(shares_store_path) if shares_store_path is not None else None
+    known_shares = (
+        fresh_listed_shares(shares_df, base_date, shares_refresh_days, refresh_share_tickers or [])
+        if shares_df is not None
+        else {}
     )
-    return pd.concat([kospi, kosdaq], ignore_index=True)
+    if known_shares:
+        print(f"listed shares cache: {len(known_shares)} tickers fresh")
+
+    results = []
+    for market in ("KOSPI", "KOSDAQ"):
+        progress_df = load_progress(progress_path)
+        error_df = load_errors(error_path)
+        market_result = get_market_snapshot(
+            tickers,
+            progress_df,
+            progress_path,
+            error_df,
+            error_path,
+            market,
+            base_date=base_date,
+            request_sleep=request_sleep,
+            limit=limit_per_market,
+            mode=mode,
+            known_shares=known_shares,
+        )
+        results.append(market_result)
+        if shares_df is not None:
+            observed = market_result.loc[~market_result["ticker"].isin(known_shares)]
+            shares_df, changed = record_listed_shares(shares_df, observed, base_date)
+            save_listed_shares(shares_df, shares_store_path)
+            if changed:
+                print(f"[{market}] 상장주식수 변경: {len(changed)} tickers ({', '.join(changed[:10])})")
+    return pd.concat(results, ignore_index=True)
 
 
 def save_snapshot_csv(df: pd.DataFrame, output_path: str | Path) -> Path:
@@ -293,9 +405,28 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--base-date", default=DEFAULT_BASE_DATE)
     parser.add_argument("--request-sleep", type=float, default=0.0)
     parser.add_argument("--limit-per-market", type=int, default=None)
+    parser.add_argument("--mode", choices=SNAPSHOT_MODES, default="ticker")
+    parser.add_argument("--shares-store", default=str(DEFAULT_LISTED_SHARES_PATH))
+    parser.add_argument("--shares-refresh-days", type=int, default=DEFAULT_REFRESH_DAYS)
+    parser.add_argument(
+        "--refresh-shares",
+        nargs="*",
+        default=[],
+        help="증자/감자/분할 등 주식수 변동 공시가 있는 티커는 캐시를 무시하고 다시 조회",
+    )
     parser.add_argument("--tickers-path", default=str(DEFAULT_TICKERS_PATH))
     parser.add_argument("--output-dir", default="management_stock/data")
     parser.add_argument("--output-stem", default="market_snapshot")
+    parser.add_argument(
+        "--warehouse",
+        default=str(DEFAULT_SNAPSHOT_WAREHOUSE_DIR),
+        help="기준일별 파티션 스냅샷 저장소 경로",
+    )
+    parser.add_argument(
+        "--no-warehouse",
+        action="store_true",
+        help="스냅샷 저장소에 적재하지 않음",
+    )
     return parser.parse_args()
 
 
@@ -314,13 +445,21 @@ if __name__ == "__main__":
         tickers_path=args.tickers_path,
         progress_path=progress_path,
         error_path=error_path,
+        mode=args.mode,
+        shares_store_path=args.shares_store,
+        shares_refresh_days=args.shares_refresh_days,
+        refresh_share_tickers=[ticker.zfill(6) for ticker in args.refresh_shares],
     )
 
     save_snapshot_csv(snapshot, csv_path)
     save_snapshot_parquet(snapshot, parquet_path)
+    if not args.no_warehouse:
+        write_snapshot(snapshot, args.warehouse)
 
     print(f"saved progress: {progress_path}")
     print(f"saved errors: {error_path}")
     print(f"saved csv: {csv_path}")
     print(f"saved parquet: {parquet_path}")
+    if not args.no_warehouse:
+        print(f"saved warehouse: {args.warehouse}")
     print(snapshot.to_string(index=False))
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+DEFAULT_OHLCV_STORE_DIR = Path("management_stock/data/ohlcv_store")
+OHLCV_COLUMNS = ["시가", "고가", "저가", "종가", "거래량"]
+DATE_COLUMN = "날짜"
+COVERAGE_FILE = "coverage.json"
+
+OhlcvFetcher = Callable[[str, str, str], pd.DataFrame]
+
+
+def _shift_date(date: str, days: int) -> str:
+    return (datetime.strptime(date, "%Y%m%d") + timedelta(days=days)).strftime("%Y%m%d")
+
+
+def merge_ranges(ranges: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    merged: list[tuple[str, str]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= _shift_date(merged[-1][1], 1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def empty_ohlcv_frame() -> pd.DataFrame:
+    frame = pd.DataFrame(columns=OHLCV_COLUMNS, dtype="int64")
+    frame.index = pd.DatetimeIndex([], name=DATE_COLUMN)
+    return frame
+
+
+class OhlcvStore:
+    def __init__(
+        self,
+        root: str | Path = DEFAULT_OHLCV_STORE_DIR,
+        fetch: OhlcvFetcher | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.fetch = fetch
+        self.fetch_count = 0
+
+    def ticker_dir(self, market: str, ticker: str) -> Path:
+        return self.root / f"market={market}" / f"ticker={ticker}"
+
+    def partition_path(self, market: str, ticker: str, year: int) -> Path:
+        return self.ticker_dir(market, ticker) / f"year={year}.parquet"
+
+    def load_coverage(self, market: str, ticker: str) -> list[tuple[str, str]]:
+        path = self.ticker_dir(market, ticker) / COVERAGE_FILE
+        if not path.exists():
+            return []
+        with path.open("r", encoding="utf-8") as f:
+            coverage = json.load(f)
+        if "ranges" in coverage:
+            return merge_ranges([(start, end) for start, end in coverage["ranges"]])
+        if "start" in coverage and "end" in coverage:
+            return [(coverage["start"], coverage["end"])]
+        return []
+
+    def save_coverage(self, market: str, ticker: str, ranges: list[tuple[str, str]]) -> None:
+        path = self.ticker_dir(market, ticker) / COVERAGE_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with temp_path.open("w", encoding="utf-8") as f:
+            json.dump({"ranges": [list(r) for r in merge_ranges(ranges)]}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def missing_ranges(self, market: str, ticker: str, from_date: str, to_date: str) -> list[tuple[str, str]]:
+        gaps = []
+        cursor = from_date
+        for start, end in self.load_coverage(market, ticker):
+            if end < cursor:
+                continue
+            if start > to_date:
+                break
+            if start > cursor:
+                gaps.append((cursor, _shift_date(start, -1)))
+            cursor = _shift_date(end, 1)
+            if cursor > to_date:
+                return gaps
+        gaps.append((cursor, to_date))
+        return gaps
+
+    def write(self, market: str, ticker: str, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        frame = frame[OHLCV_COLUMNS].astype("int64")
+        frame.index = pd.DatetimeIndex(frame.index, name=DATE_COLUMN)
+        for year, year_frame in frame.groupby(frame.index.year):
+            path = self.partition_path(market, ticker, int(year))
+            if path.exists():
+                existing = pq.read_table(path, memory_map=True).to_pandas()
+                year_frame = pd.concat([existing, year_frame])
+            year_frame = year_frame[~year_frame.index.duplicated(keep="last")].sort_index()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            year_frame.to_parquet(temp_path)
+            os.replace(temp_path, path)
+
+    def read(
+        self,
+        market: str,
+        ticker: str,
+        from_date: str,
+        to_date: str,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        columns = columns or OHLCV_COLUMNS
+        frames = []
+        for year in range(int(from_date[:4]), int(to_date[:4]) + 1):
+            path = self.partition_path(market, ticker, year)
+            if path.exists():
+                table = pq.read_table(path, columns=[*columns, DATE_COLUMN], memory_map=True)
+                frames.append(table.to_pandas())
+        if not frames:
+            return empty_ohlcv_frame()[columns]
+        frame = pd.concat(frames)
+        start = pd.Timestamp(from_date)
+        end = pd.Timestamp(to_date)
+        return frame.loc[(frame.index >= start) & (frame.index <= end), columns]
+
+    def get_history(self, market: str, ticker: str, from_date: str, to_date: str) -> pd.DataFrame:
+        gaps = self.missing_ranges(market, ticker, from_date, to_date)
+        if gaps:
+            if self.fetch is None:
+                gap_text = ", ".join(f"{start}~{end}" for start, end in gaps)
+                raise RuntimeError(f"OHLCV 저장소에 없는 구간입니다: {ticker} {gap_text}")
+            yesterday = _shift_date(datetime.now().strftime("%Y%m%d"), -1)
+            covered = self.load_coverage(market, ticker)
+            for start, end in gaps:
+                fetched = self.fetch(start, end, ticker)
+                self.fetch_count += 1
+                self.write(market, ticker, fetched)
+                covered_end = min(end, yesterday)
+                if start <= covered_end:
+                    covered.append((start, covered_end))
+            self.save_coverage(market, ticker, covered)
+        return self.read(market, ticker, from_date, to_date)
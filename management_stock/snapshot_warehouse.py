@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_SNAPSHOT_WAREHOUSE_DIR = Path("management_stock/data/snapshot_warehouse")
+SNAPSHOT_DIR = "snapshots"
+TICKER_DICTIONARY_FILE = "tickers.parquet"
+PARTITION_COLUMN = "base_date"
+VALUE_COLUMNS = ["close_price", "listed_shares", "market_cap"]
+SNAPSHOT_COLUMNS = ["market", "ticker", "name", PARTITION_COLUMN, *VALUE_COLUMNS]
+TICKER_DICTIONARY_COLUMNS = ["ticker", "market", "name", "first_seen", "last_seen"]
+
+FACT_SCHEMA = pa.schema(
+    [
+        ("market", pa.dictionary(pa.int8(), pa.string())),
+        ("ticker", pa.string()),
+        ("name", pa.dictionary(pa.int32(), pa.string())),
+        ("close_price", pa.int64()),
+        ("listed_shares", pa.int64()),
+        ("market_cap", pa.int64()),
+    ]
+)
+PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive")
+DATASET_SCHEMA = FACT_SCHEMA.append(pa.field(PARTITION_COLUMN, pa.string()))
+
+
+def snapshot_root(root: str | Path) -> Path:
+    return Path(root) / SNAPSHOT_DIR
+
+
+def partition_path(root: str | Path, base_date: str) -> Path:
+    return snapshot_root(root) / f"{PARTITION_COLUMN}={base_date}" / "part-0.parquet"
+
+
+def _atomic_write_table(table: pa.Table, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, path)
+
+
+def load_ticker_dictionary(root: str | Path = DEFAULT_SNAPSHOT_WAREHOUSE_DIR) -> pd.DataFrame:
+    path = Path(root) / TICKER_DICTIONARY_FILE
+    if not path.exists():
+        return pd.DataFrame(columns=TICKER_DICTIONARY_COLUMNS)
+    return pd.read_parquet(path)[TICKER_DICTIONARY_COLUMNS]
+
+
+def update_ticker_dictionary(
+    dictionary: pd.DataFrame,
+    snapshot: pd.DataFrame,
+    base_date: str,
+) -> pd.DataFrame:
+    observed = snapshot[["ticker", "market", "name"]].drop_duplicates("ticker", keep="last")
+    observed = observed.assign(first_seen=base_date, last_seen=base_date)
+    merged = pd.concat([dictionary, observed], ignore_index=True)
+    # 이름/시장은 가장 최근 관측값, 관측 구간은 처음~마지막 기준일로 유지
+    merged = merged.sort_values(["ticker", "last_seen"], kind="stable")
+    spans = merged.groupby("ticker").agg(first_seen=("first_seen", "min"), last_seen=("last_seen", "max"))
+    latest = merged.drop_duplicates("ticker", keep="last").set_index("ticker")[["market", "name"]]
+    return latest.join(spans).reset_index()[TICKER_DICTIONARY_COLUMNS]
+
+
+def write_snapshot(
+    snapshot: pd.DataFrame,
+    root: str | Path = DEFAULT_SNAPSHOT_WAREHOUSE_DIR,
+) -> list[Path]:
+    missing = set(SNAPSHOT_COLUMNS) - set(snapshot.columns)
+    if missing:
+        raise ValueError(f"스냅샷 컬럼이 부족합니다: {sorted(missing)}")
+    if snapshot.empty:
+        return []
+
+    df = snapshot[SNAPSHOT_COLUMNS].copy()
+    df["ticker"] = df["ticker"].astype(str).str.zfill(6)
+    df[PARTITION_COLUMN] = df[PARTITION_COLUMN].astype(str)
+    df[VALUE_COLUMNS] = df[VALUE_COLUMNS].astype("int64")
+
+    dictionary = load_ticker_dictionary(root)
+    written = []
+    for base_date, day in df.groupby(PARTITION_COLUMN, sort=True):
+        day = day.drop_duplicates("ticker", keep="last")
+        path = partition_path(root, base_date)
+        facts = day[FACT_SCHEMA.names]
+        if path.exists():
+            # 일부 시장/종목만 다시 적재해도 같은 기준일의 나머지 행은 유지 (같은 종목은 새 값 우선)
+            existing = pq.read_table(path).to_pandas().reindex(columns=FACT_SCHEMA.names)
+            existing["market"] = existing["market"].astype(str)
+            existing["name"] = existing["name"].astype(object)
+            facts = pd.concat([existing, facts], ignore_index=True)
+            facts = facts.drop_duplicates("ticker", keep="last")
+        facts = facts.sort_values(["market", "ticker"])
+        table = pa.Table.from_pandas(facts, schema=FACT_SCHEMA, preserve_index=False)
+        _atomic_write_table(table, path)
+        written.append(path)
+        dictionary = update_ticker_dictionary(dictionary, day, base_date)
+
+    _atomic_write_table(
+        pa.Table.from_pandas(dictionary, preserve_index=False),
+        Path(root) / TICKER_DICTIONARY_FILE,
+    )
+    return written
+
+
+def available_dates(root: str | Path = DEFAULT_SNAPSHOT_WAREHOUSE_DIR) -> list[str]:
+    base = snapshot_root(root)
+    if not base.exists():
+        return []
+    prefix = f"{PARTITION_COLUMN}="
+    return sorted(
+        path.name[len(prefix):]
+        for path in base.iterdir()
+        if path.is_dir() and path.name.startswith(prefix)
+    )
+
+
+def load_snapshot_panel(
+    start: str,
+    end: str,
+    root: str | Path = DEFAULT_SNAPSHOT_WAREHOUSE_DIR,
+    markets: Iterable[str] | None = None,
+    tickers: Iterable[str] | None = None,
+    columns: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    value_columns = list(columns) if columns is not None else VALUE_COLUMNS
+    unknown = set(value_columns) - set(VALUE_COLUMNS)
+    if unknown:
+        raise ValueError(f"알 수 없는 스냅샷 컬럼입니다: {sorted(unknown)}")
+    if not snapshot_root(root).exists():
+        return pd.DataFrame(columns=["market", "ticker", "name", PARTITION_COLUMN, *value_columns])
+
+    dataset = ds.dataset(
+        snapshot_root(root), schema=DATASET_SCHEMA, format="parquet", partitioning=PARTITIONING
+    )
+    predicate = (ds.field(PARTITION_COLUMN) >= start) & (ds.field(PARTITION_COLUMN) <= end)
+    if markets is not None:
+        predicate &= ds.field("market").isin(list(markets))
+    if tickers is not None:
+        predicate &= ds.field("ticker").isin([str(ticker).zfill(6) for ticker in tickers])
+
+    table = dataset.to_table(
+        columns=["market", "ticker", "name", PARTITION_COLUMN, *value_columns], filter=predicate
+    )
+    df = table.to_pandas()
+    df["market"] = df["market"].astype(str)
+    df["name"] = df["name"].astype(object)
+
+    # name 컬럼 도입 전에 적재된 기준일만 종목 사전의 최신 이름으로 채운다
+    unnamed = df["name"].isna()
+    if unnamed.any():
+        names = load_ticker_dictionary(root).set_index("ticker")["name"]
+        df.loc[unnamed, "name"] = df.loc[unnamed, "ticker"].map(names)
+    df = df.sort_values([PARTITION_COLUMN, "market", "ticker"]).reset_index(drop=True)
+    return df[["market", "ticker", "name", PARTITION_COLUMN, *value_columns]]
+
+
+def load_snapshot(
+    base_date: str,
+    root: str | Path = DEFAULT_SNAPSHOT_WAREHOUSE_DIR,
+) -> pd.DataFrame:
+    df = load_snapshot_panel(base_date, base_date, root=root)
+    if df.empty:
+        raise FileNotFoundError(f"스냅샷 저장소에 {base_date} 데이터가 없습니다: {root}")
+    return df[SNAPSHOT_COLUMNS]
+
+
+def load_wide_panel(
+    start: str,
+    end: str,
+    value: str = "market_cap",
+    root: str | Path = DEFAULT_SNAPSHOT_WAREHOUSE_DIR,
+    markets: Iterable[str] | None = None,
+    tickers: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    long = load_snapshot_panel(start, end, root=root, markets=markets, tickers=tickers, columns=[value])
+    wide = long.pivot(index=PARTITION_COLUMN, columns="ticker", values=value)
+    wide.index = pd.to_datetime(wide.index, format="%Y%m%d")
+    return wide.sort_index()
+
+
+def read_snapshot_file(path: str | Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={"ticker": str, PARTITION_COLUMN: str})
+    return df
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="기존 market_snapshot CSV/parquet 파일을 스냅샷 저장소에 적재합니다."
+    )
+    parser.add_argument("paths", nargs="+", help="적재할 market_snapshot_YYYYMMDD.csv/.parquet 경로")
+    parser.add_argument("--warehouse", default=str(DEFAULT_SNAPSHOT_WAREHOUSE_DIR))
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    for path in args.paths:
+        written = write_snapshot(read_snapshot_file(path), args.warehouse)
+        print(f"loaded: {path} -> {len(written)} partitions")
+    print(f"dates: {available_dates(args.warehouse)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# management_stock 스크립트는 형제 모듈을 모듈명으로 바로 import 하므로 같은 경로를 잡아 준다
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
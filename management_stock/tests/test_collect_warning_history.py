@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from collect_warning_history import ERROR_COLUMNS, RESULT_COLUMNS, HistoryWriter, load_errors, load_progress
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def history(ticker: str, base_date: str = "20260309") -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "market": "KOSDAQ",
+                "ticker": ticker,
+                "name": ticker,
+                "base_date": base_date,
+                "close_price": 1_000,
+                "listed_shares": 10_000,
+                "market_cap": 10_000_000,
+                "threshold": 20_000_000_000,
+                "risk_level": "위험",
+            }
+        ]
+    )
+
+
+def error(ticker: str) -> dict:
+    return {
+        "market": "KOSDAQ",
+        "ticker": ticker,
+        "name": ticker,
+        "base_date": "20260309",
+        "error_type": "RuntimeError",
+        "error_message": "boom",
+    }
+
+
+def make_writer(tmp_path: Path, clock: FakeClock, flush_every: int, flush_seconds: float) -> HistoryWriter:
+    return HistoryWriter(
+        pd.DataFrame(columns=RESULT_COLUMNS),
+        pd.DataFrame(columns=ERROR_COLUMNS),
+        tmp_path / "history.progress.parquet",
+        tmp_path / "history.errors.parquet",
+        flush_every=flush_every,
+        flush_seconds=flush_seconds,
+        clock=clock,
+    )
+
+
+def test_history_writer_flushes_by_pending_count(tmp_path: Path) -> None:
+    writer = make_writer(tmp_path, FakeClock(), flush_every=3, flush_seconds=1_000)
+
+    writer.add_history(history("000001"))
+    writer.add_error(error("000002"))
+    assert not writer.progress_path.exists()
+    assert not writer.error_path.exists()
+
+    writer.add_history(history("000003"))
+
+    assert load_progress(writer.progress_path)["ticker"].tolist() == ["000001", "000003"]
+    assert load_errors(writer.error_path)["ticker"].tolist() == ["000002"]
+
+    writer.add_history(history("000004"))
+    assert load_progress(writer.progress_path)["ticker"].tolist() == ["000001", "000003"]
+
+
+def test_history_writer_flushes_by_elapsed_time(tmp_path: Path) -> None:
+    clock = FakeClock()
+    writer = make_writer(tmp_path, clock, flush_every=100, flush_seconds=30)
+
+    clock.now = 29.9
+    writer.add_history(history("000001"))
+    assert not writer.progress_path.exists()
+
+    clock.now = 30.0
+    writer.add_history(history("000002"))
+    assert load_progress(writer.progress_path)["ticker"].tolist() == ["000001", "000002"]
+
+    clock.now = 59.0
+    writer.add_history(history("000003"))
+    assert len(load_progress(writer.progress_path)) == 2
+
+    clock.now = 60.0
+    writer.add_history(history("000004"))
+    assert len(load_progress(writer.progress_path)) == 4
+
+
+def test_history_writer_final_flush_writes_the_remainder(tmp_path: Path) -> None:
+    writer = make_writer(tmp_path, FakeClock(), flush_every=100, flush_seconds=1_000)
+
+    writer.add_history(history("000001"))
+    writer.add_error(error("000002"))
+    writer.flush()
+
+    assert writer.progress_df["ticker"].tolist() == ["000001"]
+    assert load_progress(writer.progress_path)["ticker"].tolist() == ["000001"]
+    assert load_errors(writer.error_path)["ticker"].tolist() == ["000002"]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from delisting_clock import (
+    CURE_TRADING_DAYS,
+    CURE_WINDOW_TRADING_DAYS,
+    DESIGNATION_TRADING_DAYS,
+    DelistingClock,
+    simulate_delisting_clock,
+)
+
+BELOW = np.array([True])
+ABOVE = np.array([False])
+VALID = np.array([True])
+
+
+def advance(clock: DelistingClock, below: np.ndarray, days: int, valid: np.ndarray = VALID) -> None:
+    for _ in range(days):
+        clock.advance(below, valid)
+
+
+def designated_clock() -> DelistingClock:
+    clock = DelistingClock((1,))
+    advance(clock, BELOW, DESIGNATION_TRADING_DAYS)
+    return clock
+
+
+def test_designation_happens_on_the_thirtieth_breach_day() -> None:
+    clock = DelistingClock((1,))
+
+    advance(clock, BELOW, DESIGNATION_TRADING_DAYS - 1)
+    assert clock.state().tolist() == ["정상"]
+
+    clock.advance(BELOW, VALID)
+    assert clock.state().tolist() == ["관리종목"]
+    assert clock.designated_at.tolist() == [DESIGNATION_TRADING_DAYS - 1]
+    assert clock.first_designated_at.tolist() == [DESIGNATION_TRADING_DAYS - 1]
+
+
+def test_breach_run_resets_on_a_recovered_day() -> None:
+    clock = DelistingClock((1,))
+
+    advance(clock, BELOW, DESIGNATION_TRADING_DAYS - 1)
+    clock.advance(ABOVE, VALID)
+    advance(clock, BELOW, DESIGNATION_TRADING_DAYS - 1)
+
+    assert clock.state().tolist() == ["정상"]
+    assert clock.breach_run.tolist() == [DESIGNATION_TRADING_DAYS - 1]
+
+
+def test_designation_is_released_after_forty_five_recovery_days() -> None:
+    clock = designated_clock()
+
+    advance(clock, ABOVE, CURE_TRADING_DAYS - 1)
+    assert clock.state().tolist() == ["관리종목"]
+    assert clock.recovery_run.tolist() == [CURE_TRADING_DAYS - 1]
+
+    clock.advance(ABOVE, VALID)
+    assert clock.state().tolist() == ["정상"]
+    assert clock.designated_at.tolist() == [-1]
+    assert clock.breach_run.tolist() == [0]
+    assert clock.recovery_run.tolist() == [0]
+    assert clock.first_designated_at.tolist() == [DESIGNATION_TRADING_DAYS - 1]
+
+
+def test_delisting_happens_when_the_cure_window_expires() -> None:
+    clock = designated_clock()
+
+    advance(clock, BELOW, CURE_WINDOW_TRADING_DAYS - 1)
+    assert clock.state().tolist() == ["관리종목"]
+
+    clock.advance(BELOW, VALID)
+    assert clock.state().tolist() == ["상장폐지"]
+    assert clock.delisted_at.tolist() == [DESIGNATION_TRADING_DAYS - 1 + CURE_WINDOW_TRADING_DAYS]
+
+
+def test_days_without_data_leave_counters_unchanged() -> None:
+    clock = DelistingClock((2,))
+    advance(clock, np.array([True, True]), 10, valid=np.array([True, True]))
+    designated = designated_clock()
+    advance(designated, ABOVE, 5)
+
+    advance(clock, np.array([False, True]), 3, valid=np.array([False, False]))
+    advance(designated, BELOW, 3, valid=np.array([False]))
+
+    assert clock.breach_run.tolist() == [10, 10]
+    assert clock.step == 13
+    assert designated.recovery_run.tolist() == [5]
+    assert designated.state().tolist() == ["관리종목"]
+
+
+def test_simulation_ignores_breaches_before_the_effective_date() -> None:
+    dates = [f"202606{day:02d}" for day in range(22, 31)] + [f"202607{day:02d}" for day in range(1, 6)]
+    panel = pd.DataFrame({"000001": 1.0, "000002": np.nan}, index=pd.Index(dates, name="base_date"))
+    panel.loc["20260703", "000001"] = np.nan
+    info = pd.DataFrame(
+        {"market": "KOSDAQ", "name": ["A", "B"], "threshold": 10.0},
+        index=pd.Index(["000001", "000002"], name="ticker"),
+    )
+
+    result = simulate_delisting_clock(panel, info, shocks=(0.0,), horizon=0, effective_date="20260701")
+
+    assert result["breach_run"].tolist() == [4, 0]
+    assert result["state"].tolist() == ["정상", "정상"]
+    assert result["market_cap"].tolist()[0] == 1.0
+    assert np.isnan(result["market_cap"].tolist()[1])
+
+
+def test_simulation_projects_days_to_designation_and_delisting() -> None:
+    dates = ["20260701", "20260702"]
+    panel = pd.DataFrame({"000001": [5.0, 5.0], "000002": [50.0, 50.0]}, index=pd.Index(dates, name="base_date"))
+    info = pd.DataFrame(
+        {"market": "KOSDAQ", "name": ["A", "B"], "threshold": 10.0},
+        index=pd.Index(["000001", "000002"], name="ticker"),
+    )
+
+    result = simulate_delisting_clock(panel, info, shocks=(0.0, -0.9), effective_date="20260701")
+
+    assert result["shock"].tolist() == [0.0, 0.0, -0.9, -0.9]
+    days_to_designation = result["days_to_designation"].tolist()
+    assert days_to_designation[0] == DESIGNATION_TRADING_DAYS - 2
+    assert np.isnan(days_to_designation[1])
+    assert days_to_designation[2:] == [DESIGNATION_TRADING_DAYS - 2, DESIGNATION_TRADING_DAYS]
+    assert result["days_to_delisting"].tolist()[0] == DESIGNATION_TRADING_DAYS - 2 + CURE_WINDOW_TRADING_DAYS
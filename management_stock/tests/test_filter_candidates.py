@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from filter_candidates import (
+    CANDIDATE_RULES,
+    CAUTION_RATIO,
+    THRESHOLDS,
+    WARNING_RATIO,
+    build_candidates,
+    classify_risk_band,
+)
+
+
+def snapshot(*rows: tuple[str, str, int, int]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "market": market,
+                "ticker": ticker,
+                "name": f"종목{ticker}",
+                "base_date": "20260309",
+                "close_price": close,
+                "listed_shares": 1,
+                "market_cap": market_cap,
+            }
+            for market, ticker, market_cap, close in rows
+        ]
+    )
+
+
+@pytest.mark.parametrize("market", sorted(THRESHOLDS))
+def test_classify_risk_band_boundaries_are_exclusive(market: str) -> None:
+    threshold = THRESHOLDS[market]
+    warning_upper = round(threshold * WARNING_RATIO)
+    caution_upper = round(threshold * CAUTION_RATIO)
+    caps = [threshold - 1, threshold, warning_upper - 1, warning_upper, caution_upper - 1, caution_upper]
+    df = snapshot(*((market, f"{i:06d}", cap, 5_000) for i, cap in enumerate(caps)))
+
+    assert classify_risk_band(df).tolist() == ["위험", "경고", "경고", "주의", "주의", None]
+
+
+def test_classify_risk_band_leaves_unknown_markets_unlabelled() -> None:
+    df = snapshot(("KONEX", "000001", 1, 5_000))
+
+    assert classify_risk_band(df).tolist() == [None]
+
+
+def test_candidate_rules_split_the_bands() -> None:
+    threshold = THRESHOLDS["KOSDAQ"]
+    df = snapshot(
+        ("KOSDAQ", "000001", threshold - 1, 5_000),
+        ("KOSDAQ", "000002", round(threshold * WARNING_RATIO) - 1, 5_000),
+        ("KOSDAQ", "000003", round(threshold * WARNING_RATIO), 999),
+        ("KOSDAQ", "000004", round(threshold * CAUTION_RATIO), 1_000),
+    )
+
+    candidates = build_candidates(df)
+
+    assert list(candidates) == list(CANDIDATE_RULES)
+    assert candidates["warning_candidates"][["ticker", "risk_level"]].values.tolist() == [
+        ["000002", "경고"],
+        ["000001", "위험"],
+    ]
+    assert candidates["caution_candidates"]["ticker"].tolist() == ["000003"]
+    assert candidates["penny_stock_candidates"]["ticker"].tolist() == ["000003"]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from listed_shares_store import (
+    empty_listed_shares_frame,
+    fresh_listed_shares,
+    load_listed_shares,
+    record_listed_shares,
+    save_listed_shares,
+)
+
+
+def store(*rows: tuple[str, int, str, str]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["ticker", "listed_shares", "valid_from", "checked_at"])
+
+
+def test_fresh_listed_shares_uses_the_row_valid_on_base_date() -> None:
+    df = store(
+        ("000001", 100, "20260101", "20260301"),
+        ("000001", 150, "20260305", "20260305"),
+    )
+
+    assert fresh_listed_shares(df, "20260304") == {"000001": 100}
+    assert fresh_listed_shares(df, "20260305") == {"000001": 150}
+    assert fresh_listed_shares(df, "20251231") == {}
+
+
+def test_fresh_listed_shares_refresh_window_is_inclusive() -> None:
+    df = store(("000001", 100, "20260101", "20260301"))
+
+    assert fresh_listed_shares(df, "20260308", refresh_days=7) == {"000001": 100}
+    assert fresh_listed_shares(df, "20260309", refresh_days=7) == {}
+    assert fresh_listed_shares(df, "20260301", refresh_days=0) == {"000001": 100}
+
+
+def test_fresh_listed_shares_skips_forced_refresh_tickers() -> None:
+    df = store(
+        ("000001", 100, "20260101", "20260305"),
+        ("000002", 200, "20260101", "20260305"),
+    )
+
+    assert fresh_listed_shares(df, "20260305", refresh_tickers=["000002"]) == {"000001": 100}
+
+
+def test_record_listed_shares_touches_unchanged_and_opens_changed_rows() -> None:
+    df = store(
+        ("000001", 100, "20260101", "20260101"),
+        ("000002", 200, "20260101", "20260101"),
+    )
+    observations = pd.DataFrame({"ticker": ["000001", "000002", "000003"], "listed_shares": [100, 250, 300]})
+
+    updated, changed = record_listed_shares(df, observations, "20260310")
+
+    assert changed == ["000002"]
+    assert updated.values.tolist() == [
+        ["000001", 100, "20260101", "20260310"],
+        ["000002", 200, "20260101", "20260101"],
+        ["000002", 250, "20260310", "20260310"],
+        ["000003", 300, "20260310", "20260310"],
+    ]
+    assert fresh_listed_shares(updated, "20260315") == {"000001": 100, "000002": 250, "000003": 300}
+
+
+def test_listed_shares_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "listed_shares.parquet"
+    assert load_listed_shares(path).empty
+    assert list(load_listed_shares(path).columns) == list(empty_listed_shares_frame().columns)
+
+    df = store(("1", 100, "20260101", "20260101"))
+    save_listed_shares(df, path)
+
+    assert load_listed_shares(path)["ticker"].tolist() == ["000001"]
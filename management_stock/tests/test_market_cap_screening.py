@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from market_cap_screening import DESIGNATION_TRADING_DAYS, analyze_trend_panel, trailing_breach_runs
+
+THRESHOLD = 100
+
+
+def panel(**columns: list[float]) -> pd.DataFrame:
+    length = len(next(iter(columns.values())))
+    return pd.DataFrame(columns, index=pd.bdate_range("20260102", periods=length))
+
+
+def test_trailing_breach_runs_counts_from_the_first_row_and_resets() -> None:
+    below = np.array([[True, False], [True, False], [False, True], [True, True]])
+
+    runs = trailing_breach_runs(below)
+
+    assert runs[:, 0].tolist() == [1, 2, 0, 1]
+    assert runs[:, 1].tolist() == [0, 0, 1, 2]
+
+
+def test_analyze_trend_panel_run_at_window_edges() -> None:
+    result = analyze_trend_panel(
+        panel(
+            START=[50, 50, 50, 150, 150],
+            END=[150, 150, 50, 50, 50],
+            ALL=[50, 50, 50, 50, 50],
+            NONE=[150, 150, 150, 150, 150],
+        ),
+        THRESHOLD,
+    )
+
+    assert result["연속미달일"].tolist() == [0, 3, 5, 0]
+    assert result["최장연속미달일"].tolist() == [3, 3, 5, 0]
+    assert result["지정잔여거래일"].tolist() == [
+        DESIGNATION_TRADING_DAYS,
+        DESIGNATION_TRADING_DAYS - 3,
+        DESIGNATION_TRADING_DAYS - 5,
+        DESIGNATION_TRADING_DAYS,
+    ]
+
+
+def test_analyze_trend_panel_threshold_equal_is_not_a_breach_and_nan_breaks_the_run() -> None:
+    result = analyze_trend_panel(
+        panel(
+            EQUAL=[100, 100, 100],
+            GAP=[50, np.nan, 50],
+            LEADING_NAN=[np.nan, 50, 50],
+        ),
+        THRESHOLD,
+    )
+
+    assert result["연속미달일"].tolist() == [0, 1, 2]
+    assert result["최장연속미달일"].tolist() == [0, 1, 2]
+
+
+def test_analyze_trend_panel_remaining_days_floor_at_zero() -> None:
+    days = DESIGNATION_TRADING_DAYS + 5
+    result = analyze_trend_panel(panel(LONG=[50] * days, EXACT=[150] * 5 + [50] * DESIGNATION_TRADING_DAYS), THRESHOLD)
+
+    assert result["연속미달일"].tolist() == [days, DESIGNATION_TRADING_DAYS]
+    assert result["지정잔여거래일"].tolist() == [0, 0]
+
+
+def test_analyze_trend_panel_change_uses_first_and_last_valid_values() -> None:
+    result = analyze_trend_panel(
+        panel(
+            DOWN=[np.nan, 200, 150, 100, np.nan],
+            FLAT=[100, 100, 100, 100, 105],
+            UP=[100, 100, 120, 120, 120],
+            EMPTY=[np.nan] * 5,
+        ),
+        THRESHOLD,
+    )
+
+    assert result["추세"].tolist() == ["하락", "보합", "상승", "데이터없음"]
+    assert result.loc["DOWN", "60일대비(%)"] == -50.0
+    assert np.isnan(result.loc["EMPTY", "60일대비(%)"])
+    assert analyze_trend_panel(pd.DataFrame(), THRESHOLD).empty
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import market_snapshot
+from market_snapshot import apply_bulk_snapshot, empty_error_frame, empty_snapshot_frame, get_market_snapshot
+
+BASE_DATE = "20260309"
+TICKERS = pd.DataFrame(
+    [
+        {"market": "KOSDAQ", "ticker": "000001", "name": "A", "isin": "KR1"},
+        {"market": "KOSDAQ", "ticker": "000002", "name": "B", "isin": "KR2"},
+        {"market": "KOSDAQ", "ticker": "000003", "name": "C", "isin": "KR3"},
+        {"market": "KOSPI", "ticker": "000004", "name": "D", "isin": "KR4"},
+    ]
+)
+CLOSES = {"000001": 1_000, "000002": 2_500, "000003": 700}
+SHARES = {"000001": 10_000, "000002": 3_000, "000003": 50_000}
+
+
+@pytest.fixture
+def fake_market(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    per_ticker_calls: list[str] = []
+
+    def close_price(ticker: str, base_date: str) -> int:
+        per_ticker_calls.append(ticker)
+        return CLOSES[ticker]
+
+    monkeypatch.setattr(market_snapshot, "get_close_price_on_date", close_price)
+    monkeypatch.setattr(
+        market_snapshot,
+        "parse_current_naver_snapshot",
+        lambda ticker, session: {"listed_shares": SHARES[ticker]},
+    )
+    return per_ticker_calls
+
+
+def run_snapshot(tmp_path: Path, mode: str) -> pd.DataFrame:
+    return get_market_snapshot(
+        TICKERS,
+        empty_snapshot_frame(),
+        tmp_path / f"{mode}.progress.parquet",
+        empty_error_frame(),
+        tmp_path / f"{mode}.errors.parquet",
+        "KOSDAQ",
+        base_date=BASE_DATE,
+        mode=mode,
+    )
+
+
+def test_bulk_and_ticker_modes_produce_the_same_snapshot(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fake_market: list[str]
+) -> None:
+    bulk = pd.DataFrame(
+        {
+            "ticker": list(CLOSES),
+            "close_price": list(CLOSES.values()),
+            "listed_shares": [SHARES[ticker] for ticker in CLOSES],
+        }
+    )
+    monkeypatch.setattr(market_snapshot, "get_bulk_market_frame", lambda market, base_date: bulk)
+
+    ticker_result = run_snapshot(tmp_path, "ticker")
+    fake_market.clear()
+    bulk_result = run_snapshot(tmp_path, "bulk")
+
+    assert fake_market == []
+    pd.testing.assert_frame_equal(bulk_result, ticker_result, check_dtype=False)
+    assert ticker_result["market_cap"].tolist() == [10_000_000, 7_500_000, 35_000_000]
+
+
+def test_bulk_mode_falls_back_per_ticker_for_missing_rows_and_failures(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fake_market: list[str]
+) -> None:
+    bulk = pd.DataFrame({"ticker": ["000001"], "close_price": [1_000], "listed_shares": [10_000]})
+    monkeypatch.setattr(market_snapshot, "get_bulk_market_frame", lambda market, base_date: bulk)
+
+    partial = run_snapshot(tmp_path, "bulk")
+
+    assert fake_market == ["000002", "000003"]
+    pd.testing.assert_frame_equal(partial, run_snapshot(tmp_path, "ticker"), check_dtype=False)
+
+    def broken(market: str, base_date: str) -> pd.DataFrame:
+        raise RuntimeError("krx down")
+
+    monkeypatch.setattr(market_snapshot, "get_bulk_market_frame", broken)
+    fake_market.clear()
+    (tmp_path / "bulk.progress.parquet").unlink()
+
+    fallback = run_snapshot(tmp_path, "bulk")
+
+    assert fake_market == ["000001", "000002", "000003"]
+    pd.testing.assert_frame_equal(fallback, partial, check_dtype=False)
+
+
+def test_apply_bulk_snapshot_leaves_unmatched_tickers_pending() -> None:
+    pending = TICKERS.loc[TICKERS["market"] == "KOSDAQ", ["market", "ticker", "name"]]
+    bulk = pd.DataFrame({"ticker": ["000002"], "close_price": [2_500], "listed_shares": [3_000]})
+
+    rows, remaining = apply_bulk_snapshot(pending, bulk, "KOSDAQ", BASE_DATE)
+
+    assert rows.to_dict("records") == [
+        {
+            "market": "KOSDAQ",
+            "ticker": "000002",
+            "name": "B",
+            "base_date": BASE_DATE,
+            "close_price": 2_500,
+            "listed_shares": 3_000,
+            "market_cap": 7_500_000,
+        }
+    ]
+    assert remaining["ticker"].tolist() == ["000001", "000003"]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from ohlcv_store import COVERAGE_FILE, OHLCV_COLUMNS, OhlcvStore, merge_ranges
+
+
+class FakeFetcher:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str, str]] = []
+
+    def __call__(self, from_date: str, to_date: str, ticker: str) -> pd.DataFrame:
+        self.calls.append((from_date, to_date, ticker))
+        dates = pd.bdate_range(from_date, to_date)
+        return pd.DataFrame({column: range(1, len(dates) + 1) for column in OHLCV_COLUMNS}, index=dates)
+
+
+def test_merge_ranges_joins_overlapping_and_adjacent_ranges() -> None:
+    ranges = [("20240301", "20240331"), ("20240101", "20240131"), ("20240120", "20240210"), ("20240211", "20240215")]
+
+    assert merge_ranges(ranges) == [("20240101", "20240215"), ("20240301", "20240331")]
+
+
+def test_missing_ranges_returns_leading_interior_and_trailing_gaps(tmp_path: Path) -> None:
+    store = OhlcvStore(tmp_path)
+    store.save_coverage("KOSDAQ", "000001", [("20240201", "20240229"), ("20240401", "20240430")])
+
+    assert store.missing_ranges("KOSDAQ", "000001", "20240101", "20240531") == [
+        ("20240101", "20240131"),
+        ("20240301", "20240331"),
+        ("20240501", "20240531"),
+    ]
+    assert store.missing_ranges("KOSDAQ", "000001", "20240210", "20240220") == []
+    assert store.missing_ranges("KOSDAQ", "000001", "20240215", "20240415") == [("20240301", "20240331")]
+    assert store.missing_ranges("KOSDAQ", "000002", "20240101", "20240131") == [("20240101", "20240131")]
+
+
+def test_get_history_refetches_an_interior_hole_only(tmp_path: Path) -> None:
+    fetch = FakeFetcher()
+    store = OhlcvStore(tmp_path, fetch=fetch)
+
+    store.get_history("KOSDAQ", "000001", "20240101", "20240131")
+    store.get_history("KOSDAQ", "000001", "20240301", "20240331")
+    history = store.get_history("KOSDAQ", "000001", "20240101", "20240331")
+
+    assert fetch.calls == [
+        ("20240101", "20240131", "000001"),
+        ("20240301", "20240331", "000001"),
+        ("20240201", "20240229", "000001"),
+    ]
+    assert len(history) == len(pd.bdate_range("20240101", "20240331"))
+    assert store.load_coverage("KOSDAQ", "000001") == [("20240101", "20240331")]
+
+    store.get_history("KOSDAQ", "000001", "20240115", "20240315")
+    assert len(fetch.calls) == 3
+
+
+def test_get_history_fetches_each_gap_around_overlapping_coverage(tmp_path: Path) -> None:
+    fetch = FakeFetcher()
+    store = OhlcvStore(tmp_path, fetch=fetch)
+
+    store.get_history("KOSDAQ", "000001", "20240110", "20240120")
+    store.get_history("KOSDAQ", "000001", "20240115", "20240210")
+    store.get_history("KOSDAQ", "000001", "20240101", "20240220")
+
+    assert fetch.calls == [
+        ("20240110", "20240120", "000001"),
+        ("20240121", "20240210", "000001"),
+        ("20240101", "20240109", "000001"),
+        ("20240211", "20240220", "000001"),
+    ]
+    assert store.load_coverage("KOSDAQ", "000001") == [("20240101", "20240220")]
+
+
+def test_load_coverage_reads_legacy_start_end_file(tmp_path: Path) -> None:
+    store = OhlcvStore(tmp_path)
+    path = store.ticker_dir("KOSDAQ", "000001") / COVERAGE_FILE
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"start": "20240101", "end": "20240131"}), encoding="utf-8")
+
+    assert store.missing_ranges("KOSDAQ", "000001", "20240101", "20240210") == [("20240201", "20240210")]
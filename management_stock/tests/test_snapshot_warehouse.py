@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from snapshot_warehouse import (
+    available_dates,
+    load_snapshot,
+    load_snapshot_panel,
+    load_ticker_dictionary,
+    load_wide_panel,
+    partition_path,
+    write_snapshot,
+)
+
+
+def snapshot(base_date: str, *rows: tuple[str, str, str, int]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "market": market,
+                "ticker": ticker,
+                "name": name,
+                "base_date": base_date,
+                "close_price": close,
+                "listed_shares": 10,
+                "market_cap": close * 10,
+            }
+            for market, ticker, name, close in rows
+        ]
+    )
+
+
+def test_write_snapshot_merges_reloads_into_the_same_partition(tmp_path: Path) -> None:
+    write_snapshot(snapshot("20260101", ("KOSDAQ", "000001", "A", 100), ("KOSDAQ", "000002", "B", 200)), tmp_path)
+    write_snapshot(snapshot("20260101", ("KOSPI", "000003", "C", 300), ("KOSDAQ", "000002", "B", 250)), tmp_path)
+
+    df = load_snapshot("20260101", tmp_path)
+
+    assert df["ticker"].tolist() == ["000001", "000002", "000003"]
+    assert df["close_price"].tolist() == [100, 250, 300]
+    assert df["market"].tolist() == ["KOSDAQ", "KOSDAQ", "KOSPI"]
+    assert available_dates(tmp_path) == ["20260101"]
+
+
+def test_load_snapshot_panel_keeps_the_name_of_each_date(tmp_path: Path) -> None:
+    write_snapshot(snapshot("20260101", ("KOSDAQ", "000002", "B", 100)), tmp_path)
+    write_snapshot(snapshot("20260102", ("KOSDAQ", "000002", "B2", 110)), tmp_path)
+
+    df = load_snapshot_panel("20260101", "20260102", tmp_path)
+
+    assert df["name"].tolist() == ["B", "B2"]
+    dictionary = load_ticker_dictionary(tmp_path)
+    assert dictionary[["name", "first_seen", "last_seen"]].values.tolist() == [["B2", "20260101", "20260102"]]
+
+
+def test_load_snapshot_panel_fills_names_of_partitions_written_without_them(tmp_path: Path) -> None:
+    write_snapshot(snapshot("20260102", ("KOSDAQ", "000002", "B2", 110)), tmp_path)
+    legacy = pa.table(
+        {
+            "market": pa.array(["KOSDAQ"]).dictionary_encode(),
+            "ticker": ["000002"],
+            "close_price": [100],
+            "listed_shares": [10],
+            "market_cap": [1_000],
+        }
+    )
+    path = partition_path(tmp_path, "20260101")
+    path.parent.mkdir(parents=True)
+    pq.write_table(legacy, path)
+
+    df = load_snapshot_panel("20260101", "20260102", tmp_path)
+
+    assert df["name"].tolist() == ["B2", "B2"]
+    assert df["close_price"].tolist() == [100, 110]
+
+
+def test_load_panels_filter_by_date_market_and_ticker(tmp_path: Path) -> None:
+    for day, close in (("20260101", 100), ("20260102", 110), ("20260105", 120)):
+        write_snapshot(
+            snapshot(day, ("KOSDAQ", "000001", "A", close), ("KOSPI", "000002", "B", close * 2)),
+            tmp_path,
+        )
+
+    long = load_snapshot_panel("20260102", "20260105", tmp_path, markets=["KOSPI"], columns=["close_price"])
+    assert list(long.columns) == ["market", "ticker", "name", "base_date", "close_price"]
+    assert long[["ticker", "base_date", "close_price"]].values.tolist() == [
+        ["000002", "20260102", 220],
+        ["000002", "20260105", 240],
+    ]
+
+    wide = load_wide_panel("20260101", "20260102", root=tmp_path, tickers=[1])
+    assert list(wide.columns) == ["000001"]
+    assert wide.index.tolist() == [pd.Timestamp("2026-01-01"), pd.Timestamp("2026-01-02")]
+    assert wide["000001"].tolist() == [1_000, 1_100]
+
+    assert load_snapshot_panel("20260101", "20260105", tmp_path / "missing").empty
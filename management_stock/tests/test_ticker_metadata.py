@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from ticker_metadata import excluded_name_mask, load_ticker_metadata, ticker_metadata_path
+
+
+class FakeListing:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self) -> pd.DataFrame:
+        self.calls += 1
+        return pd.DataFrame(
+            {"market": ["KOSDAQ"], "ticker": ["000001"], "name": [f"A{self.calls}"], "isin": ["KR1"]}
+        )
+
+
+def test_load_ticker_metadata_caches_by_fetch_date(tmp_path: Path) -> None:
+    fetch = FakeListing()
+
+    first = load_ticker_metadata(tmp_path, fetch=fetch, fetched_on="20260310")
+    again = load_ticker_metadata(tmp_path, fetch=fetch, fetched_on="20260310")
+    next_day = load_ticker_metadata(tmp_path, fetch=fetch, fetched_on="20260311")
+
+    assert fetch.calls == 2
+    assert first["name"].tolist() == again["name"].tolist() == ["A1"]
+    assert next_day["name"].tolist() == ["A2"]
+    assert ticker_metadata_path(tmp_path, "20260310").exists()
+    assert ticker_metadata_path(tmp_path, "20260311").exists()
+
+
+def test_excluded_name_mask_matches_keywords_and_ignores_missing_names() -> None:
+    names = pd.Series(["삼성전자", "KODEX 200 ETF", "하나스팩10호", None])
+
+    assert excluded_name_mask(names).tolist() == [False, True, True, False]
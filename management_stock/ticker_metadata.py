@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+DEFAULT_TICKER_METADATA_DIR = Path("management_stock/data/ticker_metadata")
+METADATA_COLUMNS = ["market", "ticker", "name", "isin"]
+MARKET_NAMES = {
+    "STK": "KOSPI",
+    "KSQ": "KOSDAQ",
+    "KNX": "KONEX",
+}
+EXCLUDE_KEYWORDS = ("SPAC", "스팩", "ETF", "ETN", "리츠", "REIT")
+EXCLUDE_PATTERN = re.compile("|".join(re.escape(keyword) for keyword in EXCLUDE_KEYWORDS))
+
+
+def fetch_listed_metadata() -> pd.DataFrame:
+    from pykrx.website.krx.market.ticker import StockTicker
+
+    listed = StockTicker().listed
+    df = listed.reset_index(names="ticker")
+    df = df.rename(columns={"종목": "name", "ISIN": "isin"})
+    df["market"] = df["시장"].map(MARKET_NAMES)
+    df = df.loc[df["market"].notna(), METADATA_COLUMNS].copy()
+    df["ticker"] = df["ticker"].astype(str).str.zfill(6)
+    return df.reset_index(drop=True)
+
+
+def ticker_metadata_path(cache_dir: str | Path, fetched_on: str) -> Path:
+    return Path(cache_dir) / f"ticker_metadata_{fetched_on}.parquet"
+
+
+# KRX 상장종목 목록은 조회 시점 기준이라 과거 기준일의 목록을 받을 수 없다.
+# 캐시는 조회한 날짜로 저장하며, 과거 기준일 분석에도 오늘 목록이 쓰인다.
+def load_ticker_metadata(
+    cache_dir: str | Path = DEFAULT_TICKER_METADATA_DIR,
+    fetch: Callable[[], pd.DataFrame] = fetch_listed_metadata,
+    fetched_on: str | None = None,
+) -> pd.DataFrame:
+    fetched_on = fetched_on or datetime.now().strftime("%Y%m%d")
+    path = ticker_metadata_path(cache_dir, fetched_on)
+    if path.exists():
+        df = pd.read_parquet(path)
+        df["ticker"] = df["ticker"].astype(str).str.zfill(6)
+        return df[METADATA_COLUMNS]
+
+    df = fetch()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df[METADATA_COLUMNS].to_parquet(path, index=False)
+    return df[METADATA_COLUMNS]
+
+
+def excluded_name_mask(names: pd.Series) -> pd.Series:
+    return names.fillna("").astype(str).str.contains(EXCLUDE_PATTERN)
@@ -0,0 +1 @@
+"""Helpers shared by the zombie package and the standalone scripts."""
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterator
+
+
+def run_fetch_tasks(
+    tasks: Iterator[tuple[Any, int]],
+    fetch_task: Callable[[Any, int], Any],
+    workers: int,
+) -> Iterator[tuple[Any, int, Future]]:
+    workers = max(1, int(workers))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight: dict[Future, tuple[Any, int]] = {}
+
+        def submit_next() -> bool:
+            try:
+                company, year = next(tasks)
+            except StopIteration:
+                return False
+            in_flight[executor.submit(fetch_task, company, year)] = (company, year)
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                company, year = in_flight.pop(future)
+                yield company, year, future
+                submit_next()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+_TOKEN_EPSILON = 1e-9
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.rate_per_second = float(rate_per_second)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate_per_second)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._paused_until = 0.0
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, **kwargs) -> TokenBucket:
+        return cls(requests_per_minute / 60.0, **kwargs)
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens + _TOKEN_EPSILON >= tokens:
+                        self._tokens = max(0.0, self._tokens - tokens)
+                        return waited
+                    delay = (tokens - self._tokens) / self.rate_per_second
+            self._sleep(delay)
+            waited += delay
+
+    def backoff(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated_at = self._paused_until
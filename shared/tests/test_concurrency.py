@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from shared.concurrency import run_fetch_tasks
+
+
+def test_run_fetch_tasks_yields_every_task_with_its_result() -> None:
+    tasks = iter([({"corp_code": f"C{index}"}, 2024) for index in range(7)])
+
+    def fetch_task(company: dict, year: int) -> str:
+        if company["corp_code"] == "C3":
+            raise ValueError("boom")
+        return f"{company['corp_code']}-{year}"
+
+    results = {}
+    for company, year, future in run_fetch_tasks(tasks, fetch_task, workers=3):
+        results[company["corp_code"]] = future.exception() or future.result()
+
+    assert len(results) == 7
+    assert results["C0"] == "C0-2024"
+    assert isinstance(results["C3"], ValueError)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from shared.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces_requests() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, pytest.approx(0.5), pytest.approx(0.5)]
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_backoff_pauses_all_callers() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(10.0, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+
+    bucket.backoff(4.0)
+    waited = bucket.acquire()
+
+    assert waited == pytest.approx(4.1)
+    assert clock.now == pytest.approx(4.1)
+
+
+def test_token_bucket_per_minute_converts_rate() -> None:
+    bucket = TokenBucket.per_minute(900)
+
+    assert bucket.rate_per_second == pytest.approx(15.0)
+    assert bucket.capacity == pytest.approx(15.0)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from zombie.common_io import DEFAULT_INPUT_PATH, load_input_universe
+from zombie.wisereport_fetcher import build_session, fetch_overview_page_with_retries
+from zombie.wisereport_parser import parse_quote_snapshot
+
+DEFAULT_QUOTE_PAGES_DIR = Path("zombie/data/quote_pages")
+DEFAULT_QUOTE_PASS_SIZE = 2500
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark parse_quote_snapshot over saved WiseReport overview pages.")
+    parser.add_argument("--pages-dir", type=Path, default=DEFAULT_QUOTE_PAGES_DIR)
+    parser.add_argument("--fetch", type=int, default=0, help="Save this many overview pages from the input universe first.")
+    parser.add_argument("--input-path", type=Path, default=DEFAULT_INPUT_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stocks", type=int, default=DEFAULT_QUOTE_PASS_SIZE)
+    parser.add_argument("--timeout", type=float, default=20.0)
+    return parser.parse_args()
+
+
+def save_sample_pages(pages_dir: Path, input_path: Path, count: int, timeout: float) -> int:
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    universe_df = load_input_universe(input_path).head(count)
+    session = build_session()
+    saved = 0
+    for stock_code in universe_df["stock_code"]:
+        page_path = pages_dir / f"{stock_code}.html"
+        if page_path.exists():
+            saved += 1
+            continue
+        try:
+            page_html = fetch_overview_page_with_retries(session=session, stock_code=stock_code, timeout=timeout)
+        except Exception as exc:
+            print(f"skip {stock_code}: {type(exc).__name__}: {exc}")
+            continue
+        page_path.write_text(page_html, encoding="utf-8")
+        saved += 1
+    return saved
+
+
+def time_pages(pages: list[tuple[str, str]], repeat: int) -> tuple[list[float], int]:
+    durations: list[float] = []
+    failures = 0
+    for _ in range(max(1, repeat)):
+        for stock_code, page_html in pages:
+            raw_row = {"market": "", "stock_code": stock_code, "corp_code": "", "name": ""}
+            started = time.perf_counter()
+            try:
+                parse_quote_snapshot(raw_row, page_html)
+            except ValueError:
+                failures += 1
+            durations.append(time.perf_counter() - started)
+    return durations, failures // max(1, repeat)
+
+
+def main() -> int:
+    args = parse_args()
+    if args.fetch > 0:
+        saved = save_sample_pages(args.pages_dir, args.input_path, args.fetch, args.timeout)
+        print(f"saved pages: {saved:,}")
+
+    page_paths = sorted(args.pages_dir.glob("*.html"))
+    if not page_paths:
+        print(f"no saved pages in {args.pages_dir}. Run with --fetch N to save sample pages first.")
+        return 1
+
+    pages = [(path.stem, path.read_text(encoding="utf-8")) for path in page_paths]
+    durations, failures = time_pages(pages, args.repeat)
+    durations_ms = sorted(duration * 1000 for duration in durations)
+    mean_ms = statistics.fmean(durations_ms)
+    p95_ms = durations_ms[min(len(durations_ms) - 1, int(len(durations_ms) * 0.95))]
+    average_kb = sum(len(page_html) for _, page_html in pages) / len(pages) / 1024
+
+    print(f"pages: {len(pages):,} (avg {average_kb:,.1f} KB), repeat: {args.repeat}, parse failures: {failures:,}")
+    print(f"per page ms: mean {mean_ms:.3f}, median {statistics.median(durations_ms):.3f}, p95 {p95_ms:.3f}")
+    print(f"projected {args.stocks:,}-stock quote pass: {mean_ms * args.stocks / 1000:.2f}s parse time")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import json
+import math
 from pathlib import Path
 from typing import Any, Iterable
 
+import numpy as np
 import pandas as pd
 
 DEFAULT_INPUT_PATH = Path("zombie/data/market_tickers_with_corp_code.csv")
@@ -73,3 +76,126 @@ def upsert_rows(existing_df: pd.DataFrame, row_df: pd.DataFrame, key_columns: li
         return row_df.drop_duplicates(subset=key_columns, keep="last").reset_index(drop=True)
     combined = pd.concat([existing_df, row_df], ignore_index=True)
     return combined.drop_duplicates(subset=key_columns, keep="last").reset_index(drop=True)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return str(value)
+
+
+def _clean_journal_value(value: Any) -> Any:
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class CheckpointStore:
+    def __init__(self, path: str | Path, columns: Iterable[str], key_columns: Iterable[str]) -> None:
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(f"{self.path.name}.journal.jsonl")
+        self.columns = tuple(columns)
+        self.key_columns = tuple(key_columns)
+        self._rows: dict[tuple[Any, ...], dict[str, Any]] = {}
+        self._journal = None
+        self._dirty = False
+        self._load()
+
+    def __enter__(self) -> CheckpointStore:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: tuple[Any, ...]) -> bool:
+        return tuple(key) in self._rows
+
+    def key_of(self, row: dict[str, Any]) -> tuple[Any, ...]:
+        return tuple(row.get(column) for column in self.key_columns)
+
+    def keys(self) -> list[tuple[Any, ...]]:
+        return list(self._rows)
+
+    def _load(self) -> None:
+        base_df = load_parquet_frame(self.path, self.columns)
+        for row in base_df.to_dict("records"):
+            self._put(row)
+        if not self.journal_path.exists():
+            return
+        valid_end = 0
+        with self.journal_path.open("rb") as journal:
+            for raw_line in journal:
+                if not raw_line.endswith(b"\n"):
+                    break
+                line = raw_line.strip()
+                if line:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if entry.get("op") == "delete":
+                        self._rows.pop(tuple(entry["key"]), None)
+                    else:
+                        self._put(entry["row"])
+                    self._dirty = True
+                valid_end += len(raw_line)
+        if valid_end < self.journal_path.stat().st_size:
+            with self.journal_path.open("r+b") as journal:
+                journal.truncate(valid_end)
+
+    def _put(self, row: dict[str, Any]) -> None:
+        normalized = {column: _clean_journal_value(row.get(column)) for column in self.columns}
+        key = self.key_of(normalized)
+        self._rows.pop(key, None)
+        self._rows[key] = normalized
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        if self._journal is None:
+            ensure_parent(self.journal_path)
+            self._journal = self.journal_path.open("a", encoding="utf-8")
+        self._journal.write(json.dumps(entry, ensure_ascii=False, default=_json_default) + "\n")
+        self._journal.flush()
+        self._dirty = True
+
+    def upsert(self, row: dict[str, Any]) -> None:
+        self._put(row)
+        key = self.key_of(row)
+        self._append({"op": "upsert", "row": self._rows[key]})
+
+    def upsert_frame(self, df: pd.DataFrame) -> None:
+        for row in df.to_dict("records"):
+            self.upsert(row)
+
+    def delete(self, key: tuple[Any, ...]) -> bool:
+        key = tuple(key)
+        if key not in self._rows:
+            return False
+        self._rows.pop(key)
+        self._append({"op": "delete", "key": list(key)})
+        return True
+
+    def to_frame(self) -> pd.DataFrame:
+        if not self._rows:
+            return pd.DataFrame(columns=list(self.columns))
+        return pd.DataFrame(list(self._rows.values()), columns=list(self.columns))
+
+    def flush(self) -> Path:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._dirty:
+            save_parquet_frame(self.to_frame(), self.path)
+            self._dirty = False
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        return self.path
+
+    def close(self) -> None:
+        self.flush()
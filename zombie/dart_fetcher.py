@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import contextlib
 import io
+import json
 import os
 import re
+import sys
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
 import pandas as pd
 import requests
@@ -16,10 +19,23 @@ DEFAULT_CHECKPOINT_DIR = Path("zombie/data/checkpoints")
 DEFAULT_PROGRESS_PATH = DEFAULT_CHECKPOINT_DIR / "fetch_progress.parquet"
 DEFAULT_ERROR_PATH = DEFAULT_CHECKPOINT_DIR / "fetch_errors.parquet"
 DEFAULT_RAW_PARQUET_PATH = DEFAULT_CHECKPOINT_DIR / "icr_extract_2022_2024_long.parquet"
+DEFAULT_CORP_CODE_INDEX_PATH = DEFAULT_CHECKPOINT_DIR / "corp_code_index.parquet"
+CORP_CODE_INDEX_VERSION = 1
+CORP_CODE_INDEX_MAX_AGE = pd.Timedelta(days=7)
+CORP_CODE_INDEX_MISS_REFRESH_AGE = pd.Timedelta(days=1)
 DEFAULT_YEARS = (2022, 2023, 2024)
 REPORT_CODE = "11011"
 API_KEY_ENV_VARS = ("DART_API_KEY", "OPEN_DART_API_KEY", "DART_FSS_API_KEY")
-
+DEFAULT_DART_REQUESTS_PER_MINUTE = 900
+DEFAULT_FETCH_WORKERS = 4
+FS_DIVS = ("CFS", "OFS")
+FS_DIV_STATUS = {"CFS": "ok_cfs", "OFS": "ok_ofs"}
+FILING_LIST_WINDOW_DAYS = 90
+ANNUAL_REPORT_KIND = "A"
+ANNUAL_REPORT_KIND_DETAIL = "A001"
+_REPORT_PERIOD_PATTERN = re.compile(r"\((\d{4})\.(\d{2})\)")
+
+from shared.rate_limiter import TokenBucket
 from zombie.common_io import (
     DEFAULT_INPUT_PATH,
     DEFAULT_MARKETS,
@@ -33,6 +49,7 @@ from zombie.common_io import (
     upsert_rows,
     utc_now,
 )
+from zombie.statement_cache import StatementCache
 
 PROGRESS_COLUMNS = (
     "market",
@@ -65,6 +82,16 @@ class FetchResult:
     source_status: str
 
 
+@dataclass(frozen=True)
+class CorpCodeIndex:
+    stock_to_corp: dict[str, str]
+    fetched_at: str
+
+    @property
+    def age(self) -> pd.Timedelta:
+        return pd.Timestamp.now("UTC") - pd.Timestamp(self.fetched_at)
+
+
 def _load_opendartreader():
     import OpenDartReader
 
@@ -103,16 +130,75 @@ def load_corp_codes_frame(
     return listed.drop_duplicates(subset=["stock_code"], keep="first").reset_index(drop=True)
 
 
+def corp_code_index_meta_path(path: str | Path) -> Path:
+    path_obj = Path(path)
+    return path_obj.with_name(f"{path_obj.stem}.meta.json")
+
+
+def load_corp_code_index(path: str | Path) -> CorpCodeIndex | None:
+    meta_path = corp_code_index_meta_path(path)
+    if not Path(path).exists() or not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("version") != CORP_CODE_INDEX_VERSION:
+        return None
+    frame = load_parquet_frame(path, ("stock_code", "corp_code"))
+    return CorpCodeIndex(stock_to_corp=dict(zip(frame["stock_code"], frame["corp_code"])), fetched_at=meta["fetched_at"])
+
+
+def save_corp_code_index(path: str | Path, mapping_frame: pd.DataFrame) -> CorpCodeIndex:
+    save_parquet_frame(mapping_frame.loc[:, ["stock_code", "corp_code"]], path)
+    fetched_at = utc_now()
+    meta = {"version": CORP_CODE_INDEX_VERSION, "fetched_at": fetched_at, "rows": len(mapping_frame)}
+    corp_code_index_meta_path(path).write_text(json.dumps(meta), encoding="utf-8")
+    stock_to_corp = dict(zip(mapping_frame["stock_code"], mapping_frame["corp_code"]))
+    return CorpCodeIndex(stock_to_corp=stock_to_corp, fetched_at=fetched_at)
+
+
+def is_corp_code_index_fresh(index: CorpCodeIndex, stock_codes: Iterable[str]) -> bool:
+    if index.age >= CORP_CODE_INDEX_MAX_AGE:
+        return False
+    unresolved = any(stock_code not in index.stock_to_corp for stock_code in stock_codes)
+    return not unresolved or index.age < CORP_CODE_INDEX_MISS_REFRESH_AGE
+
+
+def load_stock_to_corp(
+    api_key: str,
+    stock_codes: Iterable[str],
+    reader_factory: Callable[[str], Any] | None = None,
+    index_path: str | Path | None = None,
+) -> dict[str, str]:
+    if index_path is None:
+        mapping_frame = load_corp_codes_frame(api_key, reader_factory=reader_factory)
+        return dict(mapping_frame.itertuples(index=False, name=None))
+
+    index = load_corp_code_index(index_path)
+    if index is not None and is_corp_code_index_fresh(index, list(stock_codes)):
+        return index.stock_to_corp
+    try:
+        mapping_frame = load_corp_codes_frame(api_key, reader_factory=reader_factory)
+    except Exception as exc:
+        if index is None:
+            raise
+        print(f"corp_code refresh failed, using index from {index.fetched_at}: {type(exc).__name__}: {exc}")
+        return index.stock_to_corp
+    return save_corp_code_index(index_path, mapping_frame).stock_to_corp
+
+
 def resolve_corp_codes(
     universe_df: pd.DataFrame,
     api_key: str,
     reader_factory: Callable[[str], Any] | None = None,
+    index_path: str | Path | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
-    mapping_frame = load_corp_codes_frame(api_key, reader_factory=reader_factory)
-    stock_to_corp = dict(mapping_frame.itertuples(index=False, name=None))
-
     resolved = universe_df.copy()
     missing_mask = resolved["corp_code"].eq("")
+    stock_to_corp = load_stock_to_corp(
+        api_key,
+        resolved.loc[missing_mask, "stock_code"],
+        reader_factory=reader_factory,
+        index_path=index_path,
+    )
     resolved.loc[missing_mask, "corp_code"] = resolved.loc[missing_mask, "stock_code"].map(stock_to_corp).fillna("")
 
     included = resolved.loc[resolved["corp_code"] != ""].copy()
@@ -124,6 +210,14 @@ def build_reader(api_key: str):
     return _load_opendartreader()(api_key)
 
 
+def build_rate_limiter(requests_per_minute: float = DEFAULT_DART_REQUESTS_PER_MINUTE) -> TokenBucket:
+    return TokenBucket.per_minute(requests_per_minute)
+
+
+def retry_delay(attempt: int) -> float:
+    return float(min(2**attempt, 8))
+
+
 def is_retryable_exception(exc: Exception) -> bool:
     if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
         return True
@@ -132,41 +226,201 @@ def is_retryable_exception(exc: Exception) -> bool:
     return False
 
 
+class _ThreadQuietStdout(io.TextIOBase):
+    def __init__(self, target: Any) -> None:
+        self._target = target
+        self._local = threading.local()
+
+    @property
+    def quiet(self) -> bool:
+        return getattr(self._local, "quiet", False)
+
+    @quiet.setter
+    def quiet(self, value: bool) -> None:
+        self._local.quiet = value
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if self.quiet:
+            return len(text)
+        return self._target.write(text)
+
+    def flush(self) -> None:
+        self._target.flush()
+
+    @property
+    def encoding(self) -> str:
+        return self._target.encoding
+
+    def fileno(self) -> int:
+        return self._target.fileno()
+
+    def isatty(self) -> bool:
+        return self._target.isatty()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
+
+
+_STDOUT_INSTALL_LOCK = threading.Lock()
+_stdout_users = 0
+
+
+@contextlib.contextmanager
+def quiet_stdout() -> Iterator[None]:
+    global _stdout_users
+    with _STDOUT_INSTALL_LOCK:
+        if not isinstance(sys.stdout, _ThreadQuietStdout):
+            sys.stdout = _ThreadQuietStdout(sys.stdout)
+        stdout = sys.stdout
+        _stdout_users += 1
+    previous = stdout.quiet
+    stdout.quiet = True
+    try:
+        yield
+    finally:
+        stdout.quiet = previous
+        with _STDOUT_INSTALL_LOCK:
+            _stdout_users -= 1
+            if _stdout_users == 0 and sys.stdout is stdout:
+                sys.stdout = stdout._target
+
+
 def _call_finstate_all(reader: Any, corp_code: str, year: int, fs_div: str) -> pd.DataFrame:
-    with contextlib.redirect_stdout(io.StringIO()):
+    with quiet_stdout():
         frame = reader.finstate_all(corp_code, int(year), reprt_code=REPORT_CODE, fs_div=fs_div)
     if frame is None:
         return pd.DataFrame()
     return frame.copy()
 
 
+def _call_with_retries(
+    call: Callable[[], pd.DataFrame],
+    request_sleep: float,
+    max_retries: int,
+    rate_limiter: TokenBucket | None,
+) -> pd.DataFrame:
+    for attempt in range(max_retries):
+        try:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            frame = call()
+            if request_sleep > 0:
+                time.sleep(request_sleep)
+            return frame
+        except Exception as exc:
+            if not is_retryable_exception(exc) or attempt == max_retries - 1:
+                raise
+            if rate_limiter is not None:
+                rate_limiter.backoff(retry_delay(attempt))
+            else:
+                time.sleep(retry_delay(attempt))
+    return pd.DataFrame()
+
+
 def fetch_financial_statement(
     reader: Any,
     corp_code: str,
     year: int,
     request_sleep: float = 0.1,
     max_retries: int = 4,
+    rate_limiter: TokenBucket | None = None,
+    statement_cache: StatementCache | None = None,
 ) -> FetchResult:
-    for fs_div, status in (("CFS", "ok_cfs"), ("OFS", "ok_ofs")):
-        last_error: Exception | None = None
-        for attempt in range(max_retries):
-            try:
-                frame = _call_finstate_all(reader, corp_code, year, fs_div)
-                if request_sleep > 0:
-                    time.sleep(request_sleep)
-                if not frame.empty:
-                    return FetchResult(frame=frame, fs_div_used=fs_div, source_status=status)
-                break
-            except Exception as exc:
-                last_error = exc
-                if not is_retryable_exception(exc) or attempt == max_retries - 1:
-                    raise
-                time.sleep(min(2**attempt, 8))
-        if last_error is not None:
-            raise last_error
+    for fs_div in FS_DIVS:
+        cached = statement_cache.get(corp_code, year, REPORT_CODE, fs_div) if statement_cache is not None else None
+        if cached is not None:
+            frame = cached.frame
+        else:
+            frame = _call_with_retries(
+                lambda: _call_finstate_all(reader, corp_code, year, fs_div),
+                request_sleep,
+                max_retries,
+                rate_limiter,
+            )
+            if statement_cache is not None:
+                statement_cache.put(corp_code, year, REPORT_CODE, fs_div, frame)
+        if not frame.empty:
+            return FetchResult(frame=frame, fs_div_used=fs_div, source_status=FS_DIV_STATUS[fs_div])
     return FetchResult(frame=pd.DataFrame(), fs_div_used="", source_status="missing_statement")
 
 
+def iter_date_windows(
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    days: int = FILING_LIST_WINDOW_DAYS,
+) -> Iterator[tuple[pd.Timestamp, pd.Timestamp]]:
+    window_start = start.normalize()
+    end = end.normalize()
+    while window_start <= end:
+        window_end = min(window_start + pd.Timedelta(days=days - 1), end)
+        yield window_start, window_end
+        window_start = window_end + pd.Timedelta(days=1)
+
+
+def fetch_annual_filings(
+    reader: Any,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    max_retries: int = 4,
+    rate_limiter: TokenBucket | None = None,
+) -> pd.DataFrame:
+    frames = []
+    for window_start, window_end in iter_date_windows(start, end):
+
+        def call() -> pd.DataFrame:
+            with quiet_stdout():
+                frame = reader.list(
+                    start=window_start.strftime("%Y-%m-%d"),
+                    end=window_end.strftime("%Y-%m-%d"),
+                    kind=ANNUAL_REPORT_KIND,
+                    kind_detail=ANNUAL_REPORT_KIND_DETAIL,
+                    final=True,
+                )
+            return pd.DataFrame() if frame is None else frame.copy()
+
+        frame = _call_with_retries(call, 0.0, max_retries, rate_limiter)
+        if not frame.empty:
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=["corp_code", "report_nm", "rcept_no", "rcept_dt"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def parse_report_year(report_nm: Any) -> int | None:
+    match = _REPORT_PERIOD_PATTERN.search(str(report_nm or ""))
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    return year if month == 12 else year - 1
+
+
+def filing_delta_keys(
+    filings: pd.DataFrame,
+    corp_codes: Iterable[str],
+    years: Iterable[int],
+) -> set[tuple[str, int]]:
+    if filings.empty:
+        return set()
+    wanted_codes = set(corp_codes)
+    wanted_years = {int(year) for year in years}
+    keys = set()
+    for corp_code, report_nm in filings.loc[:, ["corp_code", "report_nm"]].itertuples(index=False, name=None):
+        year = parse_report_year(report_nm)
+        if corp_code in wanted_codes and year in wanted_years:
+            keys.add((corp_code, year))
+    return keys
+
+
+def last_processed_at(progress_frame: pd.DataFrame) -> pd.Timestamp | None:
+    if progress_frame.empty:
+        return None
+    processed_at = pd.to_datetime(progress_frame["processed_at"], errors="coerce", utc=True).dropna()
+    return processed_at.max() if not processed_at.empty else None
+
+
 def empty_progress_frame() -> pd.DataFrame:
     return pd.DataFrame(columns=PROGRESS_COLUMNS)
 
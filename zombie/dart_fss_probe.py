@@ -3,18 +3,28 @@ from __future__ import annotations
 import argparse
 import contextlib
 import io
+import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import pandas as pd
 
+from zombie.common_io import save_parquet_frame
 from zombie.dart_fetcher import get_default_api_key
 
 OPERATING_INCOME_CONCEPTS = ("dart_OperatingIncomeLoss", "ifrs-full_OperatingIncomeLoss")
 FINANCE_COST_CONCEPTS = ("ifrs-full_FinanceCosts",)
 INTEREST_EXPENSE_CONCEPTS = ("ifrs-full_InterestExpense",)
+PROBE_CONCEPTS = (*OPERATING_INCOME_CONCEPTS, *FINANCE_COST_CONCEPTS, *INTEREST_EXPENSE_CONCEPTS)
+CONCEPT_INDEX_COLUMNS = ("concept_id", "period", "context", "value", "rank_exact", "rank_contains", "rank_length", "is_best")
 DEFAULT_PROXY_SOURCE = Path("zombie_2026_proxy.csv")
 DEFAULT_OUTPUT_PATH = Path("zombie/data/dart_fss_interest_probe_top20.csv")
+DEFAULT_XBRL_CACHE_DIR = Path("zombie/data/xbrl_cache")
+DEFAULT_CONCEPT_INDEX_PATH = Path("zombie/data/dart_fss_concept_index.parquet")
+DEFAULT_PROBE_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
 
 
 def _load_dart_fss():
@@ -34,39 +44,89 @@ def _context_rank(label_tuple: tuple[str, ...], separate: bool) -> tuple[int, in
     return (score_exact, score_contains, score_len, " | ".join(label_tuple))
 
 
-def select_best_context_value(values: dict[Any, Any], separate: bool) -> tuple[float | None, str]:
-    candidates: list[tuple[tuple[int, int, int, str], float, str]] = []
+def _context_candidates(values: dict[Any, Any], separate: bool) -> Iterator[tuple[tuple[int, int, int, str], float, str, str]]:
     for raw_key, raw_value in values.items():
         if pd.isna(raw_value):
             continue
         if not isinstance(raw_key, tuple) or len(raw_key) != 2:
             continue
-        _, context = raw_key
+        period, context = raw_key
         if not isinstance(context, tuple):
             context = (str(context),)
         label = " | ".join(str(item) for item in context)
-        candidates.append((_context_rank(tuple(str(item) for item in context), separate), float(raw_value), label))
+        yield _context_rank(tuple(str(item) for item in context), separate), float(raw_value), str(period), label
+
 
-    if not candidates:
+def select_best_context_value(values: dict[Any, Any], separate: bool) -> tuple[float | None, str]:
+    best = min(_context_candidates(values, separate), key=lambda item: item[0], default=None)
+    if best is None:
         return None, ""
+    return best[1], best[3]
 
-    best = sorted(candidates, key=lambda item: item[0])[0]
-    return best[1], best[2]
 
+@dataclass(frozen=True)
+class ConceptIndex:
+    rows: tuple[dict[str, Any], ...]
+    best: dict[str, tuple[float, str]]
 
-def extract_concept_value(statement: Any, concept_ids: tuple[str, ...], separate: bool) -> tuple[float | None, str, str]:
-    for concept_id in concept_ids:
+    def lookup(self, concept_ids: Iterable[str]) -> tuple[float | None, str, str]:
+        for concept_id in concept_ids:
+            hit = self.best.get(concept_id)
+            if hit is not None:
+                return hit[0], concept_id, hit[1]
+        return None, "", ""
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.rows), columns=list(CONCEPT_INDEX_COLUMNS))
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> ConceptIndex:
+        rows = tuple(frame.reindex(columns=list(CONCEPT_INDEX_COLUMNS)).to_dict("records"))
+        best = {row["concept_id"]: (float(row["value"]), row["context"]) for row in rows if row["is_best"]}
+        return cls(rows=rows, best=best)
+
+
+def build_concept_index(statement: Any, concept_ids: Iterable[str], separate: bool) -> ConceptIndex:
+    rows: list[dict[str, Any]] = []
+    best: dict[str, tuple[float, str]] = {}
+    for concept_id in dict.fromkeys(concept_ids):
         values = statement.get_value_by_concept_id(concept_id, lang="en")
-        amount, context_label = select_best_context_value(values, separate=separate)
-        if amount is not None:
-            return amount, concept_id, context_label
-    return None, "", ""
+        best_rank = None
+        best_row = None
+        for rank, amount, period, label in _context_candidates(values, separate):
+            row = {
+                "concept_id": concept_id,
+                "period": period,
+                "context": label,
+                "value": amount,
+                "rank_exact": rank[0],
+                "rank_contains": rank[1],
+                "rank_length": rank[2],
+                "is_best": False,
+            }
+            rows.append(row)
+            if best_rank is None or rank < best_rank:
+                best_rank, best_row = rank, row
+        if best_row is not None:
+            best_row["is_best"] = True
+            best[concept_id] = (best_row["value"], best_row["context"])
+    return ConceptIndex(rows=tuple(rows), best=best)
+
+
+def extract_concept_value(statement: Any, concept_ids: tuple[str, ...], separate: bool) -> tuple[float | None, str, str]:
+    return build_concept_index(statement, concept_ids, separate).lookup(concept_ids)
 
 
-def fetch_income_statement_statement(corp_code: str, year: int, separate: bool) -> Any:
+def load_corp_list() -> Any:
     dart = _load_dart_fss()
-    corp_list = dart.get_corp_list()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dart.get_corp_list()
+
+
+def find_annual_report_rcept_no(corp_list: Any, corp_code: str, year: int) -> str:
     corp = corp_list.find_by_corp_code(corp_code=corp_code)
+    if corp is None:
+        raise ValueError(f"unknown corp_code={corp_code}")
     reports = corp.search_filings(
         bgn_de=f"{year}0101",
         end_de=f"{year}1231",
@@ -75,68 +135,62 @@ def fetch_income_statement_statement(corp_code: str, year: int, separate: bool)
     )
     if len(reports) == 0:
         raise ValueError(f"no annual report found for corp_code={corp_code} year={year}")
+    return str(reports[0].rcept_no)
 
-    report = reports[0]
-    with contextlib.redirect_stdout(io.StringIO()):
-        xbrl = report.xbrl
-    statements = xbrl.get_income_statement(separate=separate)
-    if not statements:
-        raise ValueError(f"no income statement table for corp_code={corp_code} year={year} separate={separate}")
-    return statements[0]
 
+def find_xbrl_file(archive_dir: Path) -> Path | None:
+    files = sorted(archive_dir.rglob("*.xbrl"))
+    return files[0] if files else None
 
-def probe_company_year(row: dict[str, str], year: int) -> dict[str, Any]:
-    last_error = ""
-    for separate, fs_div in ((False, "CFS"), (True, "OFS")):
-        try:
-            statement = fetch_income_statement_statement(row["corp_code"], year, separate=separate)
-        except Exception as exc:
-            last_error = f"{type(exc).__name__}: {exc}"
-            continue
 
-        operating_profit, operating_concept, operating_context = extract_concept_value(
-            statement,
-            OPERATING_INCOME_CONCEPTS,
-            separate=separate,
-        )
-        finance_costs, finance_concept, finance_context = extract_concept_value(
-            statement,
-            FINANCE_COST_CONCEPTS,
-            separate=separate,
-        )
-        interest_expense, interest_concept, interest_context = extract_concept_value(
-            statement,
-            INTEREST_EXPENSE_CONCEPTS,
-            separate=separate,
-        )
-
-        return {
-            "market": row["market"],
-            "stock_code": row["stock_code"],
-            "corp_code": row["corp_code"],
-            "name": row["name"],
-            "year": year,
-            "fs_div": fs_div,
-            "operating_profit": operating_profit,
-            "operating_concept_id": operating_concept,
-            "operating_context": operating_context,
-            "finance_costs": finance_costs,
-            "finance_costs_concept_id": finance_concept,
-            "finance_costs_context": finance_context,
-            "interest_expense": interest_expense,
-            "interest_expense_concept_id": interest_concept,
-            "interest_expense_context": interest_context,
-            "has_finance_costs": finance_costs is not None,
-            "has_interest_expense": interest_expense is not None,
-            "error": "",
-        }
+def download_xbrl_archive(rcept_no: str, cache_dir: str | Path = DEFAULT_XBRL_CACHE_DIR) -> Path:
+    archive_dir = Path(cache_dir) / rcept_no
+    cached = find_xbrl_file(archive_dir) if archive_dir.exists() else None
+    if cached is not None:
+        return cached
 
+    dart = _load_dart_fss()
+    archive_dir.parent.mkdir(parents=True, exist_ok=True)
+    temp_dir = archive_dir.with_name(f".{rcept_no}.{os.getpid()}.tmp")
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    temp_dir.mkdir()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            dart.api.finance.download_xbrl(path=str(temp_dir), rcept_no=rcept_no)
+        shutil.rmtree(archive_dir, ignore_errors=True)
+        os.replace(temp_dir, archive_dir)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    xbrl_path = find_xbrl_file(archive_dir)
+    if xbrl_path is None:
+        raise FileNotFoundError(f"no XBRL file in archive rcept_no={rcept_no}")
+    return xbrl_path
+
+
+def extract_statement_values(index: ConceptIndex, separate: bool) -> dict[str, Any]:
+    operating_profit, operating_concept, operating_context = index.lookup(OPERATING_INCOME_CONCEPTS)
+    finance_costs, finance_concept, finance_context = index.lookup(FINANCE_COST_CONCEPTS)
+    interest_expense, interest_concept, interest_context = index.lookup(INTEREST_EXPENSE_CONCEPTS)
+    return {
+        "fs_div": "OFS" if separate else "CFS",
+        "operating_profit": operating_profit,
+        "operating_concept_id": operating_concept,
+        "operating_context": operating_context,
+        "finance_costs": finance_costs,
+        "finance_costs_concept_id": finance_concept,
+        "finance_costs_context": finance_context,
+        "interest_expense": interest_expense,
+        "interest_expense_concept_id": interest_concept,
+        "interest_expense_context": interest_context,
+        "has_finance_costs": finance_costs is not None,
+        "has_interest_expense": interest_expense is not None,
+        "error": "",
+    }
+
+
+def error_values(error: str) -> dict[str, Any]:
     return {
-        "market": row["market"],
-        "stock_code": row["stock_code"],
-        "corp_code": row["corp_code"],
-        "name": row["name"],
-        "year": year,
         "fs_div": "",
         "operating_profit": None,
         "operating_concept_id": "",
@@ -149,10 +203,88 @@ def probe_company_year(row: dict[str, str], year: int) -> dict[str, Any]:
         "interest_expense_context": "",
         "has_finance_costs": False,
         "has_interest_expense": False,
-        "error": last_error,
+        "error": error,
+    }
+
+
+def select_income_statement_values(xbrl: Any) -> tuple[dict[str, Any], ConceptIndex | None]:
+    last_error = ""
+    for separate in (False, True):
+        try:
+            statements = xbrl.get_income_statement(separate=separate)
+        except Exception as exc:
+            last_error = f"{type(exc).__name__}: {exc}"
+            continue
+        if not statements:
+            last_error = f"ValueError: no income statement table separate={separate}"
+            continue
+        index = build_concept_index(statements[0], PROBE_CONCEPTS, separate=separate)
+        return extract_statement_values(index, separate=separate), index
+    return error_values(last_error), None
+
+
+def probe_xbrl_file(xbrl_path: str) -> tuple[dict[str, Any], tuple[dict[str, Any], ...]]:
+    dart = _load_dart_fss()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            xbrl = dart.xbrl.get_xbrl_from_file(xbrl_path)
+    except Exception as exc:
+        return error_values(f"{type(exc).__name__}: {exc}"), ()
+    if xbrl is None or xbrl.is_empty():
+        return error_values(f"ValueError: empty XBRL file {xbrl_path}"), ()
+    values, index = select_income_statement_values(xbrl)
+    return values, index.rows if index is not None else ()
+
+
+def build_probe_row(target: dict[str, str], year: int, values: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "market": target["market"],
+        "stock_code": target["stock_code"],
+        "corp_code": target["corp_code"],
+        "name": target["name"],
+        "year": year,
+        **values,
     }
 
 
+def run_probe(
+    targets: pd.DataFrame,
+    years: list[int],
+    corp_list: Any,
+    cache_dir: str | Path = DEFAULT_XBRL_CACHE_DIR,
+    workers: int = DEFAULT_PROBE_WORKERS,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    tasks = [(target, int(year)) for target in targets.to_dict("records") for year in years]
+    values: list[dict[str, Any] | None] = [None] * len(tasks)
+    concept_rows: list[dict[str, Any]] = []
+    futures: dict[Future, int] = {}
+    with ProcessPoolExecutor(max_workers=max(1, int(workers))) as executor:
+        for index, (target, year) in enumerate(tasks):
+            print(f"probe {index + 1}/{len(tasks)}: {target['stock_code']} {target['name']} {year}")
+            try:
+                rcept_no = find_annual_report_rcept_no(corp_list, target["corp_code"], year)
+                xbrl_path = download_xbrl_archive(rcept_no, cache_dir)
+            except Exception as exc:
+                values[index] = error_values(f"{type(exc).__name__}: {exc}")
+                continue
+            futures[executor.submit(probe_xbrl_file, str(xbrl_path))] = index
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                values[index], index_rows = future.result()
+            except Exception as exc:
+                values[index] = error_values(f"{type(exc).__name__}: {exc}")
+                continue
+            target, year = tasks[index]
+            keys = {**build_probe_row(target, year, {}), "fs_div": values[index]["fs_div"]}
+            concept_rows.extend({**keys, **row} for row in index_rows)
+
+    rows = [build_probe_row(target, year, values[index] or error_values("")) for index, (target, year) in enumerate(tasks)]
+    index_columns = ["market", "stock_code", "corp_code", "name", "year", "fs_div", *CONCEPT_INDEX_COLUMNS]
+    return pd.DataFrame(rows), pd.DataFrame(concept_rows, columns=index_columns)
+
+
 def load_probe_targets(source_path: str | Path, limit: int) -> pd.DataFrame:
     df = pd.read_csv(source_path, encoding="utf-8-sig", dtype=str)
     required = {"market", "stock_code", "corp_code", "name"}
@@ -168,6 +300,9 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--output-path", type=Path, default=DEFAULT_OUTPUT_PATH)
     parser.add_argument("--limit", type=int, default=20)
     parser.add_argument("--years", nargs="+", type=int, default=[2022, 2023, 2024])
+    parser.add_argument("--xbrl-cache-dir", type=Path, default=DEFAULT_XBRL_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=DEFAULT_PROBE_WORKERS, help="XBRL parser processes.")
+    parser.add_argument("--concept-index-path", type=Path, default=DEFAULT_CONCEPT_INDEX_PATH)
     return parser.parse_args()
 
 
@@ -181,23 +316,16 @@ def main() -> int:
     dart = _load_dart_fss()
     dart.set_api_key(api_key=api_key)
     targets = load_probe_targets(args.source_path, limit=args.limit)
-
-    rows: list[dict[str, Any]] = []
-    total = len(targets) * len(args.years)
-    index = 0
-    for target in targets.to_dict("records"):
-        for year in args.years:
-            index += 1
-            print(f"probe {index}/{total}: {target['stock_code']} {target['name']} {year}")
-            rows.append(probe_company_year(target, year))
-
-    output_df = pd.DataFrame(rows)
+    corp_list = load_corp_list()
+    output_df, concept_index_df = run_probe(targets, args.years, corp_list, cache_dir=args.xbrl_cache_dir, workers=args.workers)
     args.output_path.parent.mkdir(parents=True, exist_ok=True)
     output_df.to_csv(args.output_path, index=False, encoding="utf-8-sig")
+    save_parquet_frame(concept_index_df, args.concept_index_path)
 
     print()
     print(f"output: {args.output_path}")
     print(f"rows: {len(output_df)}")
+    print(f"concept index: {args.concept_index_path} ({len(concept_index_df)} rows)")
     print("has_interest_expense:", int(output_df["has_interest_expense"].sum()))
     print("has_finance_costs:", int(output_df["has_finance_costs"].sum()))
     print("error_rows:", int(output_df["error"].astype(str).str.strip().ne("").sum()))
@@ -5,7 +5,7 @@ from typing import Any
 
 import pandas as pd
 
-from zombie.common_io import is_blank
+from zombie.screening import build_metric_panel, screen_columns, screen_consecutive_below
 
 RAW_COLUMNS = (
     "market",
@@ -37,78 +37,117 @@ def normalize_account_text(value: Any) -> str:
     return re.sub(r"[^0-9a-z가-힣]+", "", text)
 
 
-def parse_amount(value: Any) -> float | None:
-    if is_blank(value):
-        return None
+METRIC_ACCOUNT_SPECS = (
+    ("operating_profit", OPERATING_PROFIT_ACCOUNT_NAMES, OPERATING_PROFIT_ACCOUNT_IDS),
+    ("interest_expense_exact", EXACT_INTEREST_ACCOUNT_NAMES, EXACT_INTEREST_ACCOUNT_IDS),
+    ("finance_cost_proxy", PROXY_INTEREST_ACCOUNT_NAMES, PROXY_INTEREST_ACCOUNT_IDS),
+)
+METRIC_COLUMNS = tuple(metric for metric, _, _ in METRIC_ACCOUNT_SPECS)
 
-    text = str(value).strip()
-    if not text:
-        return None
 
-    negative = text.startswith("(") and text.endswith(")")
-    cleaned = text.replace(",", "").replace(" ", "")
-    cleaned = cleaned.strip("()")
-    if cleaned == "":
-        return None
+def _text_column(frame: pd.DataFrame, column: str) -> pd.Series:
+    if column not in frame.columns:
+        return pd.Series("", index=frame.index, dtype=object)
+    return frame[column].astype(object).where(frame[column].notna(), "").astype(str)
 
-    amount = float(cleaned)
-    return -amount if negative else amount
 
+def normalize_account_series(values: pd.Series) -> pd.Series:
+    return values.str.strip().str.lower().str.replace(r"[^0-9a-z가-힣]+", "", regex=True)
 
-def amount_from_row(row: pd.Series) -> float | None:
-    primary = row.get("thstrm_amount")
-    if not is_blank(primary):
-        return parse_amount(primary)
 
-    fallback = row.get("thstrm_add_amount")
-    if is_blank(fallback):
-        return None
-    return parse_amount(fallback)
+def parse_amount_series(values: pd.Series) -> pd.Series:
+    text = values.str.strip()
+    negative = text.str.startswith("(") & text.str.endswith(")")
+    cleaned = text.str.replace(",", "", regex=False).str.replace(" ", "", regex=False).str.strip("()")
+    amounts = pd.to_numeric(cleaned.where(cleaned != ""), errors="coerce").astype(float)
+    return amounts.where(~negative, -amounts)
 
 
-def _candidate_frame(frame: pd.DataFrame) -> pd.DataFrame:
-    if frame.empty:
-        return frame.copy()
+def amount_series(frame: pd.DataFrame) -> pd.Series:
+    primary = _text_column(frame, "thstrm_amount")
+    fallback = _text_column(frame, "thstrm_add_amount")
+    use_primary = primary.str.strip() != ""
+    return parse_amount_series(primary.where(use_primary, fallback))
 
-    working = frame.copy()
-    working["sj_div"] = working.get("sj_div", "").fillna("").astype(str)
-    working = working.loc[working["sj_div"].isin(SUPPORTED_SJ_DIVS)].copy()
-    if working.empty:
-        return working
 
-    working["account_nm_normalized"] = working.get("account_nm", "").map(normalize_account_text)
-    working["account_id_normalized"] = working.get("account_id", "").map(normalize_account_text)
-    working["amount"] = working.apply(amount_from_row, axis=1)
-    working["ord_numeric"] = pd.to_numeric(working.get("ord"), errors="coerce").fillna(10**9)
-    return working
+def _metric_lookup(position: int) -> dict[str, str]:
+    lookup: dict[str, str] = {}
+    for spec in METRIC_ACCOUNT_SPECS:
+        for value in spec[position]:
+            lookup.setdefault(normalize_account_text(value), spec[0])
+    return lookup
 
 
-def _select_metric(
-    frame: pd.DataFrame,
-    account_names: tuple[str, ...],
-    account_ids: tuple[str, ...],
-) -> float | None:
-    candidates = _candidate_frame(frame)
-    if candidates.empty:
-        return None
+METRIC_BY_ACCOUNT_NAME = _metric_lookup(1)
+METRIC_BY_ACCOUNT_ID = _metric_lookup(2)
 
-    normalized_names = {normalize_account_text(name) for name in account_names}
-    normalized_ids = {normalize_account_text(account_id) for account_id in account_ids}
 
-    name_matches = candidates.loc[candidates["account_nm_normalized"].isin(normalized_names)].copy()
-    if not name_matches.empty:
-        ordered = name_matches.sort_values(["ord_numeric", "account_nm_normalized"], kind="stable")
-        return ordered.iloc[0]["amount"]
+def extract_metric_frame(frame: pd.DataFrame, group_columns: tuple[str, ...] = ()) -> pd.DataFrame:
+    group_columns = tuple(group_columns)
+    output_columns = [*group_columns, *METRIC_COLUMNS]
+    empty_result = pd.DataFrame([{metric: None for metric in METRIC_COLUMNS}], columns=output_columns)
+    if frame.empty:
+        return pd.DataFrame(columns=output_columns) if group_columns else empty_result
+
+    supported = _text_column(frame, "sj_div").isin(SUPPORTED_SJ_DIVS)
+    if not supported.any():
+        return pd.DataFrame(columns=output_columns) if group_columns else empty_result
+    subset = frame.loc[supported]
+    groups = subset.loc[:, list(group_columns)].drop_duplicates() if group_columns else None
+
+    account_names = normalize_account_series(_text_column(subset, "account_nm"))
+    account_ids = normalize_account_series(_text_column(subset, "account_id"))
+    name_metric = account_names.map(METRIC_BY_ACCOUNT_NAME)
+    id_metric = account_ids.map(METRIC_BY_ACCOUNT_ID)
+    matched = name_metric.notna() | id_metric.notna()
+    if not matched.any():
+        if not group_columns:
+            return empty_result
+        return groups.reindex(columns=output_columns).reset_index(drop=True)
+
+    matched_rows = subset.loc[matched]
+    ord_values = matched_rows["ord"] if "ord" in matched_rows.columns else pd.Series(pd.NA, index=matched_rows.index)
+    working = matched_rows.loc[:, list(group_columns)].copy()
+    working["ord_numeric"] = pd.to_numeric(ord_values, errors="coerce").fillna(10**9)
+    working["amount"] = amount_series(matched_rows)
+    working["position"] = range(len(working))
+
+    by_name = working.loc[name_metric[matched].notna()].assign(
+        metric=name_metric[matched].dropna(),
+        priority=0,
+        tie_break=account_names[matched],
+    )
+    by_id = working.loc[id_metric[matched].notna()].assign(
+        metric=id_metric[matched].dropna(),
+        priority=1,
+        tie_break=account_ids[matched],
+    )
+    candidates = pd.concat([by_name, by_id], ignore_index=True)
+    ordered = candidates.sort_values(
+        [*group_columns, "metric", "priority", "ord_numeric", "tie_break", "position"],
+        kind="stable",
+    )
+    best = ordered.drop_duplicates(subset=[*group_columns, "metric"], keep="first")
+
+    if not group_columns:
+        return pd.DataFrame([dict(zip(best["metric"], best["amount"]))], columns=output_columns)
+    wide = best.pivot(index=list(group_columns), columns="metric", values="amount").reset_index()
+    result = groups.merge(wide, on=list(group_columns), how="left")
+    return result.reindex(columns=output_columns).reset_index(drop=True)
 
-    if not normalized_ids:
-        return None
 
-    id_matches = candidates.loc[candidates["account_id_normalized"].isin(normalized_ids)].copy()
-    if id_matches.empty:
+def _metric_value(value: Any) -> float | None:
+    if value is None or pd.isna(value):
         return None
+    return float(value)
 
-    ordered = id_matches.sort_values(["ord_numeric", "account_id_normalized"], kind="stable")
-    return ordered.iloc[0]["amount"]
+
+def extract_metrics(frame: pd.DataFrame) -> dict[str, float | None]:
+    metric_frame = extract_metric_frame(frame)
+    if metric_frame.empty:
+        return {metric: None for metric in METRIC_COLUMNS}
+    row = metric_frame.iloc[0]
+    return {metric: _metric_value(row[metric]) for metric in METRIC_COLUMNS}
 
 
 def calculate_icr(operating_profit: float | None, interest_cost: float | None) -> float | None:
@@ -135,15 +174,15 @@ def derive_source_status(
     return base_status
 
 
-def build_raw_record(
+def build_metric_record(
     company_row: dict[str, Any],
     year: int,
-    frame: pd.DataFrame,
     fs_div_used: str,
     base_status: str,
     report_code: str,
+    metrics: dict[str, float | None] | None,
 ) -> dict[str, Any]:
-    if base_status == "missing_statement" or frame.empty:
+    if base_status == "missing_statement" or metrics is None:
         return {
             "market": company_row["market"],
             "stock_code": company_row["stock_code"],
@@ -160,21 +199,9 @@ def build_raw_record(
             "icr_proxy": None,
         }
 
-    operating_profit = _select_metric(
-        frame,
-        OPERATING_PROFIT_ACCOUNT_NAMES,
-        OPERATING_PROFIT_ACCOUNT_IDS,
-    )
-    exact_interest = _select_metric(
-        frame,
-        EXACT_INTEREST_ACCOUNT_NAMES,
-        EXACT_INTEREST_ACCOUNT_IDS,
-    )
-    proxy_interest = _select_metric(
-        frame,
-        PROXY_INTEREST_ACCOUNT_NAMES,
-        PROXY_INTEREST_ACCOUNT_IDS,
-    )
+    operating_profit = metrics["operating_profit"]
+    exact_interest = metrics["interest_expense_exact"]
+    proxy_interest = metrics["finance_cost_proxy"]
 
     return {
         "market": company_row["market"],
@@ -193,6 +220,18 @@ def build_raw_record(
     }
 
 
+def build_raw_record(
+    company_row: dict[str, Any],
+    year: int,
+    frame: pd.DataFrame,
+    fs_div_used: str,
+    base_status: str,
+    report_code: str,
+) -> dict[str, Any]:
+    metrics = None if base_status == "missing_statement" or frame.empty else extract_metrics(frame)
+    return build_metric_record(company_row, year, fs_div_used, base_status, report_code, metrics)
+
+
 def build_excluded_rows(excluded_df: pd.DataFrame, years: tuple[int, ...], report_code: str) -> pd.DataFrame:
     rows: list[dict[str, Any]] = []
     for row in excluded_df.itertuples(index=False):
@@ -217,35 +256,10 @@ def build_excluded_rows(excluded_df: pd.DataFrame, years: tuple[int, ...], repor
     return pd.DataFrame(rows, columns=list(RAW_COLUMNS))
 
 
-def build_result_frame(raw_df: pd.DataFrame, metric_column: str) -> pd.DataFrame:
-    ordered_columns = ["market", "stock_code", "corp_code", "name", "icr_2024", "icr_2023", "icr_2022", "icr_avg"]
+def build_result_frame(raw_df: pd.DataFrame, metric_column: str, years: tuple[int, ...] = (2024, 2023, 2022)) -> pd.DataFrame:
     if raw_df.empty:
-        return pd.DataFrame(columns=ordered_columns)
-
-    working = raw_df.loc[:, ["market", "stock_code", "corp_code", "name", "year", metric_column]].copy()
-    working = working.rename(columns={metric_column: "icr"})
-    pivoted = working.pivot_table(
-        index=["market", "stock_code", "corp_code", "name"],
-        columns="year",
-        values="icr",
-        aggfunc="first",
-    )
-    pivoted = pivoted.reset_index()
-
-    for year in (2024, 2023, 2022):
-        if year not in pivoted.columns:
-            pivoted[year] = pd.NA
-
-    pivoted = pivoted.rename(columns={2024: "icr_2024", 2023: "icr_2023", 2022: "icr_2022"})
-    filtered = pivoted.dropna(subset=["icr_2024", "icr_2023", "icr_2022"]).copy()
-    if filtered.empty:
-        return filtered.reindex(columns=ordered_columns)
-
-    metric_cols = ["icr_2024", "icr_2023", "icr_2022"]
-    filtered = filtered.loc[(filtered[metric_cols] < 1).all(axis=1)].copy()
-    filtered["icr_avg"] = filtered[metric_cols].mean(axis=1)
-    filtered = filtered.reindex(columns=ordered_columns)
-    return filtered.sort_values(["icr_avg", "market", "stock_code"]).reset_index(drop=True)
+        return pd.DataFrame(columns=screen_columns(years))
+    return screen_consecutive_below(build_metric_panel(raw_df, metric_column), years, threshold=1.0)
 
 
 def build_proxy_metric_series(raw_df: pd.DataFrame) -> pd.Series:
@@ -2,36 +2,61 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Any, Iterator
 
 import pandas as pd
 
+from shared.concurrency import run_fetch_tasks
+from shared.rate_limiter import TokenBucket
+from zombie.common_io import CheckpointStore
 from zombie.dart_fetcher import (
     DEFAULT_CHECKPOINT_DIR,
+    DEFAULT_CORP_CODE_INDEX_PATH,
+    DEFAULT_DART_REQUESTS_PER_MINUTE,
     DEFAULT_ERROR_PATH,
+    DEFAULT_FETCH_WORKERS,
     DEFAULT_INPUT_PATH,
     DEFAULT_PROGRESS_PATH,
     DEFAULT_RAW_PARQUET_PATH,
     DEFAULT_YEARS,
     ERROR_COLUMNS,
+    FS_DIV_STATUS,
     PROGRESS_COLUMNS,
     REPORT_CODE,
+    FetchResult,
+    build_rate_limiter,
     build_reader,
-    empty_error_frame,
-    empty_progress_frame,
+    fetch_annual_filings,
     fetch_financial_statement,
+    filing_delta_keys,
     get_default_api_key,
+    last_processed_at,
+    load_corp_code_index,
     load_input_universe,
     load_parquet_frame,
     resolve_corp_codes,
-    save_parquet_frame,
-    upsert_rows,
     utc_now,
 )
-from zombie.icr_calculator import RAW_COLUMNS, build_excluded_rows, build_proxy_metric_series, build_raw_record, build_result_frame
+from zombie.icr_calculator import (
+    METRIC_COLUMNS,
+    RAW_COLUMNS,
+    build_excluded_rows,
+    build_metric_record,
+    build_proxy_metric_series,
+    build_raw_record,
+    build_result_frame,
+    extract_metric_frame,
+)
+from zombie.screening import build_metric_panel, build_sweep_frame
+from zombie.statement_cache import DEFAULT_STATEMENT_CACHE_DIR, StatementCache
+from zombie.wisereport_fetcher import WR_QUOTE_COLUMNS
+from zombie.wisereport_parser import DEFAULT_TRADING_RULES, TRADING_RULE_MASKS, filter_result_frame_by_trading_status
 
 DEFAULT_RAW_CSV_PATH = Path("zombie/data/icr_extract_2022_2024_long.csv")
 DEFAULT_EXACT_CSV_PATH = Path("zombie_2026.csv")
 DEFAULT_PROXY_CSV_PATH = Path("zombie_2026_proxy.csv")
+CHECKPOINT_KEY_COLUMNS = ("corp_code", "year")
+DART_TIMEZONE = "Asia/Seoul"
 
 
 def export_csv(df: pd.DataFrame, path: str | Path) -> Path:
@@ -48,16 +73,139 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--raw-parquet", type=Path, default=DEFAULT_RAW_PARQUET_PATH)
     parser.add_argument("--progress-path", type=Path, default=DEFAULT_PROGRESS_PATH)
     parser.add_argument("--error-path", type=Path, default=DEFAULT_ERROR_PATH)
+    parser.add_argument("--corp-code-index", type=Path, default=DEFAULT_CORP_CODE_INDEX_PATH)
     parser.add_argument("--raw-csv", type=Path, default=DEFAULT_RAW_CSV_PATH)
     parser.add_argument("--exact-csv", type=Path, default=DEFAULT_EXACT_CSV_PATH)
     parser.add_argument("--proxy-csv", type=Path, default=DEFAULT_PROXY_CSV_PATH)
     parser.add_argument("--years", nargs="+", type=int, default=list(DEFAULT_YEARS))
     parser.add_argument("--limit", type=int, default=None)
-    parser.add_argument("--request-sleep", type=float, default=0.07)
+    parser.add_argument("--request-sleep", type=float, default=0.0)
     parser.add_argument("--max-retries", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=DEFAULT_FETCH_WORKERS)
+    parser.add_argument("--requests-per-minute", type=float, default=DEFAULT_DART_REQUESTS_PER_MINUTE)
+    parser.add_argument("--statement-cache-dir", type=Path, default=DEFAULT_STATEMENT_CACHE_DIR)
+    parser.add_argument("--quote-path", type=Path, default=None, help="WiseReport quote snapshot parquet used to drop abnormal trading.")
+    parser.add_argument("--trading-rule", dest="trading_rules", action="append", choices=sorted(TRADING_RULE_MASKS), default=None)
+    parser.add_argument("--sweep-csv", type=Path, default=None, help="Write company counts for every threshold/window pair.")
+    parser.add_argument("--sweep-thresholds", nargs="+", type=float, default=[0.5, 0.75, 1.0, 1.25, 1.5])
+    parser.add_argument("--sweep-years", nargs="+", type=int, default=[2, 3, 4, 5])
+    parser.add_argument(
+        "--since",
+        default=None,
+        help="Re-fetch only company-years with annual reports filed on or after this date (YYYY-MM-DD, or 'last' for the latest checkpoint).",
+    )
+    parser.add_argument("--from-cache", action="store_true", help="Recompute raw metrics from cached statements without DART calls.")
     return parser.parse_args()
 
 
+def resolve_since(value: str, progress_frame: pd.DataFrame) -> pd.Timestamp:
+    if value != "last":
+        return pd.Timestamp(value).normalize()
+    since = last_processed_at(progress_frame)
+    if since is None:
+        raise ValueError("--since last needs an existing progress checkpoint")
+    return since.tz_convert(DART_TIMEZONE).tz_localize(None).normalize()
+
+
+def delta_completed_keys(
+    checkpoint_keys: set[tuple[str, int]],
+    delta_keys: set[tuple[str, int]],
+) -> set[tuple[str, int]]:
+    return checkpoint_keys - delta_keys
+
+
+def iter_pending_tasks(
+    included_df: pd.DataFrame,
+    years: tuple[int, ...],
+    completed_keys: set[tuple[str, int]],
+) -> Iterator[tuple[dict[str, Any], int]]:
+    for company in included_df.to_dict("records"):
+        for year in years:
+            if (company["corp_code"], int(year)) in completed_keys:
+                continue
+            yield company, int(year)
+
+
+def fetch_company_year(
+    reader: Any,
+    company: dict[str, Any],
+    year: int,
+    request_sleep: float,
+    max_retries: int,
+    rate_limiter: TokenBucket | None = None,
+    statement_cache: StatementCache | None = None,
+) -> tuple[FetchResult, dict[str, Any]]:
+    fetch_result = fetch_financial_statement(
+        reader,
+        company["corp_code"],
+        int(year),
+        request_sleep=request_sleep,
+        max_retries=max_retries,
+        rate_limiter=rate_limiter,
+        statement_cache=statement_cache,
+    )
+    record = build_raw_record(
+        company_row=company,
+        year=int(year),
+        frame=fetch_result.frame,
+        fs_div_used=fetch_result.fs_div_used,
+        base_status=fetch_result.source_status,
+        report_code=REPORT_CODE,
+    )
+    return fetch_result, record
+
+
+def build_cached_raw_frame(
+    included_df: pd.DataFrame,
+    years: tuple[int, ...],
+    statement_cache: StatementCache,
+    report_code: str = REPORT_CODE,
+) -> pd.DataFrame:
+    entries = statement_cache.entries(years=years, reprt_code=report_code)
+    entries = entries.loc[entries["corp_code"].isin(set(included_df["corp_code"]))]
+    available = entries.loc[entries["row_count"] > 0].assign(fs_rank=lambda df: df["fs_div"].map({"CFS": 0, "OFS": 1}))
+    chosen = available.sort_values(["corp_code", "year", "fs_rank"]).drop_duplicates(["corp_code", "year"], keep="first")
+
+    statements = statement_cache.load_statements(chosen)
+    metric_frame = extract_metric_frame(statements, ("corp_code", "year"))
+    metrics_by_key = {
+        (row["corp_code"], int(row["year"])): {metric: None if pd.isna(row[metric]) else float(row[metric]) for metric in METRIC_COLUMNS}
+        for row in metric_frame.to_dict("records")
+    }
+    empty_metrics = {metric: None for metric in METRIC_COLUMNS}
+    fs_div_by_key = {(row.corp_code, int(row.year)): row.fs_div for row in chosen.itertuples(index=False)}
+    empty_fs_divs: dict[tuple[str, int], set[str]] = {}
+    for row in entries.loc[entries["row_count"] == 0].itertuples(index=False):
+        empty_fs_divs.setdefault((row.corp_code, int(row.year)), set()).add(row.fs_div)
+
+    records: list[dict[str, Any]] = []
+    for company in included_df.to_dict("records"):
+        for year in years:
+            key = (company["corp_code"], int(year))
+            if key in fs_div_by_key:
+                fs_div = fs_div_by_key[key]
+                metrics = metrics_by_key.get(key, empty_metrics)
+                records.append(build_metric_record(company, int(year), fs_div, FS_DIV_STATUS[fs_div], report_code, metrics))
+            elif empty_fs_divs.get(key, set()) >= set(FS_DIV_STATUS):
+                records.append(build_metric_record(company, int(year), "", "missing_statement", report_code, None))
+    return pd.DataFrame(records, columns=list(RAW_COLUMNS))
+
+
+def split_cached_universe(
+    universe_df: pd.DataFrame,
+    index_path: str | Path | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    resolved = universe_df.copy()
+    index = load_corp_code_index(index_path) if index_path is not None else None
+    if index is not None:
+        missing_mask = resolved["corp_code"].eq("")
+        resolved.loc[missing_mask, "corp_code"] = resolved.loc[missing_mask, "stock_code"].map(index.stock_to_corp).fillna("")
+    has_corp_code = resolved["corp_code"] != ""
+    included = resolved.loc[has_corp_code].reset_index(drop=True)
+    excluded = resolved.loc[~has_corp_code].reset_index(drop=True)
+    return included, excluded
+
+
 def print_top20(title: str, df: pd.DataFrame) -> None:
     print()
     print(title)
@@ -67,133 +215,150 @@ def print_top20(title: str, df: pd.DataFrame) -> None:
     print(df.head(20).to_string(index=False))
 
 
-def main() -> int:
-    args = parse_args()
-    args.checkpoint_dir.mkdir(parents=True, exist_ok=True)
-
-    api_key = get_default_api_key()
-    if not api_key:
-        print("DART API key not found. Set DART_API_KEY or provide corp_code_extractor/corp_list.py API_KEY.")
-        return 1
-
-    years = tuple(sorted(set(args.years)))
-    universe_df = load_input_universe(args.input_path)
-    included_df, excluded_df = resolve_corp_codes(universe_df, api_key)
-    if args.limit is not None:
-        included_df = included_df.head(args.limit).reset_index(drop=True)
-
-    print(f"input rows: {len(universe_df):,}")
-    print(f"included rows: {len(included_df):,}")
-    print(f"excluded rows: {len(excluded_df):,}")
-
-    progress_df = load_parquet_frame(args.progress_path, PROGRESS_COLUMNS)
-    error_df = load_parquet_frame(args.error_path, ERROR_COLUMNS)
-    raw_df = load_parquet_frame(args.raw_parquet, RAW_COLUMNS)
+def fetch_raw_frame(
+    args: argparse.Namespace,
+    api_key: str,
+    included_df: pd.DataFrame,
+    years: tuple[int, ...],
+    statement_cache: StatementCache | None,
+) -> pd.DataFrame:
+    progress_store = CheckpointStore(args.progress_path, PROGRESS_COLUMNS, CHECKPOINT_KEY_COLUMNS)
+    error_store = CheckpointStore(args.error_path, ERROR_COLUMNS, CHECKPOINT_KEY_COLUMNS)
+    raw_store = CheckpointStore(args.raw_parquet, RAW_COLUMNS, CHECKPOINT_KEY_COLUMNS)
     completed_keys = {
-        (str(row.corp_code), int(row.year))
-        for row in progress_df.itertuples(index=False)
-        if pd.notna(row.corp_code) and pd.notna(row.year)
+        (str(corp_code), int(year))
+        for corp_code, year in progress_store.keys()
+        if pd.notna(corp_code) and pd.notna(year)
     }
 
     reader = build_reader(api_key)
+    rate_limiter = build_rate_limiter(args.requests_per_minute)
     total_tasks = len(included_df) * len(years)
+    if args.since is not None:
+        since = resolve_since(args.since, progress_store.to_frame())
+        today = pd.Timestamp.now(DART_TIMEZONE).tz_localize(None).normalize()
+        filings = fetch_annual_filings(reader, since, today, max_retries=args.max_retries, rate_limiter=rate_limiter)
+        delta_keys = filing_delta_keys(filings, included_df["corp_code"], years)
+        completed_keys = delta_completed_keys(completed_keys, delta_keys)
+        if statement_cache is not None:
+            for corp_code, year in delta_keys:
+                statement_cache.invalidate(corp_code, year, REPORT_CODE)
+        total_tasks = len(delta_keys)
+        print(f"filings since {since:%Y-%m-%d}: {len(filings):,} annual reports, {total_tasks:,} company-years to refresh")
     processed = 0
 
-    for company in included_df.to_dict("records"):
-        for year in years:
-            key = (company["corp_code"], int(year))
-            if key in completed_keys:
-                continue
+    def fetch_task(company: dict[str, Any], year: int) -> tuple[FetchResult, dict[str, Any]]:
+        return fetch_company_year(
+            reader,
+            company,
+            year,
+            request_sleep=args.request_sleep,
+            max_retries=args.max_retries,
+            rate_limiter=rate_limiter,
+            statement_cache=statement_cache,
+        )
 
+    tasks = iter_pending_tasks(included_df, years, completed_keys)
+    try:
+        for company, year, future in run_fetch_tasks(tasks, fetch_task, workers=args.workers):
+            key = (company["corp_code"], int(year))
             processed += 1
             if processed == 1 or processed % 25 == 0 or processed == total_tasks:
                 print(f"processing {processed}/{total_tasks}: {company['stock_code']} {company['name']} {year}")
 
             try:
-                fetch_result = fetch_financial_statement(
-                    reader,
-                    company["corp_code"],
-                    int(year),
-                    request_sleep=args.request_sleep,
-                    max_retries=args.max_retries,
+                fetch_result, record = future.result()
+                raw_store.upsert(record)
+                progress_store.upsert(
+                    {
+                        "market": company["market"],
+                        "stock_code": company["stock_code"],
+                        "corp_code": company["corp_code"],
+                        "name": company["name"],
+                        "year": int(year),
+                        "report_code": REPORT_CODE,
+                        "fs_div_used": fetch_result.fs_div_used,
+                        "source_status": record["source_status"],
+                        "processed_at": utc_now(),
+                    }
                 )
-                record = build_raw_record(
-                    company_row=company,
-                    year=int(year),
-                    frame=fetch_result.frame,
-                    fs_div_used=fetch_result.fs_div_used,
-                    base_status=fetch_result.source_status,
-                    report_code=REPORT_CODE,
-                )
-                record_df = pd.DataFrame([record], columns=list(RAW_COLUMNS))
-                raw_df = upsert_rows(raw_df, record_df, ["corp_code", "year"])
-                save_parquet_frame(raw_df, args.raw_parquet)
-
-                progress_row = pd.DataFrame(
-                    [
-                        {
-                            "market": company["market"],
-                            "stock_code": company["stock_code"],
-                            "corp_code": company["corp_code"],
-                            "name": company["name"],
-                            "year": int(year),
-                            "report_code": REPORT_CODE,
-                            "fs_div_used": fetch_result.fs_div_used,
-                            "source_status": record["source_status"],
-                            "processed_at": utc_now(),
-                        }
-                    ],
-                    columns=list(PROGRESS_COLUMNS),
-                )
-                progress_df = upsert_rows(progress_df, progress_row, ["corp_code", "year"])
-                save_parquet_frame(progress_df, args.progress_path)
-                if not error_df.empty:
-                    error_df = error_df.loc[
-                        ~(
-                            error_df["corp_code"].eq(company["corp_code"])
-                            & error_df["year"].astype("Int64").eq(int(year))
-                        )
-                    ].reset_index(drop=True)
-                    save_parquet_frame(error_df, args.error_path)
+                error_store.delete(key)
                 completed_keys.add(key)
             except Exception as exc:
-                error_row = pd.DataFrame(
-                    [
-                        {
-                            "market": company["market"],
-                            "stock_code": company["stock_code"],
-                            "corp_code": company["corp_code"],
-                            "name": company["name"],
-                            "year": int(year),
-                            "report_code": REPORT_CODE,
-                            "error_type": type(exc).__name__,
-                            "error_message": str(exc),
-                            "processed_at": utc_now(),
-                        }
-                    ],
-                    columns=list(ERROR_COLUMNS),
+                error_store.upsert(
+                    {
+                        "market": company["market"],
+                        "stock_code": company["stock_code"],
+                        "corp_code": company["corp_code"],
+                        "name": company["name"],
+                        "year": int(year),
+                        "report_code": REPORT_CODE,
+                        "error_type": type(exc).__name__,
+                        "error_message": str(exc),
+                        "processed_at": utc_now(),
+                    }
                 )
-                error_df = upsert_rows(error_df, error_row, ["corp_code", "year"])
-                save_parquet_frame(error_df, args.error_path)
                 print(f"skip {company['stock_code']} {company['name']} {year}: {type(exc).__name__}: {exc}")
+    finally:
+        raw_store.close()
+        progress_store.close()
+        error_store.close()
+
+    return raw_store.to_frame()
+
+
+def main() -> int:
+    args = parse_args()
+    args.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    years = tuple(sorted(set(args.years)))
+    universe_df = load_input_universe(args.input_path)
+    statement_cache = StatementCache(args.statement_cache_dir)
+    api_key = ""
+    if args.from_cache:
+        included_df, excluded_df = split_cached_universe(universe_df, args.corp_code_index)
+    else:
+        api_key = get_default_api_key()
+        if not api_key:
+            print("DART API key not found. Set DART_API_KEY or provide corp_code_extractor/corp_list.py API_KEY.")
+            return 1
+        included_df, excluded_df = resolve_corp_codes(universe_df, api_key, index_path=args.corp_code_index)
+    if args.limit is not None:
+        included_df = included_df.head(args.limit).reset_index(drop=True)
+
+    print(f"input rows: {len(universe_df):,}")
+    print(f"included rows: {len(included_df):,}")
+    print(f"excluded rows: {len(excluded_df):,}")
 
-    if progress_df.empty:
-        progress_df = empty_progress_frame()
-    if error_df.empty:
-        error_df = empty_error_frame()
+    if args.from_cache:
+        raw_df = build_cached_raw_frame(included_df, years, statement_cache)
+        print(f"cached rows: {len(raw_df):,}/{len(included_df) * len(years):,}")
+    else:
+        raw_df = fetch_raw_frame(args, api_key, included_df, years, statement_cache)
 
     excluded_rows = build_excluded_rows(excluded_df, years=years, report_code=REPORT_CODE)
     raw_export_df = pd.concat([raw_df, excluded_rows], ignore_index=True)
     raw_export_df = raw_export_df.sort_values(["market", "stock_code", "year"]).reset_index(drop=True)
     export_csv(raw_export_df, args.raw_csv)
 
-    exact_df = build_result_frame(raw_df, "icr_exact")
+    exact_df = build_result_frame(raw_df, "icr_exact", years)
     proxy_source_df = raw_df.copy()
     proxy_source_df["icr_proxy_fallback"] = build_proxy_metric_series(proxy_source_df)
-    proxy_df = build_result_frame(proxy_source_df, "icr_proxy_fallback")
+    proxy_df = build_result_frame(proxy_source_df, "icr_proxy_fallback", years)
+    if args.quote_path is not None:
+        quote_df = load_parquet_frame(args.quote_path, WR_QUOTE_COLUMNS)
+        trading_rules = args.trading_rules or DEFAULT_TRADING_RULES
+        exact_df = filter_result_frame_by_trading_status(exact_df, quote_df, trading_rules)
+        proxy_df = filter_result_frame_by_trading_status(proxy_df, quote_df, trading_rules)
 
     export_csv(exact_df, args.exact_csv)
     export_csv(proxy_df, args.proxy_csv)
+    if args.sweep_csv is not None and not raw_df.empty:
+        exact_sweep = build_sweep_frame(build_metric_panel(raw_df, "icr_exact"), args.sweep_thresholds, args.sweep_years)
+        proxy_sweep = build_sweep_frame(build_metric_panel(proxy_source_df, "icr_proxy_fallback"), args.sweep_thresholds, args.sweep_years)
+        sweep_df = pd.concat([exact_sweep.assign(metric="icr_exact"), proxy_sweep.assign(metric="icr_proxy_fallback")], ignore_index=True)
+        export_csv(sweep_df, args.sweep_csv)
+        print(f"sweep csv: {args.sweep_csv}")
 
     print_top20("[exact top 20]", exact_df)
     print_top20("[proxy top 20]", proxy_df)
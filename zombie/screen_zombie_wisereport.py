@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
+import requests
 
-from zombie.common_io import DEFAULT_INPUT_PATH, load_input_universe, load_parquet_frame, save_parquet_frame, upsert_rows, utc_now
+from shared.concurrency import run_fetch_tasks
+from shared.rate_limiter import TokenBucket
+from zombie.common_io import DEFAULT_INPUT_PATH, CheckpointStore, load_input_universe, utc_now
+from zombie.dart_fetcher import DEFAULT_YEARS
 from zombie.screen_zombie import export_csv
 from zombie.wisereport_fetcher import (
+    DEFAULT_ENCPARAM_TTL_SECONDS,
     DEFAULT_WR_ERROR_PATH,
     DEFAULT_WR_FIN_GUBUN,
     DEFAULT_WR_FRQ_TYP,
@@ -15,32 +22,44 @@ from zombie.wisereport_fetcher import (
     DEFAULT_WR_QUOTE_ERROR_PATH,
     DEFAULT_WR_QUOTE_PATH,
     DEFAULT_WR_RAW_PARQUET_PATH,
+    DEFAULT_WR_REQUESTS_PER_MINUTE,
     DEFAULT_WR_RPT,
+    DEFAULT_WR_WORKERS,
     WR_ERROR_COLUMNS,
     WR_PROGRESS_COLUMNS,
     WR_QUOTE_COLUMNS,
     WR_QUOTE_ERROR_COLUMNS,
     WR_RAW_COLUMNS,
+    EncparamCache,
+    WiseReportFetchResult,
     build_raw_payload_row,
     build_session,
-    empty_error_frame,
-    empty_progress_frame,
-    empty_quote_error_frame,
-    empty_quote_frame,
     fetch_overview_page_with_retries,
     fetch_indicator_payload_with_retries,
 )
 from zombie.wisereport_parser import (
-    WR_LONG_COLUMNS,
-    build_long_frame,
+    DEFAULT_TRADING_RULES,
+    DEFAULT_WR_INDICATORS,
+    TRADING_RULE_MASKS,
+    build_indicator_frame,
     build_quote_frame,
     build_result_frame,
     filter_result_frame_by_trading_status,
+    iter_payload_batches,
     parse_quote_snapshot,
 )
 
 DEFAULT_WR_RAW_CSV_PATH = Path("zombie/data/icr_2022_2024_ifrss_long.csv")
 DEFAULT_WR_RESULT_CSV_PATH = Path("zombie/data/icr_2022_2024_ifrss.csv")
+WR_CHECKPOINT_KEY_COLUMNS = ("stock_code", "rpt", "fin_gubun", "frq_typ")
+
+
+@dataclass(frozen=True)
+class StockFetchOutcome:
+    payload: WiseReportFetchResult | None = None
+    payload_error: Exception | None = None
+    quote: dict[str, Any] | None = None
+    quote_error: Exception | None = None
 
 
 def parse_args() -> argparse.Namespace:
@@ -53,13 +72,40 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--quote-error-path", type=Path, default=DEFAULT_WR_QUOTE_ERROR_PATH)
     parser.add_argument("--raw-csv", type=Path, default=DEFAULT_WR_RAW_CSV_PATH)
     parser.add_argument("--result-csv", type=Path, default=DEFAULT_WR_RESULT_CSV_PATH)
+    parser.add_argument("--years", nargs="+", type=int, default=list(DEFAULT_YEARS))
     parser.add_argument("--limit", type=int, default=None)
-    parser.add_argument("--request-sleep", type=float, default=0.1)
+    parser.add_argument("--request-sleep", type=float, default=0.0)
     parser.add_argument("--max-retries", type=int, default=4)
     parser.add_argument("--timeout", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WR_WORKERS)
+    parser.add_argument("--requests-per-minute", type=float, default=DEFAULT_WR_REQUESTS_PER_MINUTE)
+    parser.add_argument(
+        "--indicator",
+        dest="indicators",
+        action="append",
+        type=parse_indicator,
+        default=[],
+        help="Extra payload indicator to export as alias=ACC_NM; may be repeated.",
+    )
+    parser.add_argument(
+        "--trading-rule",
+        dest="trading_rules",
+        action="append",
+        choices=sorted(TRADING_RULE_MASKS),
+        default=None,
+        help="Abnormal-trading rule used to drop stocks; may be repeated (default: halted_signature).",
+    )
+    parser.add_argument("--encparam-ttl", type=float, default=DEFAULT_ENCPARAM_TTL_SECONDS)
     return parser.parse_args()
 
 
+def parse_indicator(value: str) -> tuple[str, str]:
+    alias, separator, account_name = value.partition("=")
+    if not separator or not alias.strip() or not account_name.strip():
+        raise argparse.ArgumentTypeError("indicator must look like alias=ACC_NM, e.g. debt_ratio=부채비율")
+    return alias.strip(), account_name.strip()
+
+
 def print_top20(df: pd.DataFrame) -> None:
     print()
     print("[wisereport top 20]")
@@ -69,6 +115,47 @@ def print_top20(df: pd.DataFrame) -> None:
     print(df.head(20).to_string(index=False))
 
 
+def fetch_stock(
+    session: requests.Session,
+    company: dict[str, Any],
+    fetch_payload: bool,
+    fetch_quote: bool,
+    timeout: float,
+    request_sleep: float,
+    max_retries: int,
+    encparam_cache: EncparamCache | None = None,
+) -> StockFetchOutcome:
+    payload = payload_error = quote = quote_error = None
+    if fetch_payload:
+        try:
+            payload = fetch_indicator_payload_with_retries(
+                session=session,
+                stock_code=company["stock_code"],
+                rpt=DEFAULT_WR_RPT,
+                fin_gubun=DEFAULT_WR_FIN_GUBUN,
+                frq_typ=DEFAULT_WR_FRQ_TYP,
+                timeout=timeout,
+                request_sleep=request_sleep,
+                max_retries=max_retries,
+                encparam_cache=encparam_cache,
+            )
+        except Exception as exc:
+            payload_error = exc
+    if fetch_quote:
+        try:
+            page_html = fetch_overview_page_with_retries(
+                session=session,
+                stock_code=company["stock_code"],
+                timeout=timeout,
+                request_sleep=request_sleep,
+                max_retries=max_retries,
+            )
+            quote = parse_quote_snapshot({"fetched_at": utc_now(), **company}, page_html)
+        except Exception as exc:
+            quote_error = exc
+    return StockFetchOutcome(payload=payload, payload_error=payload_error, quote=quote, quote_error=quote_error)
+
+
 def main() -> int:
     args = parse_args()
 
@@ -76,89 +163,84 @@ def main() -> int:
     if args.limit is not None:
         universe_df = universe_df.head(args.limit).reset_index(drop=True)
 
-    progress_df = load_parquet_frame(args.progress_path, WR_PROGRESS_COLUMNS)
-    error_df = load_parquet_frame(args.error_path, WR_ERROR_COLUMNS)
-    raw_df = load_parquet_frame(args.raw_parquet, WR_RAW_COLUMNS)
-    quote_df = load_parquet_frame(args.quote_path, WR_QUOTE_COLUMNS)
-    quote_error_df = load_parquet_frame(args.quote_error_path, WR_QUOTE_ERROR_COLUMNS)
+    progress_store = CheckpointStore(args.progress_path, WR_PROGRESS_COLUMNS, WR_CHECKPOINT_KEY_COLUMNS)
+    error_store = CheckpointStore(args.error_path, WR_ERROR_COLUMNS, WR_CHECKPOINT_KEY_COLUMNS)
+    raw_store = CheckpointStore(args.raw_parquet, WR_RAW_COLUMNS, WR_CHECKPOINT_KEY_COLUMNS)
+    quote_store = CheckpointStore(args.quote_path, WR_QUOTE_COLUMNS, ("stock_code",))
+    quote_error_store = CheckpointStore(args.quote_error_path, WR_QUOTE_ERROR_COLUMNS, ("stock_code",))
 
     completed_keys = {
-        (str(row.stock_code), int(row.rpt), str(row.fin_gubun), str(row.frq_typ))
-        for row in progress_df.itertuples(index=False)
-        if pd.notna(row.stock_code)
+        (str(stock_code), int(rpt), str(fin_gubun), str(frq_typ))
+        for stock_code, rpt, fin_gubun, frq_typ in progress_store.keys()
+        if pd.notna(stock_code)
     }
-    completed_quote_codes = {str(row.stock_code) for row in quote_df.itertuples(index=False) if pd.notna(row.stock_code)}
+    completed_quote_codes = {str(stock_code) for (stock_code,) in quote_store.keys() if pd.notna(stock_code)}
 
-    session = build_session()
+    workers = max(1, args.workers)
+    session = build_session(pool_size=workers, rate_limiter=TokenBucket.per_minute(args.requests_per_minute))
+    encparam_cache = EncparamCache(ttl_seconds=args.encparam_ttl)
     total_tasks = len(universe_df)
-    processed = 0
 
-    for company in universe_df.to_dict("records"):
-        key = (company["stock_code"], DEFAULT_WR_RPT, DEFAULT_WR_FIN_GUBUN, DEFAULT_WR_FRQ_TYP)
-        if key in completed_keys:
-            continue
+    def payload_key(company: dict[str, Any]) -> tuple[str, int, str, str]:
+        return (company["stock_code"], DEFAULT_WR_RPT, DEFAULT_WR_FIN_GUBUN, DEFAULT_WR_FRQ_TYP)
 
-        processed += 1
-        if processed == 1 or processed % 25 == 0 or processed == total_tasks:
-            print(f"processing {processed}/{total_tasks}: {company['stock_code']} {company['name']}")
+    def fetch_task(company: dict[str, Any], _: int) -> StockFetchOutcome:
+        return fetch_stock(
+            session,
+            company,
+            fetch_payload=payload_key(company) not in completed_keys,
+            fetch_quote=company["stock_code"] not in completed_quote_codes,
+            timeout=args.timeout,
+            request_sleep=args.request_sleep,
+            max_retries=args.max_retries,
+            encparam_cache=encparam_cache,
+        )
 
-        try:
-            result = fetch_indicator_payload_with_retries(
-                session=session,
-                stock_code=company["stock_code"],
-                rpt=DEFAULT_WR_RPT,
-                fin_gubun=DEFAULT_WR_FIN_GUBUN,
-                frq_typ=DEFAULT_WR_FRQ_TYP,
-                timeout=args.timeout,
-                request_sleep=args.request_sleep,
-                max_retries=args.max_retries,
-            )
-            raw_row = build_raw_payload_row(
-                company_row=company,
-                payload_json=result.payload_json,
-                rpt=DEFAULT_WR_RPT,
-                fin_gubun=DEFAULT_WR_FIN_GUBUN,
-                frq_typ=DEFAULT_WR_FRQ_TYP,
-                source_status=result.source_status,
-            )
-            raw_df = upsert_rows(raw_df, raw_row, ["stock_code", "rpt", "fin_gubun", "frq_typ"])
-            save_parquet_frame(raw_df, args.raw_parquet)
+    tasks = (
+        (company, index)
+        for index, company in enumerate(universe_df.to_dict("records"), start=1)
+        if payload_key(company) not in completed_keys or company["stock_code"] not in completed_quote_codes
+    )
+    try:
+        for processed, (company, index, future) in enumerate(run_fetch_tasks(tasks, fetch_task, workers=workers), start=1):
+            stock_code = company["stock_code"]
+            key = payload_key(company)
+            if processed == 1 or processed % 25 == 0 or index == total_tasks:
+                print(f"processing {processed} (#{index}/{total_tasks}): {stock_code} {company['name']}")
 
-            progress_row = pd.DataFrame(
-                [
+            outcome = future.result()
+            if outcome.payload is not None:
+                raw_store.upsert_frame(
+                    build_raw_payload_row(
+                        company_row=company,
+                        payload_json=outcome.payload.payload_json,
+                        rpt=DEFAULT_WR_RPT,
+                        fin_gubun=DEFAULT_WR_FIN_GUBUN,
+                        frq_typ=DEFAULT_WR_FRQ_TYP,
+                        source_status=outcome.payload.source_status,
+                    )
+                )
+                progress_store.upsert(
                     {
                         "market": company["market"],
-                        "stock_code": company["stock_code"],
+                        "stock_code": stock_code,
                         "corp_code": company["corp_code"],
                         "name": company["name"],
                         "rpt": DEFAULT_WR_RPT,
                         "fin_gubun": DEFAULT_WR_FIN_GUBUN,
                         "frq_typ": DEFAULT_WR_FRQ_TYP,
-                        "source_status": result.source_status,
+                        "source_status": outcome.payload.source_status,
                         "processed_at": utc_now(),
                     }
-                ],
-                columns=list(WR_PROGRESS_COLUMNS),
-            )
-            progress_df = upsert_rows(progress_df, progress_row, ["stock_code", "rpt", "fin_gubun", "frq_typ"])
-            save_parquet_frame(progress_df, args.progress_path)
-            if not error_df.empty:
-                error_df = error_df.loc[
-                    ~(
-                        error_df["stock_code"].eq(company["stock_code"])
-                        & error_df["rpt"].astype("Int64").eq(DEFAULT_WR_RPT)
-                        & error_df["fin_gubun"].eq(DEFAULT_WR_FIN_GUBUN)
-                        & error_df["frq_typ"].eq(DEFAULT_WR_FRQ_TYP)
-                    )
-                ].reset_index(drop=True)
-                save_parquet_frame(error_df, args.error_path)
-            completed_keys.add(key)
-        except Exception as exc:
-            error_row = pd.DataFrame(
-                [
+                )
+                error_store.delete(key)
+                completed_keys.add(key)
+            elif outcome.payload_error is not None:
+                exc = outcome.payload_error
+                error_store.upsert(
                     {
                         "market": company["market"],
-                        "stock_code": company["stock_code"],
+                        "stock_code": stock_code,
                         "corp_code": company["corp_code"],
                         "name": company["name"],
                         "rpt": DEFAULT_WR_RPT,
@@ -168,42 +250,16 @@ def main() -> int:
                         "error_message": str(exc),
                         "processed_at": utc_now(),
                     }
-                ],
-                columns=list(WR_ERROR_COLUMNS),
-            )
-            error_df = upsert_rows(error_df, error_row, ["stock_code", "rpt", "fin_gubun", "frq_typ"])
-            save_parquet_frame(error_df, args.error_path)
-            print(f"skip {company['stock_code']} {company['name']}: {type(exc).__name__}: {exc}")
-
-    quote_rows: list[dict[str, object]] = []
-    for index, company in enumerate(universe_df.to_dict("records"), start=1):
-        stock_code = company["stock_code"]
-        if stock_code in completed_quote_codes:
-            continue
-
-        if index == 1 or index % 25 == 0 or index == total_tasks:
-            print(f"quote {index}/{total_tasks}: {stock_code} {company['name']}")
+                )
+                print(f"skip {stock_code} {company['name']}: {type(exc).__name__}: {exc}")
 
-        try:
-            page_html = fetch_overview_page_with_retries(
-                session=session,
-                stock_code=stock_code,
-                timeout=args.timeout,
-                request_sleep=args.request_sleep,
-                max_retries=args.max_retries,
-            )
-            quote_rows.append(parse_quote_snapshot({"fetched_at": utc_now(), **company}, page_html))
-            if len(quote_rows) >= 25:
-                quote_df = upsert_rows(quote_df, build_quote_frame(quote_rows), ["stock_code"])
-                save_parquet_frame(quote_df, args.quote_path)
-                quote_rows = []
-            if not quote_error_df.empty:
-                quote_error_df = quote_error_df.loc[~quote_error_df["stock_code"].eq(stock_code)].reset_index(drop=True)
-                save_parquet_frame(quote_error_df, args.quote_error_path)
-            completed_quote_codes.add(stock_code)
-        except Exception as exc:
-            quote_error_row = pd.DataFrame(
-                [
+            if outcome.quote is not None:
+                quote_store.upsert(outcome.quote)
+                quote_error_store.delete((stock_code,))
+                completed_quote_codes.add(stock_code)
+            elif outcome.quote_error is not None:
+                exc = outcome.quote_error
+                quote_error_store.upsert(
                     {
                         "market": company["market"],
                         "stock_code": stock_code,
@@ -213,39 +269,24 @@ def main() -> int:
                         "error_message": str(exc),
                         "processed_at": utc_now(),
                     }
-                ],
-                columns=list(WR_QUOTE_ERROR_COLUMNS),
-            )
-            quote_error_df = upsert_rows(quote_error_df, quote_error_row, ["stock_code"])
-            save_parquet_frame(quote_error_df, args.quote_error_path)
-            print(f"quote skip {stock_code} {company['name']}: {type(exc).__name__}: {exc}")
-
-    if quote_rows:
-        quote_df = upsert_rows(quote_df, build_quote_frame(quote_rows), ["stock_code"])
-        save_parquet_frame(quote_df, args.quote_path)
-
-    if progress_df.empty:
-        progress_df = empty_progress_frame()
-    if error_df.empty:
-        error_df = empty_error_frame()
-    if quote_df.empty:
-        quote_df = empty_quote_frame()
-    if quote_error_df.empty:
-        quote_error_df = empty_quote_error_frame()
-
-    export_source_df = raw_df.loc[
-        raw_df["rpt"].astype("Int64").eq(DEFAULT_WR_RPT)
-        & raw_df["fin_gubun"].eq(DEFAULT_WR_FIN_GUBUN)
-        & raw_df["frq_typ"].eq(DEFAULT_WR_FRQ_TYP)
-    ].copy()
+                )
+                print(f"quote skip {stock_code} {company['name']}: {type(exc).__name__}: {exc}")
+    finally:
+        for store in (raw_store, progress_store, error_store, quote_store, quote_error_store):
+            store.close()
 
-    long_df = build_long_frame(export_source_df)
-    if long_df.empty:
-        long_df = pd.DataFrame(columns=list(WR_LONG_COLUMNS))
+    indicators = {**DEFAULT_WR_INDICATORS, **dict(args.indicators)}
+    batches = (
+        iter_payload_batches(args.raw_parquet, rpt=DEFAULT_WR_RPT, fin_gubun=DEFAULT_WR_FIN_GUBUN, frq_typ=DEFAULT_WR_FRQ_TYP)
+        if args.raw_parquet.exists()
+        else iter(())
+    )
+    long_df = build_indicator_frame(batches, indicators)
+    quote_df = build_quote_frame(quote_store.to_frame().to_dict("records"))
     export_csv(long_df, args.raw_csv)
 
-    result_df = build_result_frame(long_df)
-    result_df = filter_result_frame_by_trading_status(result_df, quote_df)
+    result_df = build_result_frame(long_df, tuple(sorted(set(args.years))))
+    result_df = filter_result_frame_by_trading_status(result_df, quote_df, args.trading_rules or DEFAULT_TRADING_RULES)
     export_csv(result_df, args.result_csv)
     print_top20(result_df)
     print()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+ENTITY_COLUMNS = ("market", "stock_code", "corp_code", "name")
+
+
+@dataclass(frozen=True)
+class MetricPanel:
+    keys: pd.DataFrame
+    years: tuple[int, ...]
+    values: np.ndarray
+
+    def year_positions(self, years: Iterable[int]) -> np.ndarray:
+        lookup = {year: position for position, year in enumerate(self.years)}
+        return np.array([lookup.get(int(year), -1) for year in years], dtype=int)
+
+    def window(self, years: Sequence[int]) -> np.ndarray:
+        positions = self.year_positions(years)
+        window = np.full((len(self.keys), len(positions)), np.nan)
+        present = positions >= 0
+        window[:, present] = self.values[:, positions[present]]
+        return window
+
+
+def build_metric_panel(
+    long_df: pd.DataFrame,
+    metric_column: str,
+    key_columns: Sequence[str] = ENTITY_COLUMNS,
+    year_column: str = "year",
+) -> MetricPanel:
+    key_columns = list(key_columns)
+    metric = pd.to_numeric(long_df[metric_column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    year = pd.to_numeric(long_df[year_column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    entity = long_df.groupby(key_columns, sort=True, observed=True).ngroup().to_numpy()
+
+    valid = (entity >= 0) & ~np.isnan(metric) & ~np.isnan(year)
+    if not valid.any():
+        return MetricPanel(keys=pd.DataFrame(columns=key_columns), years=(), values=np.empty((0, 0)))
+
+    entity, year, metric = entity[valid], year[valid].astype(int), metric[valid]
+    years = np.arange(year.min(), year.max() + 1)
+    year_codes = year - year.min()
+    entities, entity_codes = np.unique(entity, return_inverse=True)
+    _, first_rows = np.unique(entity_codes * len(years) + year_codes, return_index=True)
+
+    values = np.full((len(entities), len(years)), np.nan)
+    values[entity_codes[first_rows], year_codes[first_rows]] = metric[first_rows]
+
+    source_rows = np.flatnonzero(valid)
+    _, key_rows = np.unique(entity_codes, return_index=True)
+    keys = long_df.iloc[source_rows[key_rows]][key_columns].reset_index(drop=True)
+    return MetricPanel(keys=keys, years=tuple(int(value) for value in years), values=values)
+
+
+def trailing_runs_below(values: np.ndarray, threshold: float | np.ndarray) -> np.ndarray:
+    thresholds = np.atleast_1d(np.asarray(threshold, dtype=float))
+    below = values[:, :, None] < thresholds[None, None, :]
+    runs = np.zeros(below.shape, dtype=np.int32)
+    for position in range(below.shape[1]):
+        previous = runs[:, position - 1] if position else 0
+        runs[:, position] = (previous + 1) * below[:, position]
+    return runs if np.ndim(threshold) else runs[:, :, 0]
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    padded_sums = np.concatenate([np.zeros((len(values), 1)), np.cumsum(np.where(valid, values, 0.0), axis=1)], axis=1)
+    padded_counts = np.concatenate([np.zeros((len(values), 1)), np.cumsum(valid, axis=1)], axis=1)
+    means = np.full(values.shape, np.nan)
+    if window <= values.shape[1]:
+        sums = padded_sums[:, window:] - padded_sums[:, :-window]
+        counts = padded_counts[:, window:] - padded_counts[:, :-window]
+        with np.errstate(invalid="ignore"):
+            means[:, window - 1 :] = np.where(counts == window, sums / window, np.nan)
+    return means
+
+
+def screen_columns(years: Sequence[int], prefix: str = "icr", key_columns: Sequence[str] = ENTITY_COLUMNS) -> list[str]:
+    return [*key_columns, *(f"{prefix}_{int(year)}" for year in sorted(years, reverse=True)), f"{prefix}_avg"]
+
+
+def screen_consecutive_below(
+    panel: MetricPanel,
+    years: Sequence[int],
+    threshold: float = 1.0,
+    mean_threshold: float | None = None,
+    prefix: str = "icr",
+) -> pd.DataFrame:
+    years = sorted((int(year) for year in years), reverse=True)
+    ordered_columns = screen_columns(years, prefix, panel.keys.columns)
+    value_columns = ordered_columns[len(panel.keys.columns) : -1]
+    average_column = ordered_columns[-1]
+    if panel.values.size == 0 or not years:
+        return pd.DataFrame(columns=ordered_columns)
+
+    window = panel.window(years)
+    complete = ~np.isnan(window).any(axis=1)
+    with np.errstate(invalid="ignore"):
+        passed = complete & (window < threshold).all(axis=1)
+        averages = window.mean(axis=1)
+    if mean_threshold is not None:
+        passed &= averages < mean_threshold
+
+    result = panel.keys.loc[passed].reset_index(drop=True)
+    for position, column in enumerate(value_columns):
+        result[column] = window[passed, position]
+    result[average_column] = averages[passed]
+    sort_columns = [average_column, *[column for column in ("market", "stock_code") if column in result.columns]]
+    return result.reindex(columns=ordered_columns).sort_values(sort_columns, kind="stable").reset_index(drop=True)
+
+
+def sweep_consecutive_below(
+    panel: MetricPanel,
+    thresholds: Sequence[float],
+    lengths: Sequence[int],
+) -> pd.DataFrame:
+    columns = ["end_year", "years", "threshold", "companies"]
+    if panel.values.size == 0:
+        return pd.DataFrame(columns=columns)
+    thresholds_array = np.asarray(thresholds, dtype=float)
+    lengths_array = np.asarray(lengths, dtype=int)
+    runs = trailing_runs_below(panel.values, thresholds_array)
+    counts = (runs[:, :, :, None] >= lengths_array[None, None, None, :]).sum(axis=0)
+    end_years, threshold_values, length_values = np.meshgrid(panel.years, thresholds_array, lengths_array, indexing="ij")
+    sweep = pd.DataFrame(
+        {
+            "end_year": end_years.ravel(),
+            "years": length_values.ravel(),
+            "threshold": threshold_values.ravel(),
+            "companies": counts.ravel(),
+        }
+    )
+    first_year = panel.years[0]
+    sweep = sweep.loc[sweep["end_year"] - sweep["years"] + 1 >= first_year]
+    return sweep.sort_values(["end_year", "years", "threshold"]).reset_index(drop=True)
+
+
+def sweep_rolling_mean_below(
+    panel: MetricPanel,
+    thresholds: Sequence[float],
+    windows: Sequence[int],
+) -> pd.DataFrame:
+    columns = ["end_year", "years", "threshold", "companies"]
+    if panel.values.size == 0:
+        return pd.DataFrame(columns=columns)
+    thresholds_array = np.asarray(thresholds, dtype=float)
+    frames = []
+    for window in windows:
+        means = rolling_mean(panel.values, int(window))
+        with np.errstate(invalid="ignore"):
+            counts = (means[:, :, None] < thresholds_array[None, None, :]).sum(axis=0)
+        end_years, threshold_values = np.meshgrid(panel.years, thresholds_array, indexing="ij")
+        frame = pd.DataFrame(
+            {
+                "end_year": end_years.ravel(),
+                "years": int(window),
+                "threshold": threshold_values.ravel(),
+                "companies": counts.ravel(),
+            }
+        )
+        frames.append(frame.loc[frame["end_year"] - int(window) + 1 >= panel.years[0]])
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True).sort_values(["end_year", "years", "threshold"]).reset_index(drop=True)
+
+
+def build_sweep_frame(panel: MetricPanel, thresholds: Sequence[float], lengths: Sequence[int]) -> pd.DataFrame:
+    consecutive = sweep_consecutive_below(panel, thresholds, lengths).assign(rule="consecutive_below")
+    mean = sweep_rolling_mean_below(panel, thresholds, lengths).assign(rule="rolling_mean_below")
+    sweep = pd.concat([consecutive, mean], ignore_index=True)
+    return sweep.reindex(columns=["rule", "end_year", "years", "threshold", "companies"])
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from zombie.common_io import utc_now
+
+DEFAULT_STATEMENT_CACHE_DIR = Path("zombie/data/statement_cache")
+DEFAULT_EMPTY_TTL_DAYS = 7.0
+STATEMENT_CACHE_VERSION = 1
+STATEMENT_KEY_COLUMNS = ("corp_code", "year", "reprt_code", "fs_div")
+CACHE_ENTRY_COLUMNS = (*STATEMENT_KEY_COLUMNS, "row_count", "content_hash", "immutable", "fetched_at")
+_METADATA_KEY = b"zombie_statement_cache"
+_PARTITION_PATTERN = re.compile(r"year=(\d{4})/reprt_code=(\w+)/fs_div=(\w+)/([^/]+)\.parquet$")
+
+
+@dataclass(frozen=True)
+class CachedStatement:
+    frame: pd.DataFrame
+    content_hash: str
+    immutable: bool
+    fetched_at: str
+
+
+def content_hash(frame: pd.DataFrame) -> str:
+    payload = frame.to_csv(index=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _is_expired(fetched_at: str, ttl_days: float | None) -> bool:
+    if ttl_days is None:
+        return False
+    fetched = pd.Timestamp(fetched_at)
+    if fetched.tzinfo is None:
+        fetched = fetched.tz_localize("UTC")
+    return pd.Timestamp.now("UTC") - fetched > pd.Timedelta(days=ttl_days)
+
+
+class StatementCache:
+    def __init__(self, root: str | Path = DEFAULT_STATEMENT_CACHE_DIR, empty_ttl_days: float | None = DEFAULT_EMPTY_TTL_DAYS) -> None:
+        self.root = Path(root)
+        self.empty_ttl_days = empty_ttl_days
+
+    def path_for(self, corp_code: str, year: int, reprt_code: str, fs_div: str) -> Path:
+        return self.root / f"year={int(year)}" / f"reprt_code={reprt_code}" / f"fs_div={fs_div}" / f"{corp_code}.parquet"
+
+    def _read_metadata(self, path: Path) -> dict[str, object]:
+        metadata = pq.read_schema(path).metadata or {}
+        raw = metadata.get(_METADATA_KEY)
+        return json.loads(raw) if raw else {}
+
+    def get(self, corp_code: str, year: int, reprt_code: str, fs_div: str) -> CachedStatement | None:
+        path = self.path_for(corp_code, year, reprt_code, fs_div)
+        if not path.exists():
+            return None
+        table = pq.read_table(path)
+        raw_metadata = (table.schema.metadata or {}).get(_METADATA_KEY)
+        metadata = json.loads(raw_metadata) if raw_metadata else {}
+        if metadata.get("version") != STATEMENT_CACHE_VERSION:
+            return None
+        immutable = bool(metadata.get("immutable"))
+        fetched_at = str(metadata.get("fetched_at", ""))
+        if not immutable and _is_expired(fetched_at, self.empty_ttl_days):
+            return None
+        frame = table.replace_schema_metadata(None).to_pandas()
+        return CachedStatement(
+            frame=frame,
+            content_hash=str(metadata.get("content_hash", "")),
+            immutable=immutable,
+            fetched_at=fetched_at,
+        )
+
+    def put(
+        self,
+        corp_code: str,
+        year: int,
+        reprt_code: str,
+        fs_div: str,
+        frame: pd.DataFrame,
+        immutable: bool | None = None,
+    ) -> CachedStatement:
+        frame = frame.reset_index(drop=True).astype("string")
+        digest = content_hash(frame)
+        immutable = not frame.empty if immutable is None else immutable
+        path = self.path_for(corp_code, year, reprt_code, fs_div)
+        if path.exists():
+            existing = self._read_metadata(path)
+            if existing.get("content_hash") == digest and bool(existing.get("immutable")) and immutable:
+                return CachedStatement(frame=frame, content_hash=digest, immutable=True, fetched_at=str(existing["fetched_at"]))
+
+        fetched_at = utc_now()
+        metadata = {
+            "version": STATEMENT_CACHE_VERSION,
+            "content_hash": digest,
+            "immutable": immutable,
+            "fetched_at": fetched_at,
+            "row_count": len(frame),
+        }
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({_METADATA_KEY: json.dumps(metadata).encode("utf-8")})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+        return CachedStatement(frame=frame, content_hash=digest, immutable=immutable, fetched_at=fetched_at)
+
+    def invalidate(self, corp_code: str, year: int, reprt_code: str, fs_divs: Iterable[str] = ("CFS", "OFS")) -> int:
+        removed = 0
+        for fs_div in fs_divs:
+            path = self.path_for(corp_code, year, reprt_code, fs_div)
+            if path.exists():
+                path.unlink()
+                removed += 1
+        return removed
+
+    def _iter_paths(self, years: Iterable[int] | None, reprt_code: str | None) -> Iterable[tuple[tuple[str, int, str, str], Path]]:
+        year_filter = {int(year) for year in years} if years is not None else None
+        for path in sorted(self.root.glob("year=*/reprt_code=*/fs_div=*/*.parquet")):
+            match = _PARTITION_PATTERN.search(path.relative_to(self.root).as_posix())
+            if not match:
+                continue
+            year, path_reprt_code, fs_div, corp_code = match.groups()
+            if year_filter is not None and int(year) not in year_filter:
+                continue
+            if reprt_code is not None and path_reprt_code != reprt_code:
+                continue
+            yield (corp_code, int(year), path_reprt_code, fs_div), path
+
+    def entries(self, years: Iterable[int] | None = None, reprt_code: str | None = None) -> pd.DataFrame:
+        rows = []
+        for (corp_code, year, path_reprt_code, fs_div), path in self._iter_paths(years, reprt_code):
+            metadata = self._read_metadata(path)
+            if metadata.get("version") != STATEMENT_CACHE_VERSION:
+                continue
+            immutable = bool(metadata.get("immutable"))
+            fetched_at = str(metadata.get("fetched_at", ""))
+            if not immutable and _is_expired(fetched_at, self.empty_ttl_days):
+                continue
+            rows.append(
+                {
+                    "corp_code": corp_code,
+                    "year": year,
+                    "reprt_code": path_reprt_code,
+                    "fs_div": fs_div,
+                    "row_count": int(metadata.get("row_count", 0)),
+                    "content_hash": metadata.get("content_hash", ""),
+                    "immutable": immutable,
+                    "fetched_at": fetched_at,
+                }
+            )
+        return pd.DataFrame(rows, columns=list(CACHE_ENTRY_COLUMNS))
+
+    def load_statements(self, entries: pd.DataFrame) -> pd.DataFrame:
+        tables = []
+        for entry in entries.loc[entries["row_count"] > 0].itertuples(index=False):
+            table = pq.read_table(self.path_for(entry.corp_code, entry.year, entry.reprt_code, entry.fs_div))
+            table = table.replace_schema_metadata(None)
+            keys = {"corp_code": entry.corp_code, "year": entry.year, "reprt_code": entry.reprt_code, "fs_div": entry.fs_div}
+            for column, value in keys.items():
+                if column in table.column_names:
+                    table = table.drop_columns([column])
+                table = table.append_column(column, pa.array([value] * table.num_rows))
+            tables.append(table)
+        if not tables:
+            return pd.DataFrame(columns=list(STATEMENT_KEY_COLUMNS))
+        return pa.concat_tables(tables, promote_options="default").to_pandas()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from zombie.common_io import CheckpointStore, save_parquet_frame
+
+
+def test_checkpoint_store_appends_journal_and_compacts_on_close(tmp_path: Path) -> None:
+    path = tmp_path / "progress.parquet"
+    save_parquet_frame(pd.DataFrame([{"corp_code": "C1", "year": 2023, "status": "old"}]), path)
+
+    store = CheckpointStore(path, ["corp_code", "year", "status"], ["corp_code", "year"])
+    store.upsert({"corp_code": "C1", "year": 2023, "status": "new"})
+    store.upsert({"corp_code": "C2", "year": 2024, "status": "ok"})
+
+    assert store.journal_path.exists()
+    assert pd.read_parquet(path)["status"].tolist() == ["old"]
+
+    store.close()
+
+    assert not store.journal_path.exists()
+    assert pd.read_parquet(path).to_dict("records") == [
+        {"corp_code": "C1", "year": 2023, "status": "new"},
+        {"corp_code": "C2", "year": 2024, "status": "ok"},
+    ]
+
+
+def test_checkpoint_store_replays_journal_after_crash(tmp_path: Path) -> None:
+    path = tmp_path / "errors.parquet"
+    store = CheckpointStore(path, ["corp_code", "year", "message"], ["corp_code", "year"])
+    store.upsert({"corp_code": "C1", "year": 2024, "message": "timeout"})
+    store.upsert({"corp_code": "C2", "year": 2024, "message": "timeout"})
+    store.delete(("C1", 2024))
+    with store.journal_path.open("a", encoding="utf-8") as journal:
+        journal.write('{"op": "upsert", "row": {"corp_')
+
+    reopened = CheckpointStore(path, ["corp_code", "year", "message"], ["corp_code", "year"])
+
+    assert ("C2", 2024) in reopened
+    assert ("C1", 2024) not in reopened
+    assert reopened.to_frame().to_dict("records") == [{"corp_code": "C2", "year": 2024, "message": "timeout"}]
+
+
+def test_checkpoint_store_survives_two_crashes_before_compaction(tmp_path: Path) -> None:
+    path = tmp_path / "progress.parquet"
+    columns = ["corp_code", "year", "status"]
+    store = CheckpointStore(path, columns, ["corp_code", "year"])
+    store.upsert({"corp_code": "C1", "year": 2024, "status": "ok"})
+    with store.journal_path.open("a", encoding="utf-8") as journal:
+        journal.write('{"op": "upsert", "row": {"corp_')
+
+    first_restart = CheckpointStore(path, columns, ["corp_code", "year"])
+    first_restart.upsert({"corp_code": "C2", "year": 2024, "status": "ok"})
+    with first_restart.journal_path.open("a", encoding="utf-8") as journal:
+        journal.write('{"op": "del')
+
+    second_restart = CheckpointStore(path, columns, ["corp_code", "year"])
+    second_restart.upsert({"corp_code": "C3", "year": 2024, "status": "ok"})
+    third_restart = CheckpointStore(path, columns, ["corp_code", "year"])
+
+    assert third_restart.keys() == [("C1", 2024), ("C2", 2024), ("C3", 2024)]
+
+
+def test_checkpoint_store_writes_nothing_without_changes(tmp_path: Path) -> None:
+    path = tmp_path / "missing.parquet"
+
+    with CheckpointStore(path, ["stock_code"], ["stock_code"]) as store:
+        assert store.to_frame().empty
+
+    assert not path.exists()
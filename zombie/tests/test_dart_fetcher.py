@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
 import pandas as pd
@@ -7,6 +8,7 @@ import pytest
 import requests
 
 from zombie import dart_fetcher
+from zombie.statement_cache import StatementCache
 
 
 def test_load_input_universe_normalizes_codes(tmp_path: Path) -> None:
@@ -56,6 +58,35 @@ def test_resolve_corp_codes_fills_missing_values() -> None:
     ]
 
 
+def test_resolve_corp_codes_reuses_index_until_stale_or_unresolved(tmp_path: Path) -> None:
+    index_path = tmp_path / "corp_code_index.parquet"
+    downloads: list[str] = []
+
+    class FakeReader:
+        def __init__(self, _: str) -> None:
+            downloads.append("corp_codes")
+            self.corp_codes = pd.DataFrame([{"stock_code": "005930", "corp_code": "00126380"}])
+
+    universe = pd.DataFrame([{"market": "KOSPI", "name": "Alpha", "stock_code": "005930", "corp_code": ""}])
+    unknown = pd.DataFrame([{"market": "KOSPI", "name": "Beta", "stock_code": "000001", "corp_code": ""}])
+
+    dart_fetcher.resolve_corp_codes(universe, "test", reader_factory=FakeReader, index_path=index_path)
+    included, _ = dart_fetcher.resolve_corp_codes(universe, "test", reader_factory=FakeReader, index_path=index_path)
+    dart_fetcher.resolve_corp_codes(unknown, "test", reader_factory=FakeReader, index_path=index_path)
+    assert downloads == ["corp_codes"]
+    assert included["corp_code"].tolist() == ["00126380"]
+
+    meta_path = dart_fetcher.corp_code_index_meta_path(index_path)
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["fetched_at"] = (pd.Timestamp.now("UTC") - pd.Timedelta(days=2)).isoformat()
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    dart_fetcher.resolve_corp_codes(universe, "test", reader_factory=FakeReader, index_path=index_path)
+    assert downloads == ["corp_codes"]
+    dart_fetcher.resolve_corp_codes(unknown, "test", reader_factory=FakeReader, index_path=index_path)
+    assert downloads == ["corp_codes", "corp_codes"]
+
+
 def test_fetch_financial_statement_falls_back_to_ofs() -> None:
     calls: list[tuple[str, int, str]] = []
 
@@ -115,3 +146,131 @@ def test_get_default_api_key_from_local_file(monkeypatch: pytest.MonkeyPatch, tm
     monkeypatch.setattr(dart_fetcher, "Path", lambda value="": local_file if value == "corp_code_extractor/corp_list.py" else Path(value))
 
     assert dart_fetcher.get_default_api_key() == "test-key"
+
+
+def test_fetch_financial_statement_backs_off_limiter_on_retryable_error() -> None:
+    attempts = {"count": 0}
+
+    class FakeLimiter:
+        def __init__(self) -> None:
+            self.acquired = 0
+            self.backoffs: list[float] = []
+
+        def acquire(self) -> float:
+            self.acquired += 1
+            return 0.0
+
+        def backoff(self, seconds: float) -> None:
+            self.backoffs.append(seconds)
+
+    class FakeReader:
+        def finstate_all(self, corp_code: str, year: int, reprt_code: str, fs_div: str) -> pd.DataFrame:
+            attempts["count"] += 1
+            if attempts["count"] == 1:
+                response = requests.Response()
+                response.status_code = 429
+                raise requests.exceptions.HTTPError("too many requests", response=response)
+            return pd.DataFrame([{"sj_div": "IS", "account_nm": "영업이익", "thstrm_amount": "10"}])
+
+    limiter = FakeLimiter()
+    result = dart_fetcher.fetch_financial_statement(
+        FakeReader(), "00126380", 2024, request_sleep=0, max_retries=3, rate_limiter=limiter
+    )
+
+    assert result.source_status == "ok_cfs"
+    assert limiter.acquired == 2
+    assert limiter.backoffs == [1.0]
+
+
+def test_quiet_stdout_only_silences_current_thread(capsys: pytest.CaptureFixture[str]) -> None:
+    import threading
+
+    entered = threading.Event()
+    release = threading.Event()
+
+    def worker() -> None:
+        with dart_fetcher.quiet_stdout():
+            print("hidden")
+            entered.set()
+            release.wait(timeout=5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    entered.wait(timeout=5)
+    print("visible")
+    release.set()
+    thread.join(timeout=5)
+
+    assert capsys.readouterr().out == "visible\n"
+
+
+def test_quiet_stdout_restores_original_stream_after_last_exit() -> None:
+    import sys
+
+    original = sys.stdout
+    with dart_fetcher.quiet_stdout():
+        with dart_fetcher.quiet_stdout():
+            assert sys.stdout is not original
+            assert sys.stdout.encoding == original.encoding
+        assert sys.stdout is not original
+
+    assert sys.stdout is original
+
+
+def test_fetch_financial_statement_reads_through_statement_cache(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    class FakeReader:
+        def finstate_all(self, corp_code: str, year: int, reprt_code: str, fs_div: str) -> pd.DataFrame:
+            calls.append(fs_div)
+            if fs_div == "CFS":
+                return pd.DataFrame()
+            return pd.DataFrame([{"sj_div": "IS", "account_nm": "영업이익", "thstrm_amount": "10"}])
+
+    cache = StatementCache(tmp_path)
+    first = dart_fetcher.fetch_financial_statement(FakeReader(), "00126380", 2024, request_sleep=0, statement_cache=cache)
+    second = dart_fetcher.fetch_financial_statement(FakeReader(), "00126380", 2024, request_sleep=0, statement_cache=cache)
+
+    assert calls == ["CFS", "OFS"]
+    assert first.source_status == second.source_status == "ok_ofs"
+    assert second.frame["thstrm_amount"].tolist() == ["10"]
+
+
+def test_fetch_annual_filings_queries_list_in_windows() -> None:
+    calls: list[tuple[str, str, str, str]] = []
+
+    class FakeReader:
+        def list(self, start: str, end: str, kind: str, kind_detail: str, final: bool) -> pd.DataFrame:
+            calls.append((start, end, kind, kind_detail))
+            if start != "2024-01-01":
+                return pd.DataFrame()
+            return pd.DataFrame(
+                [
+                    {"corp_code": "C1", "report_nm": "사업보고서 (2023.12)", "rcept_no": "1", "rcept_dt": "20240315"},
+                    {"corp_code": "C2", "report_nm": "[기재정정]사업보고서 (2022.12)", "rcept_no": "2", "rcept_dt": "20240320"},
+                ]
+            )
+
+    filings = dart_fetcher.fetch_annual_filings(FakeReader(), pd.Timestamp("2024-01-01"), pd.Timestamp("2024-05-15"))
+
+    assert calls == [("2024-01-01", "2024-03-30", "A", "A001"), ("2024-03-31", "2024-05-15", "A", "A001")]
+    assert filings["rcept_no"].tolist() == ["1", "2"]
+
+
+def test_filing_delta_keys_parses_report_years() -> None:
+    filings = pd.DataFrame(
+        [
+            {"corp_code": "C1", "report_nm": "사업보고서 (2023.12)"},
+            {"corp_code": "C2", "report_nm": "[기재정정]사업보고서 (2022.12)"},
+            {"corp_code": "C3", "report_nm": "사업보고서 (2023.12)"},
+            {"corp_code": "C1", "report_nm": "사업보고서 (2019.12)"},
+            {"corp_code": "C2", "report_nm": "사업보고서"},
+        ]
+    )
+
+    keys = dart_fetcher.filing_delta_keys(filings, ["C1", "C2"], (2022, 2023, 2024))
+
+    assert keys == {("C1", 2023), ("C2", 2022)}
+    assert dart_fetcher.parse_report_year("[첨부정정]사업보고서 (2024.03)") == 2023
+    assert dart_fetcher.parse_report_year("사업보고서 (2024.06)") == 2023
+    assert dart_fetcher.filing_delta_keys(pd.DataFrame(), ["C1"], (2023,)) == set()
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
 import math
+from pathlib import Path
 
-from zombie.dart_fss_probe import extract_concept_value, select_best_context_value
+import pandas as pd
+
+from zombie.dart_fss_probe import (
+    ConceptIndex,
+    build_concept_index,
+    download_xbrl_archive,
+    extract_concept_value,
+    find_annual_report_rcept_no,
+    select_best_context_value,
+    select_income_statement_values,
+)
 
 
 class FakeStatement:
@@ -61,3 +72,93 @@ def test_extract_concept_value_returns_first_matching_concept() -> None:
     assert amount == 123.0
     assert concept_id == "ifrs-full_FinanceCosts"
     assert label == "Consolidated"
+
+
+def test_select_income_statement_values_falls_back_to_separate() -> None:
+    class FakeXbrl:
+        def get_income_statement(self, separate=False):
+            if not separate:
+                return None
+            return [
+                FakeStatement(
+                    {
+                        "dart_OperatingIncomeLoss": {("20230101-20231231", ("Separate",)): 50.0},
+                        "ifrs-full_OperatingIncomeLoss": {},
+                        "ifrs-full_FinanceCosts": {("20230101-20231231", ("Separate",)): 25.0},
+                        "ifrs-full_InterestExpense": {},
+                    }
+                )
+            ]
+
+    values, index = select_income_statement_values(FakeXbrl())
+
+    assert values["fs_div"] == "OFS"
+    assert values["operating_profit"] == 50.0
+    assert values["finance_costs"] == 25.0
+    assert values["has_interest_expense"] is False
+    assert values["error"] == ""
+    assert index is not None and index.lookup(("ifrs-full_FinanceCosts",)) == (25.0, "ifrs-full_FinanceCosts", "Separate")
+
+
+def test_find_annual_report_rcept_no_uses_shared_corp_list() -> None:
+    lookups: list[str] = []
+
+    class FakeReport:
+        rcept_no = "20240315000123"
+
+    class FakeCorp:
+        def search_filings(self, **kwargs):
+            assert kwargs["bgn_de"] == "20240101"
+            return [FakeReport()]
+
+    class FakeCorpList:
+        def find_by_corp_code(self, corp_code):
+            lookups.append(corp_code)
+            return FakeCorp()
+
+    corp_list = FakeCorpList()
+
+    assert find_annual_report_rcept_no(corp_list, "C1", 2024) == "20240315000123"
+    assert find_annual_report_rcept_no(corp_list, "C2", 2024) == "20240315000123"
+    assert lookups == ["C1", "C2"]
+
+
+def test_download_xbrl_archive_reuses_cached_archive(tmp_path: Path) -> None:
+    xbrl_path = tmp_path / "20240315000123" / "entity_2023" / "entity.xbrl"
+    xbrl_path.parent.mkdir(parents=True)
+    xbrl_path.write_text("<xbrl/>", encoding="utf-8")
+
+    assert download_xbrl_archive("20240315000123", tmp_path) == xbrl_path
+
+
+def test_concept_index_answers_lookups_and_round_trips_through_parquet(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    class CountingStatement(FakeStatement):
+        def get_value_by_concept_id(self, concept_id, lang="en"):
+            calls.append(concept_id)
+            return super().get_value_by_concept_id(concept_id, lang)
+
+    statement = CountingStatement(
+        {
+            "dart_OperatingIncomeLoss": {
+                ("20230101-20231231", ("Consolidated", "Disclosed Amount")): 30.0,
+                ("20230101-20231231", ("Consolidated",)): 20.0,
+                ("20220101-20221231", ("Consolidated",)): math.nan,
+            },
+            "ifrs-full_FinanceCosts": {("20230101-20231231", ("Separate",)): 5.0},
+        }
+    )
+
+    index = build_concept_index(statement, ("dart_OperatingIncomeLoss", "ifrs-full_FinanceCosts", "dart_OperatingIncomeLoss"), False)
+
+    assert calls == ["dart_OperatingIncomeLoss", "ifrs-full_FinanceCosts"]
+    assert index.lookup(("ifrs-full_InterestExpense", "dart_OperatingIncomeLoss")) == (20.0, "dart_OperatingIncomeLoss", "Consolidated")
+    assert index.lookup(("ifrs-full_FinanceCosts",)) == (5.0, "ifrs-full_FinanceCosts", "Separate")
+
+    path = tmp_path / "concept_index.parquet"
+    index.to_frame().to_parquet(path, index=False)
+    frame = pd.read_parquet(path)
+
+    assert frame["is_best"].tolist() == [False, True, True]
+    assert ConceptIndex.from_frame(frame).best == index.best
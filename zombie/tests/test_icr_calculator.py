@@ -7,22 +7,40 @@ import pandas as pd
 from zombie import icr_calculator
 
 
-def test_parse_amount_handles_parentheses_and_commas() -> None:
-    assert icr_calculator.parse_amount("(1,234)") == -1234
-    assert icr_calculator.parse_amount("2,500") == 2500
-    assert icr_calculator.parse_amount("") is None
+def test_parse_amount_series_handles_parentheses_and_commas() -> None:
+    amounts = icr_calculator.parse_amount_series(pd.Series(["(1,234)", "2,500", " 1 000 "]))
 
+    assert amounts.tolist() == [-1234, 2500, 1000]
 
-def test_amount_from_row_preserves_zero_and_does_not_fallback() -> None:
-    row = pd.Series({"thstrm_amount": "0", "thstrm_add_amount": "999"})
 
-    assert icr_calculator.amount_from_row(row) == 0
+def test_parse_amount_series_coerces_malformed_amounts_to_nan() -> None:
+    amounts = icr_calculator.parse_amount_series(pd.Series(["(1,234)", "N/A", "", "2,500"]))
 
+    assert amounts.iloc[0] == -1234
+    assert math.isnan(amounts.iloc[1])
+    assert math.isnan(amounts.iloc[2])
+    assert amounts.iloc[3] == 2500
 
-def test_amount_from_row_uses_fallback_only_for_blank_values() -> None:
-    row = pd.Series({"thstrm_amount": "", "thstrm_add_amount": "111"})
 
-    assert icr_calculator.amount_from_row(row) == 111
+def test_amount_series_preserves_zero_and_does_not_fallback() -> None:
+    frame = pd.DataFrame([{"thstrm_amount": "0", "thstrm_add_amount": "999"}])
+
+    assert icr_calculator.amount_series(frame).tolist() == [0]
+
+
+def test_amount_series_uses_fallback_only_for_blank_values() -> None:
+    frame = pd.DataFrame(
+        [
+            {"thstrm_amount": "", "thstrm_add_amount": "111"},
+            {"thstrm_amount": None, "thstrm_add_amount": "222"},
+            {"thstrm_amount": "", "thstrm_add_amount": None},
+        ]
+    )
+
+    amounts = icr_calculator.amount_series(frame)
+
+    assert amounts.tolist()[:2] == [111, 222]
+    assert math.isnan(amounts.iloc[2])
 
 
 def test_build_raw_record_prefers_is_row_and_computes_exact_and_proxy() -> None:
@@ -133,3 +151,40 @@ def test_build_excluded_rows_creates_one_row_per_year() -> None:
         {"stock_code": "001465", "year": 2022, "source_status": "excluded_no_corp_code"},
         {"stock_code": "001465", "year": 2023, "source_status": "excluded_no_corp_code"},
     ]
+
+
+def test_extract_metrics_falls_back_to_account_id_and_add_amount() -> None:
+    frame = pd.DataFrame(
+        [
+            {"sj_div": "CIS", "account_nm": "영업손익", "account_id": "ifrs-full_OperatingIncomeLoss", "ord": "3", "thstrm_amount": "(1,200)"},
+            {"sj_div": "CIS", "account_nm": "기타", "account_id": "OperatingIncomeLoss", "ord": "2", "thstrm_amount": "", "thstrm_add_amount": "-300"},
+            {"sj_div": "IS", "account_nm": "금융 원가", "account_id": "", "ord": "9", "thstrm_amount": "40"},
+            {"sj_div": "IS", "account_nm": "금융원가", "account_id": "", "ord": "5", "thstrm_amount": "60"},
+        ]
+    )
+
+    metrics = icr_calculator.extract_metrics(frame)
+
+    assert metrics == {"operating_profit": -300.0, "interest_expense_exact": None, "finance_cost_proxy": 60.0}
+
+
+def test_extract_metric_frame_resolves_many_statements_in_one_pass() -> None:
+    frame = pd.DataFrame(
+        [
+            {"corp_code": "C1", "year": 2024, "sj_div": "IS", "account_nm": "영업이익", "account_id": "", "ord": "1", "thstrm_amount": "100"},
+            {"corp_code": "C1", "year": 2024, "sj_div": "IS", "account_nm": "이자비용", "account_id": "", "ord": "2", "thstrm_amount": "25"},
+            {"corp_code": "C2", "year": 2024, "sj_div": "BS", "account_nm": "영업이익", "account_id": "", "ord": "1", "thstrm_amount": "999"},
+            {"corp_code": "C2", "year": 2024, "sj_div": "IS", "account_nm": "매출액", "account_id": "", "ord": "1", "thstrm_amount": "10"},
+            {"corp_code": "C2", "year": 2023, "sj_div": "IS", "account_nm": "FinanceCosts", "account_id": "", "ord": "4", "thstrm_amount": "7"},
+        ]
+    )
+
+    metric_frame = icr_calculator.extract_metric_frame(frame, group_columns=("corp_code", "year"))
+    records = metric_frame.sort_values(["corp_code", "year"]).to_dict("records")
+
+    assert [(row["corp_code"], row["year"]) for row in records] == [("C1", 2024), ("C2", 2023), ("C2", 2024)]
+    assert records[0]["operating_profit"] == 100
+    assert records[0]["interest_expense_exact"] == 25
+    assert math.isnan(records[0]["finance_cost_proxy"])
+    assert records[1]["finance_cost_proxy"] == 7
+    assert math.isnan(records[2]["operating_profit"])
@@ -3,8 +3,19 @@ from __future__ import annotations
 from pathlib import Path
 
 import pandas as pd
+import pytest
 
-from zombie.screen_zombie import export_csv
+from zombie import screen_zombie
+from zombie.screen_zombie import (
+    build_cached_raw_frame,
+    delta_completed_keys,
+    export_csv,
+    iter_pending_tasks,
+    resolve_since,
+    split_cached_universe,
+)
+from zombie.dart_fetcher import save_corp_code_index
+from zombie.statement_cache import StatementCache
 
 
 def test_export_csv_writes_utf8_bom(tmp_path: Path) -> None:
@@ -13,3 +24,139 @@ def test_export_csv_writes_utf8_bom(tmp_path: Path) -> None:
 
     data = path.read_bytes()
     assert data.startswith(b"\xef\xbb\xbf")
+
+
+def test_iter_pending_tasks_skips_completed_keys() -> None:
+    included = pd.DataFrame(
+        [
+            {"market": "KOSPI", "stock_code": "005930", "corp_code": "C1", "name": "A"},
+            {"market": "KOSDAQ", "stock_code": "000001", "corp_code": "C2", "name": "B"},
+        ]
+    )
+
+    tasks = list(iter_pending_tasks(included, (2023, 2024), {("C1", 2023)}))
+
+    assert [(company["corp_code"], year) for company, year in tasks] == [("C1", 2024), ("C2", 2023), ("C2", 2024)]
+
+
+def test_build_cached_raw_frame_recomputes_from_cached_statements(tmp_path: Path) -> None:
+    cache = StatementCache(tmp_path)
+    cache.put("C1", 2024, "11011", "CFS", pd.DataFrame())
+    cache.put(
+        "C1",
+        2024,
+        "11011",
+        "OFS",
+        pd.DataFrame(
+            [
+                {"sj_div": "IS", "account_nm": "영업이익", "thstrm_amount": "50"},
+                {"sj_div": "IS", "account_nm": "이자비용", "thstrm_amount": "100"},
+                {"sj_div": "IS", "account_nm": "금융비용", "thstrm_amount": "200"},
+            ]
+        ),
+    )
+    cache.put("C2", 2024, "11011", "CFS", pd.DataFrame())
+    cache.put("C2", 2024, "11011", "OFS", pd.DataFrame())
+    cache.put("C3", 2024, "11011", "CFS", pd.DataFrame())
+    included = pd.DataFrame(
+        [
+            {"market": "KOSPI", "stock_code": "000001", "corp_code": "C1", "name": "A"},
+            {"market": "KOSPI", "stock_code": "000002", "corp_code": "C2", "name": "B"},
+            {"market": "KOSPI", "stock_code": "000003", "corp_code": "C3", "name": "C"},
+        ]
+    )
+
+    raw_df = build_cached_raw_frame(included, (2024,), cache)
+
+    assert raw_df[["corp_code", "fs_div_used", "source_status"]].to_dict("records") == [
+        {"corp_code": "C1", "fs_div_used": "OFS", "source_status": "ok_ofs"},
+        {"corp_code": "C2", "fs_div_used": "", "source_status": "missing_statement"},
+    ]
+    assert raw_df["icr_exact"].tolist()[0] == 0.5
+    assert raw_df["icr_proxy"].tolist()[0] == 0.25
+    assert raw_df.loc[1, ["icr_exact", "icr_proxy"]].isna().all()
+
+
+def test_resolve_since_uses_latest_checkpoint_in_dart_timezone() -> None:
+    progress = pd.DataFrame({"processed_at": ["2024-03-01T10:00:00+00:00", "2024-03-04T16:30:00+00:00", None]})
+
+    assert resolve_since("2024-02-10", progress) == pd.Timestamp("2024-02-10")
+    assert resolve_since("last", progress) == pd.Timestamp("2024-03-05")
+    with pytest.raises(ValueError):
+        resolve_since("last", pd.DataFrame(columns=["processed_at"]))
+
+
+def test_delta_completed_keys_keeps_unfetched_and_filed_keys_pending() -> None:
+    included = pd.DataFrame(
+        [
+            {"market": "KOSPI", "stock_code": "005930", "corp_code": "C1", "name": "A"},
+            {"market": "KOSDAQ", "stock_code": "000001", "corp_code": "C2", "name": "B"},
+        ]
+    )
+    checkpoint_keys = {("C1", 2023), ("C1", 2024), ("C2", 2023)}
+
+    completed = delta_completed_keys(checkpoint_keys, {("C2", 2023)})
+    tasks = list(iter_pending_tasks(included, (2023, 2024), completed))
+
+    assert [(company["corp_code"], year) for company, year in tasks] == [("C2", 2023), ("C2", 2024)]
+
+
+def test_split_cached_universe_resolves_missing_codes_through_corp_code_index(tmp_path: Path) -> None:
+    index_path = tmp_path / "corp_code_index.parquet"
+    save_corp_code_index(index_path, pd.DataFrame([{"stock_code": "005930", "corp_code": "00126380"}]))
+    universe = pd.DataFrame(
+        [
+            {"market": "KOSPI", "name": "Alpha", "stock_code": "005930", "corp_code": ""},
+            {"market": "KOSDAQ", "name": "Beta", "stock_code": "123456", "corp_code": "00999999"},
+            {"market": "KOSDAQ", "name": "Gamma", "stock_code": "654321", "corp_code": ""},
+        ]
+    )
+
+    included, excluded = split_cached_universe(universe, index_path)
+
+    assert included["corp_code"].tolist() == ["00126380", "00999999"]
+    assert excluded["stock_code"].tolist() == ["654321"]
+
+
+def test_main_screens_the_requested_year_window(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    input_path = tmp_path / "universe.csv"
+    pd.DataFrame([{"market": "KOSPI", "name": "A", "stock_code": "000001", "corp_code": "C1"}]).to_csv(input_path, index=False)
+    cache = StatementCache(tmp_path / "statements")
+    for year, operating_income in ((2019, 500), (2020, 50), (2021, 80)):
+        cache.put("C1", year, "11011", "CFS", pd.DataFrame())
+        cache.put(
+            "C1",
+            year,
+            "11011",
+            "OFS",
+            pd.DataFrame(
+                [
+                    {"sj_div": "IS", "account_nm": "영업이익", "thstrm_amount": str(operating_income)},
+                    {"sj_div": "IS", "account_nm": "이자비용", "thstrm_amount": "100"},
+                ]
+            ),
+        )
+    exact_csv = tmp_path / "exact.csv"
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "screen_zombie",
+            "--from-cache",
+            "--years", "2021", "2020",
+            "--input-path", str(input_path),
+            "--checkpoint-dir", str(tmp_path / "checkpoints"),
+            "--corp-code-index", str(tmp_path / "corp_code_index.parquet"),
+            "--statement-cache-dir", str(tmp_path / "statements"),
+            "--raw-csv", str(tmp_path / "raw.csv"),
+            "--exact-csv", str(exact_csv),
+            "--proxy-csv", str(tmp_path / "proxy.csv"),
+        ],
+    )
+
+    assert screen_zombie.main() == 0
+
+    exact_df = pd.read_csv(exact_csv, dtype={"stock_code": str}, encoding="utf-8-sig")
+    assert [column for column in exact_df.columns if column.startswith("icr_")] == ["icr_2021", "icr_2020", "icr_avg"]
+    assert exact_df[["stock_code", "icr_2021", "icr_2020"]].to_dict("records") == [
+        {"stock_code": "000001", "icr_2021": 0.8, "icr_2020": 0.5}
+    ]
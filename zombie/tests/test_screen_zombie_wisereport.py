@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+
+from zombie.screen_zombie_wisereport import fetch_stock
+from zombie.wisereport_fetcher import EncparamCache
+
+
+class FakeResponse:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.urls: list[str] = []
+
+    def get(self, url: str, params=None, headers=None, timeout=None):  # noqa: ANN001
+        self.urls.append(url.rsplit("/", 1)[1])
+        if "c1040001.aspx" in url:
+            return FakeResponse("<script>var x = { encparam: 'abc==' };</script>")
+        if "c1010001.aspx" in url:
+            return FakeResponse("<html>maintenance</html>")
+        return FakeResponse(json.dumps({"DATA": []}))
+
+
+def test_fetch_stock_collects_payload_and_quote_outcomes_in_one_unit() -> None:
+    session = FakeSession()
+    company = {"market": "KOSPI", "stock_code": "005930", "corp_code": "00126380", "name": "Alpha"}
+
+    outcome = fetch_stock(
+        session,
+        company,
+        fetch_payload=True,
+        fetch_quote=True,
+        timeout=5,
+        request_sleep=0,
+        max_retries=1,
+        encparam_cache=EncparamCache(),
+    )
+    skipped = fetch_stock(session, company, fetch_payload=False, fetch_quote=False, timeout=5, request_sleep=0, max_retries=1)
+
+    assert outcome.payload is not None and outcome.payload.payload_json == '{"DATA": []}'
+    assert outcome.payload_error is None
+    assert outcome.quote is None
+    assert isinstance(outcome.quote_error, ValueError)
+    assert skipped == type(skipped)()
+    assert session.urls == ["c1040001.aspx", "cF4002.aspx", "c1010001.aspx"]
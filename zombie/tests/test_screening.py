@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from zombie import screening
+
+
+def build_long_frame() -> pd.DataFrame:
+    rows = []
+    history = {
+        "A": {2020: 0.5, 2021: 0.6, 2022: 0.7, 2023: 0.8, 2024: 0.9},
+        "B": {2020: 2.0, 2022: 0.5, 2023: 0.5, 2024: 0.5},
+        "C": {2022: 0.2, 2023: None, 2024: 0.1},
+    }
+    for code, values in history.items():
+        for year, value in values.items():
+            rows.append({"market": "KOSPI", "stock_code": code, "corp_code": f"C{code}", "name": code, "year": year, "icr": value})
+    rows.append({"market": "KOSPI", "stock_code": "A", "corp_code": "CA", "name": "A", "year": 2024, "icr": 5.0})
+    return pd.DataFrame(rows)
+
+
+def test_build_metric_panel_keeps_first_value_and_fills_year_gaps() -> None:
+    panel = screening.build_metric_panel(build_long_frame(), "icr")
+
+    assert panel.years == (2020, 2021, 2022, 2023, 2024)
+    assert panel.keys["stock_code"].tolist() == ["A", "B", "C"]
+    assert panel.values[0].tolist() == [0.5, 0.6, 0.7, 0.8, 0.9]
+    assert np.isnan(panel.values[1, 1])
+    assert np.isnan(panel.values[2, 3])
+
+
+def test_screen_consecutive_below_requires_complete_window() -> None:
+    panel = screening.build_metric_panel(build_long_frame(), "icr")
+
+    result = screening.screen_consecutive_below(panel, (2024, 2023, 2022))
+    strict = screening.screen_consecutive_below(panel, (2024, 2023, 2022), mean_threshold=0.6)
+
+    assert list(result.columns) == ["market", "stock_code", "corp_code", "name", "icr_2024", "icr_2023", "icr_2022", "icr_avg"]
+    assert result["stock_code"].tolist() == ["B", "A"]
+    assert result["icr_avg"].tolist() == pytest.approx([0.5, 0.8])
+    assert strict["stock_code"].tolist() == ["B"]
+
+
+def test_sweeps_count_companies_per_threshold_and_window() -> None:
+    panel = screening.build_metric_panel(build_long_frame(), "icr")
+
+    consecutive = screening.sweep_consecutive_below(panel, [0.6, 1.0], [3, 5])
+    rolling = screening.sweep_rolling_mean_below(panel, [1.0], [3])
+
+    def count(frame: pd.DataFrame, end_year: int, years: int, threshold: float) -> int:
+        match = frame.loc[(frame["end_year"] == end_year) & (frame["years"] == years) & (frame["threshold"] == threshold)]
+        return int(match["companies"].item())
+
+    assert count(consecutive, 2024, 3, 1.0) == 2
+    assert count(consecutive, 2024, 3, 0.6) == 1
+    assert count(consecutive, 2024, 5, 1.0) == 1
+    assert consecutive["end_year"].min() == 2022
+    assert count(rolling, 2024, 3, 1.0) == 2
+    assert count(rolling, 2022, 3, 1.0) == 1
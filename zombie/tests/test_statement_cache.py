@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from zombie.statement_cache import StatementCache
+
+
+def test_statement_cache_round_trips_and_skips_identical_rewrites(tmp_path: Path) -> None:
+    cache = StatementCache(tmp_path)
+    frame = pd.DataFrame([{"sj_div": "IS", "account_nm": "영업이익", "thstrm_amount": "10", "thstrm_add_amount": None}])
+
+    stored = cache.put("00126380", 2024, "11011", "CFS", frame)
+    again = cache.put("00126380", 2024, "11011", "CFS", frame)
+    cached = cache.get("00126380", 2024, "11011", "CFS")
+
+    assert cache.path_for("00126380", 2024, "11011", "CFS") == tmp_path / "year=2024" / "reprt_code=11011" / "fs_div=CFS" / "00126380.parquet"
+    assert stored.immutable
+    assert again.fetched_at == stored.fetched_at
+    assert cached is not None
+    assert cached.content_hash == stored.content_hash
+    assert cached.frame["thstrm_amount"].tolist() == ["10"]
+    assert cached.frame["thstrm_add_amount"].isna().all()
+    assert cache.get("00126380", 2024, "11011", "OFS") is None
+
+
+def test_statement_cache_expires_empty_responses_only(tmp_path: Path) -> None:
+    cache = StatementCache(tmp_path, empty_ttl_days=0)
+    cache.put("00000001", 2024, "11011", "CFS", pd.DataFrame())
+    cache.put("00000001", 2024, "11011", "OFS", pd.DataFrame([{"sj_div": "IS", "thstrm_amount": "1"}]))
+
+    assert cache.get("00000001", 2024, "11011", "CFS") is None
+    assert cache.get("00000001", 2024, "11011", "OFS") is not None
+    assert cache.entries()[["corp_code", "year", "fs_div", "row_count"]].to_dict("records") == [
+        {"corp_code": "00000001", "year": 2024, "fs_div": "OFS", "row_count": 1}
+    ]
+
+
+def test_statement_cache_loads_entries_with_partition_keys(tmp_path: Path) -> None:
+    cache = StatementCache(tmp_path)
+    cache.put("00000001", 2023, "11011", "CFS", pd.DataFrame([{"sj_div": "IS", "thstrm_amount": "1"}]))
+    cache.put("00000002", 2024, "11011", "OFS", pd.DataFrame([{"sj_div": "CIS", "ord": "3", "thstrm_amount": "2"}]))
+    cache.put("00000003", 2024, "11011", "CFS", pd.DataFrame())
+
+    entries = cache.entries(years=(2024,))
+    statements = cache.load_statements(entries)
+
+    assert sorted(entries["corp_code"]) == ["00000002", "00000003"]
+    assert statements[["corp_code", "year", "fs_div", "sj_div", "thstrm_amount"]].to_dict("records") == [
+        {"corp_code": "00000002", "year": 2024, "fs_div": "OFS", "sj_div": "CIS", "thstrm_amount": "2"}
+    ]
+    assert cache.invalidate("00000002", 2024, "11011") == 1
+    assert cache.get("00000002", 2024, "11011", "OFS") is None
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import json
 
+import pytest
+
 from zombie import wisereport_fetcher
 
 
@@ -68,3 +70,111 @@ def test_fetch_overview_page_uses_company_overview_url() -> None:
     assert html == "<html><table id='cTB11'></table></html>"
     assert session.calls[0]["url"].endswith("/company/c1010001.aspx")
     assert session.calls[0]["params"] == {"cmp_cd": "041590", "cn": ""}
+
+
+def test_encparam_cache_reuses_token_across_payload_requests() -> None:
+    session = FakeSession()
+    cache = wisereport_fetcher.EncparamCache(ttl_seconds=60)
+
+    for stock_code in ("032940", "041590", "005930"):
+        result = wisereport_fetcher.fetch_indicator_payload(session=session, stock_code=stock_code, encparam_cache=cache)
+        assert result.encparam == "abc123=="
+
+    page_calls = [call for call in session.calls if "c1040001.aspx" in str(call["url"])]
+    assert len(page_calls) == 1
+    assert cache.page_fetches == 1
+
+
+def test_encparam_cache_expires_after_ttl() -> None:
+    now = [0.0]
+    session = FakeSession()
+    cache = wisereport_fetcher.EncparamCache(ttl_seconds=10, clock=lambda: now[0])
+
+    cache.get(session, "032940")
+    now[0] = 5.0
+    cache.get(session, "032940")
+    now[0] = 11.0
+    cache.get(session, "032940")
+
+    assert cache.page_fetches == 2
+
+
+def test_encparam_cache_refreshes_token_once_on_invalid_payload() -> None:
+    tokens = iter(["stale==", "fresh=="])
+
+    class RotatingSession(FakeSession):
+        def get(self, url: str, params=None, headers=None, timeout=None):  # noqa: ANN001
+            self.calls.append({"url": url, "params": params})
+            if "c1040001.aspx" in url:
+                return FakeResponse(f"<script>var x = {{ encparam: '{next(tokens)}' }};</script>")
+            if params["encparam"] == "stale==":
+                return FakeResponse("")
+            return FakeResponse(json.dumps({"DATA": []}))
+
+    session = RotatingSession()
+    cache = wisereport_fetcher.EncparamCache(ttl_seconds=60)
+
+    result = wisereport_fetcher.fetch_indicator_payload(session=session, stock_code="032940", encparam_cache=cache)
+
+    assert result.encparam == "fresh=="
+    assert cache.page_fetches == 2
+    assert len(session.calls) == 4
+
+
+def test_encparam_cache_gives_up_after_one_refresh() -> None:
+    class BrokenSession(FakeSession):
+        def get(self, url: str, params=None, headers=None, timeout=None):  # noqa: ANN001
+            self.calls.append({"url": url, "params": params})
+            if "c1040001.aspx" in url:
+                return FakeResponse("<script>var x = { encparam: 'abc==' };</script>")
+            return FakeResponse("<html>error</html>")
+
+    session = BrokenSession()
+    cache = wisereport_fetcher.EncparamCache(ttl_seconds=60)
+
+    with pytest.raises(ValueError, match="invalid WiseReport payload"):
+        wisereport_fetcher.fetch_indicator_payload(session=session, stock_code="032940", encparam_cache=cache)
+    assert len(session.calls) == 4
+
+
+def test_is_valid_payload_accepts_company_without_indicator_rows() -> None:
+    assert wisereport_fetcher.is_valid_payload(json.dumps({"YYMM": []}))
+    assert wisereport_fetcher.is_valid_payload(json.dumps({"DATA": None}))
+    assert wisereport_fetcher.is_valid_payload(json.dumps({"DATA": []}))
+    assert not wisereport_fetcher.is_valid_payload("<html>error</html>")
+    assert not wisereport_fetcher.is_valid_payload(json.dumps(["not", "a", "dict"]))
+
+
+def test_fetch_indicator_payload_keeps_payload_without_data_rows() -> None:
+    class EmptySession(FakeSession):
+        def get(self, url: str, params=None, headers=None, timeout=None):  # noqa: ANN001
+            self.calls.append({"url": url, "params": params})
+            if "c1040001.aspx" in url:
+                return FakeResponse("<script>var x = { encparam: 'abc==' };</script>")
+            return FakeResponse(json.dumps({"YYMM": []}))
+
+    session = EmptySession()
+    cache = wisereport_fetcher.EncparamCache(ttl_seconds=60)
+
+    result = wisereport_fetcher.fetch_indicator_payload(session=session, stock_code="032940", encparam_cache=cache)
+
+    assert json.loads(result.payload_json) == {"YYMM": []}
+    assert cache.page_fetches == 1
+    assert len(session.calls) == 2
+
+
+def test_build_session_mounts_rate_limited_pool() -> None:
+    acquired: list[float] = []
+
+    class FakeLimiter:
+        def acquire(self, tokens: float = 1.0) -> float:
+            acquired.append(tokens)
+            return 0.0
+
+    session = wisereport_fetcher.build_session(pool_size=6, rate_limiter=FakeLimiter())
+    adapter = session.get_adapter(wisereport_fetcher.WISE_REPORT_PAYLOAD_URL)
+
+    assert isinstance(adapter, wisereport_fetcher.RateLimitedAdapter)
+    assert adapter._pool_maxsize == 6
+    assert adapter.rate_limiter.acquire() == 0.0
+    assert acquired == [1.0]
@@ -63,7 +63,7 @@ def build_quote_html() -> str:
     """
 
 
-def test_parse_payload_record_extracts_interest_coverage_years() -> None:
+def test_build_long_frame_extracts_interest_coverage_years() -> None:
     raw_row = {
         "market": "KOSDAQ",
         "stock_code": "032940",
@@ -76,7 +76,7 @@ def test_parse_payload_record_extracts_interest_coverage_years() -> None:
         "source_status": "ok",
     }
 
-    rows = wisereport_parser.parse_payload_record(raw_row)
+    rows = wisereport_parser.build_long_frame(pd.DataFrame([raw_row])).to_dict("records")
 
     assert rows[-3:] == [
         {
@@ -121,6 +121,31 @@ def test_parse_payload_record_extracts_interest_coverage_years() -> None:
     ]
 
 
+def test_build_indicator_frame_streams_parquet_and_extracts_several_indicators(tmp_path) -> None:  # noqa: ANN001
+    raw_path = tmp_path / "raw.parquet"
+    base = {"market": "KOSDAQ", "corp_code": "00123456", "name": "원익", "fin_gubun": "IFRSS", "frq_typ": "0", "source_status": "ok"}
+    pd.DataFrame(
+        [
+            {**base, "stock_code": "032940", "rpt": 3, "payload_json": build_payload_json()},
+            {**base, "stock_code": "000001", "rpt": 1, "payload_json": build_payload_json()},
+            {**base, "stock_code": "000002", "rpt": 3, "payload_json": json.dumps({"YYMM": [], "DATA": []})},
+        ]
+    ).to_parquet(raw_path, index=False)
+
+    batches = wisereport_parser.iter_payload_batches(raw_path, rpt=3, fin_gubun="IFRSS", frq_typ="0", batch_size=1)
+    frame = wisereport_parser.build_indicator_frame(batches, {"icr": "이자보상배율", "debt_ratio": "부채비율"})
+
+    assert list(frame.columns) == [*wisereport_parser.WR_PAYLOAD_KEY_COLUMNS, "year", "period_label", "icr", "debt_ratio", "source_status"]
+    assert frame["stock_code"].unique().tolist() == ["032940"]
+    assert frame["year"].tolist() == [2020, 2021, 2022, 2023, 2024, 2025]
+    assert frame["icr"].tolist()[:5] == [1.5, 0.9, 0.8, 0.7, 0.6]
+    assert pd.isna(frame["icr"].iloc[5])
+    assert frame["debt_ratio"].tolist() == [10.0, 11.0, 12.0, 13.0, 14.0, 15.0]
+    assert wisereport_parser.build_long_frame(pd.DataFrame([{**base, "stock_code": "032940", "rpt": 3, "payload_json": build_payload_json()}])).columns.tolist() == list(
+        wisereport_parser.WR_LONG_COLUMNS
+    )
+
+
 def test_build_result_frame_matches_existing_output_schema() -> None:
     long_df = pd.DataFrame(
         [
@@ -171,21 +196,23 @@ def test_parse_quote_snapshot_extracts_quote_metrics() -> None:
     assert row["return_1y_pct"] == 0.0
 
 
-def test_is_abnormal_trading_row_flags_zeroed_quote_snapshot() -> None:
-    row = pd.Series(
-        wisereport_parser.parse_quote_snapshot(
-            {
-                "market": "KOSDAQ",
-                "stock_code": "041590",
-                "corp_code": "00297448",
-                "name": "플래스크",
-                "fetched_at": "2026-03-11T00:00:00+09:00",
-            },
-            build_quote_html(),
-        )
+def test_build_abnormal_trading_mask_flags_zeroed_quote_snapshot() -> None:
+    quote_df = pd.DataFrame(
+        [
+            wisereport_parser.parse_quote_snapshot(
+                {
+                    "market": "KOSDAQ",
+                    "stock_code": "041590",
+                    "corp_code": "00297448",
+                    "name": "플래스크",
+                    "fetched_at": "2026-03-11T00:00:00+09:00",
+                },
+                build_quote_html(),
+            )
+        ]
     )
 
-    assert wisereport_parser.is_abnormal_trading_row(row) is True
+    assert wisereport_parser.build_abnormal_trading_mask(quote_df).tolist() == [True]
 
 
 def test_filter_result_frame_by_trading_status_excludes_abnormal_trading() -> None:
@@ -234,3 +261,51 @@ def test_filter_result_frame_by_trading_status_excludes_abnormal_trading() -> No
     filtered = wisereport_parser.filter_result_frame_by_trading_status(result_df, quote_df)
 
     assert filtered["stock_code"].tolist() == ["032940"]
+
+
+def test_extract_quote_table_fast_path_matches_regex_fallback() -> None:
+    page_html = "<html><body>" + "<div>&nbsp;filler</div>" * 50 + build_quote_html() + "<table id=\"other\"><tr><th>x</th><td>1</td></tr></table></body></html>"
+    upper_html = page_html.replace("<table class=\"gHead\" id=\"cTB11\">", "<TABLE class=\"gHead\" id=\"cTB11\">").replace("</table>", "</TABLE>", 1)
+
+    fast = wisereport_parser.extract_quote_table(page_html)
+    fallback = wisereport_parser.extract_quote_table(upper_html)
+
+    assert fast == fallback
+    assert fast["거래량/거래대금"] == "0주 / 0억원"
+    assert "x" not in fast
+    assert wisereport_parser.parse_number("1,161억원") == 1161.0
+    assert wisereport_parser.parse_number("48972158") == 48972158.0
+    assert wisereport_parser.strip_html_text("  a \n b ") == "a b"
+    with pytest.raises(ValueError, match="cTB11"):
+        wisereport_parser.extract_quote_table("<html><table id='cTB11'></table></html>")
+
+
+def test_build_abnormal_trading_mask_applies_named_rules() -> None:
+    quote_df = pd.DataFrame(
+        [
+            {"stock_code": "H", "current_price": 2370, "price_change": 0, "return_today_pct": 0.0, "high_52w": 2370, "low_52w": 2370, "volume": 0, "trading_value_krw_100m": 0.0, "return_1m_pct": 0.0, "return_3m_pct": 0.0, "return_6m_pct": 0.0, "return_1y_pct": 0.0},
+            {"stock_code": "Z", "current_price": 900, "price_change": 10, "return_today_pct": 1.0, "high_52w": 1200, "low_52w": 800, "volume": 0, "trading_value_krw_100m": 0.0, "return_1m_pct": 1.0, "return_3m_pct": 1.0, "return_6m_pct": 1.0, "return_1y_pct": 1.0},
+            {"stock_code": "P", "current_price": 800, "price_change": 0, "return_today_pct": 0.0, "high_52w": 1200, "low_52w": 800, "volume": 10, "trading_value_krw_100m": 0.1, "return_1m_pct": None, "return_3m_pct": 1.0, "return_6m_pct": 1.0, "return_1y_pct": 1.0},
+        ]
+    )
+
+    def flagged(*rules: str) -> list[str]:
+        return quote_df.loc[wisereport_parser.build_abnormal_trading_mask(quote_df, rules), "stock_code"].tolist()
+
+    assert flagged() == []
+    assert flagged("halted_signature") == ["H"]
+    assert flagged("zero_volume") == ["H", "Z"]
+    assert flagged("pinned_52w") == ["H", "P"]
+    assert flagged("halted_signature", "zero_volume", "pinned_52w") == ["H", "Z", "P"]
+    with pytest.raises(ValueError, match="unknown trading rule"):
+        flagged("bogus")
+
+
+def test_filter_result_frame_by_trading_status_keeps_stocks_without_quotes() -> None:
+    result_df = pd.DataFrame([{"stock_code": "A", "icr_avg": 0.1}, {"stock_code": "B", "icr_avg": 0.2}])
+    quote_df = pd.DataFrame([{"stock_code": "A", "volume": 0, "trading_value_krw_100m": 0.0, "source_status": "ok"}])
+
+    filtered = wisereport_parser.filter_result_frame_by_trading_status(result_df, quote_df, rules=("zero_volume",))
+
+    assert filtered["stock_code"].tolist() == ["B"]
+    assert wisereport_parser.filter_result_frame_by_trading_status(result_df, quote_df)["stock_code"].tolist() == ["A", "B"]
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import json
 import re
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 
+from shared.rate_limiter import TokenBucket
 from zombie.common_io import (
     DEFAULT_INPUT_PATH,
     load_input_universe,
@@ -28,6 +32,9 @@ DEFAULT_WR_QUOTE_ERROR_PATH = DEFAULT_WR_CHECKPOINT_DIR / "wisereport_quote_erro
 DEFAULT_WR_FIN_GUBUN = "IFRSS"
 DEFAULT_WR_FRQ_TYP = "0"
 DEFAULT_WR_RPT = 3
+DEFAULT_ENCPARAM_TTL_SECONDS = 600.0
+DEFAULT_WR_WORKERS = 4
+DEFAULT_WR_REQUESTS_PER_MINUTE = 300
 
 WISE_REPORT_OVERVIEW_URL = "https://navercomp.wisereport.co.kr/company/c1010001.aspx"
 WISE_REPORT_PAGE_URL = "https://navercomp.wisereport.co.kr/v2/company/c1040001.aspx"
@@ -107,8 +114,22 @@ class WiseReportFetchResult:
     encparam: str
 
 
-def build_session() -> requests.Session:
+class RateLimitedAdapter(HTTPAdapter):
+    def __init__(self, rate_limiter: TokenBucket | None = None, **kwargs: Any) -> None:
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return super().send(request, **kwargs)
+
+
+def build_session(pool_size: int = 10, rate_limiter: TokenBucket | None = None) -> requests.Session:
     session = requests.Session()
+    adapter = RateLimitedAdapter(rate_limiter=rate_limiter, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     session.headers.update(
         {
             "User-Agent": (
@@ -156,6 +177,46 @@ def extract_encparam(page_html: str) -> str:
     raise ValueError("encparam not found in WiseReport page")
 
 
+def is_valid_payload(payload_json: str) -> bool:
+    try:
+        payload = json.loads(payload_json)
+    except ValueError:
+        return False
+    if not isinstance(payload, dict):
+        return False
+    data = payload.get("DATA")
+    return data is None or isinstance(data, list)
+
+
+class EncparamCache:
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_ENCPARAM_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._encparam = ""
+        self._fetched_at = 0.0
+        self.page_fetches = 0
+
+    def get(self, session: requests.Session, stock_code: str, timeout: float = 20.0) -> str:
+        with self._lock:
+            if self._encparam and self._clock() - self._fetched_at < self.ttl_seconds:
+                return self._encparam
+            page_html = fetch_indicator_page(session, stock_code, timeout=timeout)
+            self._encparam = extract_encparam(page_html)
+            self._fetched_at = self._clock()
+            self.page_fetches += 1
+            return self._encparam
+
+    def invalidate(self, encparam: str) -> None:
+        with self._lock:
+            if self._encparam == encparam:
+                self._encparam = ""
+
+
 def build_payload_params(
     stock_code: str,
     encparam: str,
@@ -203,17 +264,16 @@ def fetch_overview_page(
     return response.text
 
 
-def fetch_indicator_payload(
+def request_indicator_payload(
     session: requests.Session,
     stock_code: str,
+    encparam: str,
     rpt: int = DEFAULT_WR_RPT,
     fin_gubun: str = DEFAULT_WR_FIN_GUBUN,
     frq_typ: str = DEFAULT_WR_FRQ_TYP,
     cn: str = "",
     timeout: float = 20.0,
-) -> WiseReportFetchResult:
-    page_html = fetch_indicator_page(session, stock_code, timeout=timeout)
-    encparam = extract_encparam(page_html)
+) -> str:
     page_url = f"{WISE_REPORT_PAGE_URL}?cmp_cd={stock_code}&cn={cn}"
     params = build_payload_params(
         stock_code=stock_code,
@@ -230,10 +290,36 @@ def fetch_indicator_payload(
         timeout=timeout,
     )
     response.raise_for_status()
-    payload_json = response.text.strip()
+    return response.text.strip()
+
+
+def fetch_indicator_payload(
+    session: requests.Session,
+    stock_code: str,
+    rpt: int = DEFAULT_WR_RPT,
+    fin_gubun: str = DEFAULT_WR_FIN_GUBUN,
+    frq_typ: str = DEFAULT_WR_FRQ_TYP,
+    cn: str = "",
+    timeout: float = 20.0,
+    encparam_cache: EncparamCache | None = None,
+) -> WiseReportFetchResult:
+    if encparam_cache is None:
+        page_html = fetch_indicator_page(session, stock_code, timeout=timeout)
+        encparam = extract_encparam(page_html)
+        payload_json = request_indicator_payload(session, stock_code, encparam, rpt, fin_gubun, frq_typ, cn, timeout)
+        if not payload_json:
+            raise ValueError("empty WiseReport payload")
+        return WiseReportFetchResult(payload_json=payload_json, source_status="ok", encparam=encparam)
+
+    for _ in range(2):
+        encparam = encparam_cache.get(session, stock_code, timeout=timeout)
+        payload_json = request_indicator_payload(session, stock_code, encparam, rpt, fin_gubun, frq_typ, cn, timeout)
+        if is_valid_payload(payload_json):
+            return WiseReportFetchResult(payload_json=payload_json, source_status="ok", encparam=encparam)
+        encparam_cache.invalidate(encparam)
     if not payload_json:
         raise ValueError("empty WiseReport payload")
-    return WiseReportFetchResult(payload_json=payload_json, source_status="ok", encparam=encparam)
+    raise ValueError("invalid WiseReport payload")
 
 
 def fetch_indicator_payload_with_retries(
@@ -246,6 +332,7 @@ def fetch_indicator_payload_with_retries(
     timeout: float = 20.0,
     request_sleep: float = 0.1,
     max_retries: int = 4,
+    encparam_cache: EncparamCache | None = None,
 ) -> WiseReportFetchResult:
     last_error: Exception | None = None
     for attempt in range(max_retries):
@@ -258,6 +345,7 @@ def fetch_indicator_payload_with_retries(
                 frq_typ=frq_typ,
                 cn=cn,
                 timeout=timeout,
+                encparam_cache=encparam_cache,
             )
             if request_sleep > 0:
                 time.sleep(request_sleep)
@@ -3,9 +3,13 @@ from __future__ import annotations
 import html
 import json
 import re
-from typing import Any
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Sequence
 
 import pandas as pd
+import pyarrow.dataset as ds
+
+from zombie.screening import build_metric_panel, screen_columns, screen_consecutive_below
 
 WR_LONG_COLUMNS = (
     "market",
@@ -20,6 +24,17 @@ WR_LONG_COLUMNS = (
     "icr",
     "source_status",
 )
+WR_PAYLOAD_KEY_COLUMNS = ("market", "stock_code", "corp_code", "name", "rpt", "fin_gubun", "frq_typ")
+WR_INDICATOR_NAMES = {"icr": "이자보상배율", "debt_ratio": "부채비율"}
+DEFAULT_WR_INDICATORS = {"icr": WR_INDICATOR_NAMES["icr"]}
+DEFAULT_PAYLOAD_BATCH_SIZE = 512
+_BR_PATTERN = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_NUMBER_PATTERN = re.compile(r"[-+]?\d[\d,]*\.?\d*")
+_QUOTE_TABLE_MARKER = 'id="cTB11"'
+_QUOTE_TABLE_PATTERN = re.compile(r'<table[^>]+id="cTB11"[^>]*>(.*?)</table>', re.IGNORECASE | re.DOTALL)
+_QUOTE_ROW_PATTERN = re.compile(r"<tr>\s*<th[^>]*>(.*?)</th>\s*<td[^>]*>(.*?)</td>\s*</tr>", re.IGNORECASE | re.DOTALL)
+_QUOTE_DATE_PATTERN = re.compile(r"\[기준:(\d{4}\.\d{2}\.\d{2})\]")
 WR_QUOTE_COLUMNS = (
     "market",
     "stock_code",
@@ -53,17 +68,22 @@ def parse_payload_json(payload_json: str | dict[str, Any]) -> dict[str, Any]:
 
 
 def strip_html_text(value: Any) -> str:
-    text = html.unescape(str(value or ""))
-    text = re.sub(r"<br\s*/?>", " ", text, flags=re.IGNORECASE)
-    text = re.sub(r"<[^>]+>", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
+    text = str(value or "")
+    if "<" not in text and "&" not in text:
+        return " ".join(text.split())
+    text = html.unescape(text)
+    text = _BR_PATTERN.sub(" ", text)
+    text = _TAG_PATTERN.sub(" ", text)
+    return " ".join(text.split())
 
 
 def parse_number(value: Any) -> float | None:
     text = strip_html_text(value)
     if not text:
         return None
-    match = re.search(r"[-+]?\d[\d,]*\.?\d*", text)
+    if text.isascii() and text.isdigit():
+        return float(text)
+    match = _NUMBER_PATTERN.search(text)
     if not match:
         return None
     return float(match.group(0).replace(",", ""))
@@ -84,31 +104,42 @@ def split_metric_values(value: Any, expected_parts: int) -> list[str]:
     return parts[:expected_parts]
 
 
-def extract_quote_table(html_text: str) -> dict[str, str]:
-    table_match = re.search(r'<table[^>]+id="cTB11"[^>]*>(.*?)</table>', html_text, flags=re.IGNORECASE | re.DOTALL)
+def find_quote_table(html_text: str) -> tuple[str, int]:
+    marker = html_text.find(_QUOTE_TABLE_MARKER)
+    if marker != -1:
+        table_start = html_text.rfind("<table", 0, marker)
+        open_end = html_text.find(">", marker)
+        table_end = html_text.find("</table>", open_end)
+        if table_start != -1 and open_end != -1 and table_end != -1 and "<" not in html_text[table_start + 1 : marker]:
+            return html_text[open_end + 1 : table_end], table_end
+    table_match = _QUOTE_TABLE_PATTERN.search(html_text)
     if not table_match:
         raise ValueError("quote table cTB11 not found")
+    return table_match.group(1), table_match.end()
 
+
+def _parse_quote_rows(table_html: str) -> dict[str, str]:
     quote_map: dict[str, str] = {}
-    row_pattern = re.compile(
-        r"<tr>\s*<th[^>]*>(.*?)</th>\s*<td[^>]*>(.*?)</td>\s*</tr>",
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    for heading_html, value_html in row_pattern.findall(table_match.group(1)):
+    for heading_html, value_html in _QUOTE_ROW_PATTERN.findall(table_html):
         heading = strip_html_text(heading_html)
-        value = strip_html_text(value_html)
         if heading:
-            quote_map[heading] = value
+            quote_map[heading] = strip_html_text(value_html)
     return quote_map
 
 
+def extract_quote_table(html_text: str) -> dict[str, str]:
+    table_html, _ = find_quote_table(html_text)
+    return _parse_quote_rows(table_html)
+
+
 def parse_quote_snapshot(raw_row: dict[str, Any], page_html: str) -> dict[str, Any]:
-    quote_map = extract_quote_table(page_html)
+    table_html, table_end = find_quote_table(page_html)
+    quote_map = _parse_quote_rows(table_html)
     price_parts = split_metric_values(quote_map.get("주가/전일대비/수익률"), 3)
     high_low_parts = split_metric_values(quote_map.get("52Weeks 최고/최저"), 2)
     volume_parts = split_metric_values(quote_map.get("거래량/거래대금"), 2)
     return_parts = split_metric_values(quote_map.get("수익률 (1M/3M/6M/1Y)"), 4)
-    quote_date_match = re.search(r"\[기준:(\d{4}\.\d{2}\.\d{2})\]", page_html)
+    quote_date_match = _QUOTE_DATE_PATTERN.search(page_html, 0, table_end) or _QUOTE_DATE_PATTERN.search(page_html, table_end)
 
     if not price_parts or not high_low_parts or not volume_parts or not return_parts:
         raise ValueError("required quote metrics missing")
@@ -142,53 +173,73 @@ def build_quote_frame(rows: list[dict[str, Any]]) -> pd.DataFrame:
     return pd.DataFrame(rows, columns=list(WR_QUOTE_COLUMNS)).sort_values(["market", "stock_code"]).reset_index(drop=True)
 
 
-def _is_zero(value: Any) -> bool:
-    if value is None or pd.isna(value):
-        return False
-    return abs(float(value)) < 1e-12
+def _numeric_column(quote_df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in quote_df.columns:
+        return pd.Series(float("nan"), index=quote_df.index)
+    return pd.to_numeric(quote_df[column], errors="coerce").astype(float)
 
 
-def is_abnormal_trading_row(row: pd.Series | dict[str, Any]) -> bool:
-    current_price = row.get("current_price")
-    high_52w = row.get("high_52w")
-    low_52w = row.get("low_52w")
+def _zero_mask(quote_df: pd.DataFrame, *columns: str) -> pd.Series:
+    mask = pd.Series(True, index=quote_df.index)
+    for column in columns:
+        mask &= _numeric_column(quote_df, column).abs().lt(1e-12)
+    return mask
+
+
+def halted_signature_mask(quote_df: pd.DataFrame) -> pd.Series:
+    current_price = _numeric_column(quote_df, "current_price")
+    high_52w = _numeric_column(quote_df, "high_52w")
+    low_52w = _numeric_column(quote_df, "low_52w")
     return (
-        _is_zero(row.get("volume"))
-        and _is_zero(row.get("trading_value_krw_100m"))
-        and _is_zero(row.get("price_change"))
-        and _is_zero(row.get("return_today_pct"))
-        and current_price is not None
-        and high_52w is not None
-        and low_52w is not None
-        and not pd.isna(current_price)
-        and not pd.isna(high_52w)
-        and not pd.isna(low_52w)
-        and float(current_price) == float(high_52w) == float(low_52w)
-        and _is_zero(row.get("return_1m_pct"))
-        and _is_zero(row.get("return_3m_pct"))
-        and _is_zero(row.get("return_6m_pct"))
-        and _is_zero(row.get("return_1y_pct"))
+        _zero_mask(quote_df, "volume", "trading_value_krw_100m", "price_change", "return_today_pct")
+        & current_price.eq(high_52w)
+        & high_52w.eq(low_52w)
+        & _zero_mask(quote_df, "return_1m_pct", "return_3m_pct", "return_6m_pct", "return_1y_pct")
     )
 
 
-def filter_result_frame_by_trading_status(result_df: pd.DataFrame, quote_df: pd.DataFrame) -> pd.DataFrame:
-    if result_df.empty:
-        return result_df.copy()
-    if quote_df.empty:
+def zero_volume_mask(quote_df: pd.DataFrame) -> pd.Series:
+    return _zero_mask(quote_df, "volume", "trading_value_krw_100m")
+
+
+def pinned_52w_mask(quote_df: pd.DataFrame) -> pd.Series:
+    current_price = _numeric_column(quote_df, "current_price")
+    pinned = current_price.eq(_numeric_column(quote_df, "high_52w")) | current_price.eq(_numeric_column(quote_df, "low_52w"))
+    return pinned & _zero_mask(quote_df, "price_change")
+
+
+TRADING_RULE_MASKS = {
+    "halted_signature": halted_signature_mask,
+    "zero_volume": zero_volume_mask,
+    "pinned_52w": pinned_52w_mask,
+}
+DEFAULT_TRADING_RULES = ("halted_signature",)
+
+
+def build_abnormal_trading_mask(quote_df: pd.DataFrame, rules: Iterable[str] = DEFAULT_TRADING_RULES) -> pd.Series:
+    mask = pd.Series(False, index=quote_df.index)
+    for rule in rules:
+        if rule not in TRADING_RULE_MASKS:
+            raise ValueError(f"unknown trading rule: {rule}")
+        mask |= TRADING_RULE_MASKS[rule](quote_df)
+    return mask
+
+
+def filter_result_frame_by_trading_status(
+    result_df: pd.DataFrame,
+    quote_df: pd.DataFrame,
+    rules: Iterable[str] = DEFAULT_TRADING_RULES,
+) -> pd.DataFrame:
+    if result_df.empty or quote_df.empty:
         return result_df.copy()
 
-    filtered_quote_df = quote_df.loc[quote_df["source_status"].eq("ok")].copy()
+    filtered_quote_df = quote_df.loc[quote_df["source_status"].eq("ok")]
     if filtered_quote_df.empty:
         return result_df.copy()
 
-    filtered_quote_df["is_abnormal_trading"] = filtered_quote_df.apply(is_abnormal_trading_row, axis=1)
-    merged = result_df.merge(
-        filtered_quote_df[["stock_code", "is_abnormal_trading"]],
-        on="stock_code",
-        how="left",
-    )
-    keep_mask = ~merged["is_abnormal_trading"].fillna(False)
-    return merged.loc[keep_mask, result_df.columns].reset_index(drop=True)
+    abnormal_codes = filtered_quote_df.loc[build_abnormal_trading_mask(filtered_quote_df, rules), "stock_code"]
+    keep_mask = ~result_df["stock_code"].isin(set(abnormal_codes))
+    return result_df.loc[keep_mask].reset_index(drop=True)
 
 
 def parse_year_from_label(label: Any) -> int | None:
@@ -199,82 +250,111 @@ def parse_year_from_label(label: Any) -> int | None:
     return None
 
 
-def extract_indicator_row(payload: dict[str, Any], indicator_name: str = "이자보상배율") -> dict[str, Any] | None:
-    for row in payload.get("DATA", []):
-        if str(row.get("ACC_NM", "")).strip() == indicator_name:
-            return row
-    return None
-
+def indicator_frame_columns(indicators: Mapping[str, str]) -> list[str]:
+    return [*WR_PAYLOAD_KEY_COLUMNS, "year", "period_label", *indicators, "source_status"]
 
-def parse_payload_record(raw_row: dict[str, Any], indicator_name: str = "이자보상배율") -> list[dict[str, Any]]:
-    payload = parse_payload_json(raw_row.get("payload_json", ""))
-    period_labels = payload.get("YYMM", [])
-    indicator_row = extract_indicator_row(payload, indicator_name=indicator_name)
-    if indicator_row is None:
-        return []
 
-    rows: list[dict[str, Any]] = []
-    for index, label in enumerate(period_labels[:6], start=1):
-        year = parse_year_from_label(label)
-        if year is None:
-            continue
-        value = indicator_row.get(f"DATA{index}")
-        if value is None or pd.isna(value):
+def _indicator_value(row: dict[str, Any] | None, index: int) -> float | None:
+    if row is None:
+        return None
+    value = row.get(f"DATA{index}")
+    if value is None or pd.isna(value):
+        return None
+    return float(value)
+
+
+def parse_payload_columns(
+    columns: Mapping[str, Sequence[Any]],
+    indicators: Mapping[str, str] = DEFAULT_WR_INDICATORS,
+    output: dict[str, list[Any]] | None = None,
+    year_cache: dict[str, int | None] | None = None,
+) -> dict[str, list[Any]]:
+    output = output if output is not None else {column: [] for column in indicator_frame_columns(indicators)}
+    year_cache = year_cache if year_cache is not None else {}
+    aliases = list(indicators)
+    names = [indicators[alias].strip() for alias in aliases]
+    statuses = columns.get("source_status")
+
+    for position, payload_json in enumerate(columns["payload_json"]):
+        payload = parse_payload_json(payload_json)
+        rows_by_name: dict[str, dict[str, Any]] = {}
+        for row in payload.get("DATA") or []:
+            rows_by_name.setdefault(str(row.get("ACC_NM", "")).strip(), row)
+        indicator_rows = [rows_by_name.get(name) for name in names]
+        if all(row is None for row in indicator_rows):
             continue
-        rows.append(
-            {
-                "market": raw_row["market"],
-                "stock_code": raw_row["stock_code"],
-                "corp_code": raw_row["corp_code"],
-                "name": raw_row["name"],
-                "rpt": raw_row["rpt"],
-                "fin_gubun": raw_row["fin_gubun"],
-                "frq_typ": raw_row["frq_typ"],
-                "year": year,
-                "period_label": str(label),
-                "icr": float(value),
-                "source_status": raw_row.get("source_status", "ok"),
-            }
-        )
-    return rows
+
+        for index, label in enumerate(payload.get("YYMM", [])[:6], start=1):
+            label_text = str(label)
+            if label_text not in year_cache:
+                year_cache[label_text] = parse_year_from_label(label)
+            year = year_cache[label_text]
+            if year is None:
+                continue
+            values = [_indicator_value(row, index) for row in indicator_rows]
+            if all(value is None for value in values):
+                continue
+            for column in WR_PAYLOAD_KEY_COLUMNS:
+                output[column].append(columns[column][position])
+            output["year"].append(year)
+            output["period_label"].append(label_text)
+            for alias, value in zip(aliases, values):
+                output[alias].append(value)
+            status = statuses[position] if statuses is not None else None
+            output["source_status"].append("ok" if status is None else status)
+    return output
+
+
+def _finish_indicator_frame(output: dict[str, list[Any]], indicators: Mapping[str, str]) -> pd.DataFrame:
+    columns = indicator_frame_columns(indicators)
+    if not output["year"]:
+        return pd.DataFrame(columns=columns)
+    frame = pd.DataFrame(output, columns=columns)
+    return frame.sort_values(["market", "stock_code", "year"], kind="stable").reset_index(drop=True)
+
+
+def iter_payload_batches(
+    path: str | Path,
+    rpt: int | None = None,
+    fin_gubun: str | None = None,
+    frq_typ: str | None = None,
+    batch_size: int = DEFAULT_PAYLOAD_BATCH_SIZE,
+) -> Iterator[dict[str, list[Any]]]:
+    dataset = ds.dataset(path, format="parquet")
+    conditions = [
+        ds.field(column) == value
+        for column, value in (("rpt", rpt), ("fin_gubun", fin_gubun), ("frq_typ", frq_typ))
+        if value is not None
+    ]
+    row_filter = None
+    for condition in conditions:
+        row_filter = condition if row_filter is None else row_filter & condition
+    available = set(dataset.schema.names)
+    columns = [column for column in (*WR_PAYLOAD_KEY_COLUMNS, "payload_json", "source_status") if column in available]
+    for batch in dataset.to_batches(columns=columns, filter=row_filter, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pydict()
+
+
+def build_indicator_frame(
+    batches: Iterable[Mapping[str, Sequence[Any]]],
+    indicators: Mapping[str, str] = DEFAULT_WR_INDICATORS,
+) -> pd.DataFrame:
+    output = {column: [] for column in indicator_frame_columns(indicators)}
+    year_cache: dict[str, int | None] = {}
+    for batch in batches:
+        parse_payload_columns(batch, indicators, output=output, year_cache=year_cache)
+    return _finish_indicator_frame(output, indicators)
 
 
 def build_long_frame(raw_payload_df: pd.DataFrame, indicator_name: str = "이자보상배율") -> pd.DataFrame:
     if raw_payload_df.empty:
         return pd.DataFrame(columns=list(WR_LONG_COLUMNS))
-
-    rows: list[dict[str, Any]] = []
-    for raw_row in raw_payload_df.to_dict("records"):
-        rows.extend(parse_payload_record(raw_row, indicator_name=indicator_name))
-    if not rows:
-        return pd.DataFrame(columns=list(WR_LONG_COLUMNS))
-    long_df = pd.DataFrame(rows, columns=list(WR_LONG_COLUMNS))
-    return long_df.sort_values(["market", "stock_code", "year"]).reset_index(drop=True)
+    columns = {column: raw_payload_df[column].tolist() for column in raw_payload_df.columns}
+    return build_indicator_frame([columns], {"icr": indicator_name})
 
 
-def build_result_frame(long_df: pd.DataFrame, years: tuple[int, int, int] = (2024, 2023, 2022)) -> pd.DataFrame:
-    ordered_columns = ["market", "stock_code", "corp_code", "name", "icr_2024", "icr_2023", "icr_2022", "icr_avg"]
+def build_result_frame(long_df: pd.DataFrame, years: tuple[int, ...] = (2024, 2023, 2022)) -> pd.DataFrame:
     if long_df.empty:
-        return pd.DataFrame(columns=ordered_columns)
-
-    pivoted = long_df.pivot_table(
-        index=["market", "stock_code", "corp_code", "name"],
-        columns="year",
-        values="icr",
-        aggfunc="first",
-    ).reset_index()
-
-    for year in years:
-        if year not in pivoted.columns:
-            pivoted[year] = pd.NA
-
-    rename_map = {years[0]: "icr_2024", years[1]: "icr_2023", years[2]: "icr_2022"}
-    pivoted = pivoted.rename(columns=rename_map)
-    filtered = pivoted.dropna(subset=["icr_2024", "icr_2023", "icr_2022"]).copy()
-    if filtered.empty:
-        return filtered.reindex(columns=ordered_columns)
-
-    metric_cols = ["icr_2024", "icr_2023", "icr_2022"]
-    filtered = filtered.loc[(filtered[metric_cols] < 1).all(axis=1)].copy()
-    filtered["icr_avg"] = filtered[metric_cols].mean(axis=1)
-    return filtered.reindex(columns=ordered_columns).sort_values(["icr_avg", "market", "stock_code"]).reset_index(drop=True)
+        return pd.DataFrame(columns=screen_columns(years))
+    return screen_consecutive_below(build_metric_panel(long_df, "icr"), years, threshold=1.0)